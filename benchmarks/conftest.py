@@ -0,0 +1,46 @@
+"""
+Shared fixtures for the performance benchmarks (run with `make bench`)
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+CONFIGS_DIR = Path(__file__).parent.parent / "configs"
+
+# Number of saved configurations in the persistence benchmarks
+CONFIG_COUNT = 10_000
+
+
+@pytest.fixture(scope="session")
+def sample_config():
+    """A real saved project configuration"""
+    config_files = sorted(CONFIGS_DIR.glob("project_config_*.json"))
+    with open(config_files[-1]) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def populated_configs_dir(tmp_path_factory, sample_config):
+    """A working directory whose configs/ folder holds CONFIG_COUNT saved configurations"""
+    root = tmp_path_factory.mktemp("bench_configs")
+    configs = root / "configs"
+    configs.mkdir()
+    for i in range(CONFIG_COUNT):
+        config = dict(sample_config, project_name=f"{sample_config['project_name']} {i}")
+        with open(configs / f"project_config_{i:05d}.json", "w") as f:
+            json.dump(config, f, indent=2, default=str)
+    return root
+
+
+@pytest.fixture
+def in_configs_dir(populated_configs_dir, monkeypatch):
+    """Run a benchmark from the populated directory (the app uses relative paths)"""
+    monkeypatch.chdir(populated_configs_dir)
+    return populated_configs_dir
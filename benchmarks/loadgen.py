@@ -0,0 +1,242 @@
+"""
+Headless load test: many concurrent charter-tool sessions in one process.
+
+Every simulated user is a Streamlit `AppTest` session of the real app. The
+sessions run on threads against the same module state, as they would on one
+server: the shared model, the search index and the admission queue. Each
+session follows SCRIPT. It edits the Dashboard, takes chat turns and generates
+the exports. Every rerun is timed per page.
+
+    python benchmarks/loadgen.py --sessions 1 5 10 20
+    python benchmarks/loadgen.py --sessions 4 --model path/to/tiny-model   # local checkpoint instead of the rules agent
+
+AppTest is written for one session at a time. Each run patches the config into
+test mode, installs its own mock runtime and undoes both when it finishes, and it
+compiles the scripts again into a fresh script cache. A server has one runtime
+and one script cache for all of its sessions, so the sessions here share them and
+stay in test mode for the whole load test (see shared_server_state). Sharing the
+cache also keeps threads from compiling at the same time, which CPython before
+3.11.8 does not survive (gh-106905).
+
+Chat runs on the rules agent unless --model names a local checkpoint.
+Everything runs offline: HF_HUB_OFFLINE is set, and the files the export
+page writes go to a temporary working directory.
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+APP_DIR = pathlib.Path(__file__).parent.parent / "charter_tool"
+APP_PATH = APP_DIR / "streamlit_app.py"
+sys.path.insert(0, str(APP_DIR))
+
+# Seconds a single rerun may take before AppTest gives up (a model turn on the CPU can be slow)
+RERUN_TIMEOUT = 300
+
+CHAT_PROMPTS = [
+    "Who are the primary users of this assistant?",
+    "We need answers in under two seconds and GDPR compliance.",
+    "What should the first milestone deliver?",
+    "Which architecture components do we need?",
+]
+
+EXPORT_BUTTONS = ["📋 Generate Project Charter", "⚙️ Generate Technical Spec", "💾 Save Final Configuration"]
+
+
+def _widget(widgets, label: str):
+    return next(w for w in widgets if w.label == label)
+
+
+class Session:
+    """One simulated user driving the app through AppTest."""
+
+    def __init__(self, index: int, records: List[Dict]):
+        from streamlit.testing.v1 import AppTest
+        self.index = index
+        self.records = records
+        self.app = AppTest.from_file(str(APP_PATH), default_timeout=RERUN_TIMEOUT)
+        self.page = "dashboard"
+
+    def step(self, action: str, rerun):
+        """Time one interaction (a callable returning the AppTest after its rerun)."""
+        start = time.perf_counter()
+        error = None
+        try:
+            rerun()
+            if self.app.exception:
+                error = self.app.exception[0].message
+        except Exception as e:
+            error = str(e)
+        self.records.append({
+            "session": self.index,
+            "page": self.page,
+            "action": action,
+            "seconds": time.perf_counter() - start,
+            "error": error,
+        })
+
+    def open(self, page: str):
+        self.page = page
+        self.step("open", lambda: self.app.switch_page(f"app_pages/{page}.py").run())
+
+    def run_script(self, chat_turns: int):
+        app = self.app
+        self.step("open", app.run)
+        self.step("edit name", lambda: _widget(app.text_input, "Project Name").set_value(f"Load test project {self.index}").run())
+        self.step("edit problem", lambda: _widget(app.text_area, "Problem Statement").set_value(
+            "Support agents spend too long searching the knowledge base for answers.").run())
+        self.step("select users", lambda: _widget(app.multiselect, "Primary User Types").select("Business Users").run())
+
+        self.open("interactive_chat")
+        for turn in range(chat_turns):
+            prompt = CHAT_PROMPTS[turn % len(CHAT_PROMPTS)]
+            self.step("chat turn", lambda prompt=prompt: app.chat_input[0].set_value(prompt).run())
+
+        self.open("export_deploy")
+        for label in EXPORT_BUTTONS:
+            self.step(label.split(" ", 1)[1].lower(), lambda label=label: _widget(app.button, label).click().run())
+
+
+@contextmanager
+def shared_server_state():
+    """Let concurrent AppTest sessions share one runtime and script cache, as on a server."""
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    class KeepRuntime(type):
+        # A finished run clears the runtime while other sessions are still running on it
+        def __setattr__(cls, name, value):
+            if not (name == "_instance" and value is None):
+                setattr(Runtime, name, value)
+
+    app_test_mode = config.get_option("global.appTest")
+    # Test mode is patched per run; a run finishing first would switch it off for the others
+    config.set_option("global.appTest", True)
+    script_cache = ScriptCache()
+    app_test.Runtime = KeepRuntime("Runtime", (Runtime,), {})
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    try:
+        yield
+    finally:
+        config.set_option("global.appTest", app_test_mode)
+        app_test.Runtime = Runtime
+        app_test.ScriptCache = local_script_runner.ScriptCache = ScriptCache
+        Runtime._instance = None
+
+
+def run_level(sessions: int, iterations: int = 1, chat_turns: int = 2) -> Dict:
+    """Run `sessions` concurrent users through the script `iterations` times each."""
+    records = []
+
+    def user(index):
+        for _ in range(iterations):
+            Session(index, records).run_script(chat_turns)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(user, range(sessions)))
+    return summarize(records, time.perf_counter() - start, sessions)
+
+
+def _latency(seconds: List[float]) -> Dict:
+    ms = np.array(seconds) * 1000
+    return {
+        "reruns": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "max_ms": round(float(ms.max()), 1),
+    }
+
+
+def summarize(records: List[Dict], wall_seconds: float, sessions: int) -> Dict:
+    """Rerun latency percentiles overall and per page, throughput and errors."""
+    pages = {}
+    for record in records:
+        pages.setdefault(record["page"], []).append(record["seconds"])
+    errors = [r for r in records if r["error"]]
+    return {
+        "sessions": sessions,
+        "wall_sec": round(wall_seconds, 2),
+        "reruns_per_sec": round(len(records) / wall_seconds, 2) if wall_seconds else 0.0,
+        "overall": _latency([r["seconds"] for r in records]),
+        "pages": {page: _latency(seconds) for page, seconds in pages.items()},
+        "errors": len(errors),
+        "first_errors": sorted({f"{r['page']}/{r['action']}: {r['error']}" for r in errors})[:5],
+    }
+
+
+def run_load_test(levels: List[int], iterations: int = 1, chat_turns: int = 2, model: Optional[str] = None) -> List[Dict]:
+    """
+    Run each concurrency level in a scratch working directory. Without a model the
+    agent uses its rules backend; with one, the sidebar's first model is that checkpoint.
+    """
+    from chat import agent, models
+    saved = (agent.LLM_BACKEND, models.MODEL_OPTIONS, os.getcwd())
+    if model:
+        models.MODEL_OPTIONS = {f"Local: {pathlib.Path(model).name}": model, **models.MODEL_OPTIONS}
+        agent.LLM_BACKEND = "pytorch"
+    else:
+        agent.LLM_BACKEND = "rules"
+    try:
+        with tempfile.TemporaryDirectory() as workdir, shared_server_state():
+            os.chdir(workdir)
+            for name in ("docs", "configs", "src"):
+                os.makedirs(name)
+            return [run_level(sessions, iterations, chat_turns) for sessions in levels]
+    finally:
+        agent.LLM_BACKEND, models.MODEL_OPTIONS = saved[:2]
+        os.chdir(saved[2])
+
+
+def render_results(results: List[Dict]) -> str:
+    lines = [f"{'sessions':>8} {'reruns/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}"]
+    for result in results:
+        overall = result["overall"]
+        lines.append(
+            f"{result['sessions']:>8} {result['reruns_per_sec']:>9.2f} {overall['p50_ms']:>7.0f}ms "
+            f"{overall['p95_ms']:>7.0f}ms {overall['p99_ms']:>7.0f}ms {result['errors']:>7}"
+        )
+    for result in results:
+        lines += ["", f"{result['sessions']} sessions, per page:"]
+        for page, latency in result["pages"].items():
+            lines.append(f"  {page:<18} {latency['reruns']:>5} reruns  p50 {latency['p50_ms']:>7.0f}ms  p95 {latency['p95_ms']:>7.0f}ms  p99 {latency['p99_ms']:>7.0f}ms")
+        lines += [f"  ❌ {error}" for error in result["first_errors"]]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless load test of concurrent charter-tool sessions")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10], help="concurrency levels to run")
+    parser.add_argument("--iterations", type=int, default=1, help="script runs per session")
+    parser.add_argument("--chat-turns", type=int, default=2, help="chat turns per script run")
+    parser.add_argument("--model", help="local model checkpoint for the chat turns (default: rules agent)")
+    parser.add_argument("--json", type=pathlib.Path, help="also write the results to this file")
+    args = parser.parse_args()
+
+    print(f"🚦 Load test: {', '.join(map(str, args.sessions))} concurrent sessions, chat on {args.model or 'the rules agent'}")
+    results = run_load_test(args.sessions, args.iterations, args.chat_turns, args.model)
+    print(render_results(results))
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"📝 Results written to {args.json}")
+    return 1 if any(result["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
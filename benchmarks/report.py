@@ -0,0 +1,86 @@
+"""
+Compare the latest benchmark run against the stored baseline.
+
+Usage: python benchmarks/report.py [--threshold PERCENT] [--save-baseline]
+Exits with status 1 if any benchmark's mean got slower than the threshold allows,
+and with status 2 if there is no baseline to compare against. Timings depend on the
+machine, so the baseline is not committed: store one with `make bench-baseline`.
+"""
+
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+LATEST_PATH = BENCH_DIR.parent / ".benchmarks" / "latest.json"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+# Allowed slowdown of a benchmark's mean before it counts as a regression
+DEFAULT_THRESHOLD = 20.0
+
+
+def load_means(path: Path) -> dict:
+    with open(path) as f:
+        data = json.load(f)
+    return {bench["fullname"]: bench["stats"]["mean"] for bench in data["benchmarks"]}
+
+
+def compare(latest: dict, baseline: dict, threshold: float):
+    """Rows of (name, baseline mean, latest mean, change %, status)."""
+    rows = []
+    for name, mean in sorted(latest.items()):
+        base = baseline.get(name)
+        if base is None:
+            rows.append((name, None, mean, None, "new"))
+            continue
+        change = (mean - base) / base * 100 if base else 0.0
+        status = "REGRESSION" if change > threshold else "ok"
+        rows.append((name, base, mean, change, status))
+    return rows
+
+
+def _fmt_time(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown in percent")
+    parser.add_argument("--save-baseline", action="store_true", help="store the latest run as the baseline")
+    args = parser.parse_args()
+
+    if not LATEST_PATH.exists():
+        print(f"❌ No benchmark results at {LATEST_PATH}. Run: make bench")
+        return 1
+    if args.save_baseline:
+        shutil.copyfile(LATEST_PATH, BASELINE_PATH)
+        print(f"✅ Baseline saved to {BASELINE_PATH}")
+        return 0
+    if not BASELINE_PATH.exists():
+        print(f"❌ No baseline at {BASELINE_PATH}, so regressions cannot be checked. Run: make bench-baseline")
+        return 2
+
+    rows = compare(load_means(LATEST_PATH), load_means(BASELINE_PATH), args.threshold)
+    print(f"\n📊 Benchmark report (threshold +{args.threshold:.0f}%)")
+    print("=" * 100)
+    for name, base, mean, change, status in rows:
+        change_text = "-" if change is None else f"{change:+.1f}%"
+        print(f"{name[:60]:<60} {_fmt_time(base):>10} {_fmt_time(mean):>10} {change_text:>8}  {status}")
+    regressions = [row for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) regressed beyond +{args.threshold:.0f}%")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Benchmarks for the chat agent: rules fallback and tiny local model generation
+"""
+
+import os
+
+import pytest
+
+from chat import agent
+
+PROMPTS = [
+    "What problem are we solving?",
+    "Who are the users of the system?",
+    "Should the interface be a chat or a dashboard?",
+    "Which system components do we need?",
+    "What is our budget constraint?",
+    "When is the deadline?",
+    "Anything else I should consider?",
+]
+
+# Local path or cached name of a tiny causal LM, e.g. a saved copy of
+# hf-internal-testing/tiny-random-gpt2. Generation benchmarks are skipped without one.
+BENCH_MODEL = os.environ.get("CHARTER_BENCH_MODEL")
+
+
+def test_rules_fallback(benchmark):
+    """All rules-based intents, answered without a model"""
+    def answer_all():
+        return [agent.rules_chat_agent(prompt) for prompt in PROMPTS]
+
+    responses = benchmark(answer_all)
+    assert len(responses) == len(PROMPTS)
+
+
+def test_intent_classification(benchmark):
+    benchmark(agent.classify_prompt_intent, PROMPTS[-1])
+
+
+@pytest.mark.skipif(not agent.HF_AVAILABLE or not BENCH_MODEL, reason="needs transformers, torch and CHARTER_BENCH_MODEL")
+def test_tiny_model_generation(benchmark):
+    """End-to-end latency of one chat turn on a tiny local model"""
+    assert agent.get_llm_pipeline(BENCH_MODEL) is not None
+    response = benchmark.pedantic(
+        agent.llm_chat_agent, args=(PROMPTS[1],), kwargs={"model_name": BENCH_MODEL},
+        rounds=5, warmup_rounds=1,
+    )
+    assert isinstance(response, str)
+    benchmark.extra_info.update(agent.get_last_generation_stats())
@@ -0,0 +1,26 @@
+"""
+Throughput benchmarks for the event bus (events/sec and p99 delivery latency)
+"""
+
+import asyncio
+
+from utils.event_bus import LocalBroker, LocalSocketTransport, run_throughput_benchmark
+
+
+def test_in_memory_fan_out(benchmark):
+    result = benchmark.pedantic(
+        lambda: asyncio.run(run_throughput_benchmark(events=2_000, subscribers=10)), rounds=3
+    )
+    benchmark.extra_info.update(result)
+
+
+def test_local_socket_fan_out(benchmark):
+    async def run():
+        broker = await LocalBroker().start()
+        try:
+            return await run_throughput_benchmark(2_000, 10, transport=LocalSocketTransport(port=broker.port))
+        finally:
+            await broker.close()
+
+    result = benchmark.pedantic(lambda: asyncio.run(run()), rounds=3)
+    benchmark.extra_info.update(result)
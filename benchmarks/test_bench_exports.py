@@ -0,0 +1,26 @@
+"""
+Benchmarks for the export generators and configuration validation
+"""
+
+import pytest
+
+from utils import exports
+
+GENERATORS = [
+    exports.generate_project_charter,
+    exports.generate_technical_spec,
+    exports.generate_python_config,
+    exports.generate_dockerfile,
+    exports.generate_requirements,
+]
+
+
+@pytest.mark.parametrize("generator", GENERATORS, ids=lambda g: g.__name__)
+def test_generate(benchmark, generator, sample_config):
+    content = benchmark(generator, sample_config)
+    assert content
+
+
+def test_validate_configuration(benchmark, sample_config):
+    results = benchmark(exports.validate_configuration, sample_config)
+    assert results["Project Name"]["valid"]
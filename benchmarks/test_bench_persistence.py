@@ -0,0 +1,35 @@
+"""
+Benchmarks for saving and loading configurations with 10k configs on disk
+"""
+
+import os
+
+from utils.functions import save_config_to_file, load_config_from_file
+
+from conftest import CONFIG_COUNT
+
+
+def test_save_config(benchmark, in_configs_dir, sample_config):
+    filename = benchmark(save_config_to_file, sample_config)
+    assert os.path.exists(filename)
+
+
+def test_load_config(benchmark, in_configs_dir):
+    config = benchmark(load_config_from_file, "configs/project_config_05000.json")
+    assert config["project_name"].endswith("5000")
+
+
+def test_list_configs(benchmark, in_configs_dir):
+    """Directory scan done by the Dashboard's Quick Config on every rerun"""
+    def list_configs():
+        return [f for f in os.listdir("configs") if f.endswith('.json')]
+
+    assert len(benchmark(list_configs)) >= CONFIG_COUNT
+
+
+def test_load_all_configs(benchmark, in_configs_dir):
+    def load_all():
+        return [load_config_from_file(f"configs/{f}") for f in os.listdir("configs") if f.endswith('.json')]
+
+    configs = benchmark.pedantic(load_all, rounds=3, iterations=1)
+    assert len(configs) >= CONFIG_COUNT
@@ -0,0 +1,40 @@
+"""
+Benchmarks for persona switching against the <2s target of the platform doc
+"""
+
+import os
+
+import pytest
+
+from chat import agent
+from chat.personas import SWITCH_TARGET_MS, PersonaRegistry, load_personas
+
+BENCH_MODEL = os.environ.get("CHARTER_BENCH_MODEL")
+
+
+def test_persona_switch(benchmark):
+    registry = PersonaRegistry(load_personas())
+    persona_ids = registry.ids()
+
+    def switch_all():
+        for persona_id in persona_ids:
+            registry.switch(persona_id)
+
+    benchmark(switch_all)
+    assert registry.switch_report()["max_ms"] < SWITCH_TARGET_MS
+
+
+@pytest.mark.skipif(not agent.HF_AVAILABLE or not BENCH_MODEL, reason="needs transformers, torch and CHARTER_BENCH_MODEL")
+def test_persona_switch_with_resident_model(benchmark):
+    """Cold switches precompute the prefix state; warm switches only swap it"""
+    pipe = agent.get_llm_pipeline(BENCH_MODEL)
+    registry = PersonaRegistry(load_personas())
+    cold_ms = [registry.switch(persona_id, pipe) for persona_id in registry.ids()]
+    benchmark.extra_info["cold_switch_max_ms"] = max(cold_ms)
+
+    def switch_all():
+        for persona_id in registry.ids():
+            registry.switch(persona_id, pipe)
+
+    benchmark(switch_all)
+    assert registry.switch_report()["max_ms"] < SWITCH_TARGET_MS
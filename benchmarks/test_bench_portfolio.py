@@ -0,0 +1,41 @@
+"""
+Benchmarks for portfolio analytics with 10k configs on disk
+"""
+
+import os
+
+from utils import portfolio
+
+from conftest import CONFIG_COUNT
+
+
+def test_portfolio_cold_load(benchmark, in_configs_dir):
+    """Parse every config (no Parquet cache yet)"""
+    def cold_load():
+        cache_path = os.path.join("configs", portfolio.CACHE_FILE)
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        return portfolio.load_portfolio()
+
+    table = benchmark.pedantic(cold_load, rounds=3, iterations=1)
+    assert len(table) >= CONFIG_COUNT
+
+
+def test_portfolio_cached_load(benchmark, in_configs_dir):
+    """Reload with an up-to-date Parquet cache (only a directory scan)"""
+    portfolio.load_portfolio()
+    table = benchmark.pedantic(portfolio.load_portfolio, rounds=5, iterations=1)
+    assert len(table) >= CONFIG_COUNT
+
+
+def test_portfolio_aggregates(benchmark, in_configs_dir):
+    table = portfolio.load_portfolio()
+
+    def aggregates():
+        return (
+            portfolio.budget_distribution(table),
+            portfolio.value_frequency(table, "system_components"),
+            portfolio.completion_rates(table),
+        )
+
+    benchmark(aggregates)
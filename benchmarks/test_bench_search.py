@@ -0,0 +1,39 @@
+"""
+Benchmarks for full-text search with 100k indexed documents
+"""
+
+import pytest
+
+from utils.search import SearchIndex, CHAT
+
+DOCUMENT_COUNT = 100_000
+
+WORDS = (
+    "budget compliance gdpr hipaa latency dashboard analyst pipeline ingestion model "
+    "forecast inventory supplier delivery risk chat interface timeline prototype deployment"
+).split()
+
+
+@pytest.fixture(scope="module")
+def search_index(tmp_path_factory):
+    """100k chat messages over a 20-word vocabulary: every query term matches most documents (worst case)"""
+    index = SearchIndex(str(tmp_path_factory.mktemp("search") / "search.sqlite"))
+    with index._db:
+        for i in range(DOCUMENT_COUNT):
+            body = " ".join(WORDS[(i * 7 + j * 3) % len(WORDS)] for j in range(30))
+            index._upsert(CHAT, f"chat:bench:{i}", f"user · session {i % 500}", body, float(i))
+    return index
+
+
+def test_search_100k(benchmark, search_index):
+    results = benchmark(search_index.search, "gdpr supplier", 10)
+    assert len(results) == 10
+
+
+def test_prefix_search_100k(benchmark, search_index):
+    results = benchmark(search_index.search, "invent", 10)
+    assert results
+
+
+def test_add_chat_message(benchmark, search_index):
+    benchmark(search_index.add_chat_message, "bench-session", "user", "Which compliance rules apply to supplier data?")
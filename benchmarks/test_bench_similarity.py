@@ -0,0 +1,25 @@
+"""
+Benchmarks for the similar-project index with 10k configs on disk
+"""
+
+from utils.similarity import SimilarityIndex
+
+from conftest import CONFIG_COUNT
+
+
+def test_build_similarity_index(benchmark, in_configs_dir):
+    def build():
+        index = SimilarityIndex()
+        index.refresh()
+        return index
+
+    index = benchmark.pedantic(build, rounds=3, iterations=1)
+    assert len(index) >= CONFIG_COUNT
+
+
+def test_similar_projects_query(benchmark, in_configs_dir, sample_config):
+    """Top-5 query run by the Dashboard's Similar Projects panel"""
+    index = SimilarityIndex()
+    index.refresh()
+    results = benchmark(index.query, sample_config, 5)
+    assert results
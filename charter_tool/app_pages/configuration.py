@@ -0,0 +1,50 @@
+"""
+Configuration page: JSON editor and validation of the project config.
+"""
+
+import json
+
+import streamlit as st
+
+from utils.exports import validate_configuration
+from utils.project import new_project_config
+
+st.title("⚙️ Advanced Configuration")
+
+# JSON editor for advanced users
+st.subheader("Configuration Editor")
+
+config_json = st.text_area(
+    "Edit Configuration (JSON)",
+    value=json.dumps(st.session_state.project_config, indent=2),
+    height=400
+)
+
+col1, col2 = st.columns(2)
+
+with col1:
+    if st.button("Update Configuration"):
+        try:
+            new_config = json.loads(config_json)
+            st.session_state.project_config.update(new_config)
+            st.success("Configuration updated!")
+        except json.JSONDecodeError as e:
+            st.error(f"Invalid JSON: {e}")
+
+with col2:
+    if st.button("Reset to Default"):
+        st.session_state.project_config = new_project_config()
+        st.rerun()
+
+st.divider()
+
+# Configuration validation
+st.subheader("Configuration Validation")
+
+validation_results = validate_configuration(st.session_state.project_config)
+
+for category, result in validation_results.items():
+    if result['valid']:
+        st.success(f"✅ {category}: {result['message']}")
+    else:
+        st.error(f"❌ {category}: {result['message']}")
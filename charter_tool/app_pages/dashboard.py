@@ -0,0 +1,233 @@
+"""
+Dashboard page: the project overview, its sections as tabs and similar saved projects.
+"""
+
+import os
+from datetime import datetime
+
+import streamlit as st
+
+from utils.functions import load_config_from_file
+from utils.project import (
+    SECTIONS, USER_TYPES, INTERACTION_PATTERNS, SYSTEM_COMPONENTS, TECH_STACKS,
+    PERFORMANCE_OPTIONS, COMPLIANCE_OPTIONS, PHASES
+)
+from utils.similarity import get_similarity_index, CATEGORY_FIELDS as SIMILARITY_FIELDS
+
+st.title("🎯 AI Project Dashboard")
+
+col1, col2 = st.columns([2, 1])
+
+with col1:
+    st.subheader("Project Overview")
+    
+    # Project name input
+    project_name = st.text_input(
+        "Project Name",
+        value=st.session_state.project_config.get('project_name', ''),
+        placeholder="Enter your AI project name"
+    )
+    st.session_state.project_config['project_name'] = project_name
+    
+    # Problem statement
+    problem_statement = st.text_area(
+        "Problem Statement",
+        value=st.session_state.project_config.get('problem_statement', ''),
+        placeholder="What specific problem are you solving?",
+        height=100
+    )
+    st.session_state.project_config['problem_statement'] = problem_statement
+    
+    # Mark Problem Definition completion
+    if project_name and problem_statement and len(problem_statement) > 20:
+        st.session_state.project_config['completion_status']['Problem Definition'] = True
+    else:
+        st.session_state.project_config['completion_status']['Problem Definition'] = False
+    
+    # Tabbed interface for different sections
+    tab1, tab2, tab3, tab4 = st.tabs([
+        "👥 Users & Interaction", 
+        "🏗️ Architecture", 
+        "📏 Constraints & Metrics",
+        "📅 Timeline"
+    ])
+    
+    with tab1:
+        st.subheader("User Analysis")
+        
+        # User types
+        user_types = st.multiselect(
+            "Primary User Types",
+            USER_TYPES,
+            default=st.session_state.project_config.get('users', [])
+        )
+        st.session_state.project_config['users'] = user_types
+        
+        # Interaction patterns
+        interaction_patterns = st.multiselect(
+            "Interaction Patterns",
+            INTERACTION_PATTERNS,
+            default=st.session_state.project_config.get('interaction_patterns', [])
+        )
+        st.session_state.project_config['interaction_patterns'] = interaction_patterns
+        
+        # Mark completion for both User Analysis and Interaction Design
+        if user_types and interaction_patterns:
+            st.session_state.project_config['completion_status']['User Analysis'] = True
+            st.session_state.project_config['completion_status']['Interaction Design'] = True
+        else:
+            st.session_state.project_config['completion_status']['User Analysis'] = False
+            st.session_state.project_config['completion_status']['Interaction Design'] = False
+    
+    with tab2:
+        st.subheader("System Architecture")
+        
+        # System components
+        components = st.multiselect(
+            "System Components",
+            SYSTEM_COMPONENTS,
+            default=st.session_state.project_config.get('system_components', [])
+        )
+        st.session_state.project_config['system_components'] = components
+        
+        # Technology stack
+        tech_stack = st.selectbox(
+            "Primary Technology Stack",
+            TECH_STACKS,
+            index=0
+        )
+        st.session_state.project_config['tech_stack'] = tech_stack
+        
+        if components:
+            st.session_state.project_config['completion_status']['Architecture'] = True
+        else:
+            st.session_state.project_config['completion_status']['Architecture'] = False
+    
+    with tab3:
+        st.subheader("Constraints & Success Metrics")
+        
+        col3, col4 = st.columns(2)
+        
+        with col3:
+            st.write("**Constraints**")
+            saved_constraints = st.session_state.project_config.get('constraints') or {}
+            budget = st.number_input("Monthly Budget (€)", min_value=0, value=int(saved_constraints.get('budget', 500)))
+            performance = st.selectbox(
+                "Performance Requirement",
+                PERFORMANCE_OPTIONS,
+                index=PERFORMANCE_OPTIONS.index(saved_constraints['performance']) if saved_constraints.get('performance') in PERFORMANCE_OPTIONS else 0
+            )
+            compliance = st.multiselect("Compliance Requirements", COMPLIANCE_OPTIONS, default=[c for c in saved_constraints.get('compliance', []) if c in COMPLIANCE_OPTIONS])
+            
+            st.session_state.project_config['constraints'] = {
+                'budget': budget,
+                'performance': performance,
+                'compliance': compliance
+            }
+        
+        with col4:
+            st.write("**Success Metrics**")
+            efficiency_gain = st.slider("Expected Efficiency Gain (%)", 0, 100, 50)
+            accuracy_target = st.slider("Accuracy Target (%)", 0, 100, 95)
+            user_adoption = st.number_input("Target Active Users", min_value=1, value=50)
+            
+            st.session_state.project_config['success_metrics'] = {
+                'efficiency_gain': efficiency_gain,
+                'accuracy_target': accuracy_target,
+                'user_adoption': user_adoption
+            }
+        
+        if budget and performance:
+            st.session_state.project_config['completion_status']['Constraints'] = True
+            st.session_state.project_config['completion_status']['Success Metrics'] = True
+        else:
+            st.session_state.project_config['completion_status']['Constraints'] = False
+            st.session_state.project_config['completion_status']['Success Metrics'] = False
+    
+    with tab4:
+        st.subheader("Project Timeline")
+        
+        col5, col6 = st.columns(2)
+        
+        saved_timeline = st.session_state.project_config.get('timeline') or {}
+
+        def saved_date(key, fallback):
+            try:
+                return datetime.strptime(saved_timeline[key], "%Y-%m-%d").date()
+            except (KeyError, TypeError, ValueError):
+                return fallback
+
+        with col5:
+            start_date = st.date_input("Project Start Date", saved_date('start_date', datetime.now().date()))
+            end_date = st.date_input("Target Go-Live Date", saved_date('end_date', "today"))
+            
+        with col6:
+            phases = st.multiselect(
+                "Project Phases",
+                PHASES,
+                default=[p for p in saved_timeline.get('phases', ["Discovery", "Prototype", "Development", "Testing", "Deployment"]) if p in PHASES]
+            )
+        
+        st.session_state.project_config['timeline'] = {
+            'start_date': str(start_date),
+            'end_date': str(end_date),
+            'phases': phases
+        }
+        
+        if start_date and end_date and phases:
+            st.session_state.project_config['completion_status']['Timeline'] = True
+        else:
+            st.session_state.project_config['completion_status']['Timeline'] = False
+
+with col2:
+    st.subheader("🎯 Project Health")
+    
+    # Calculate completion percentage
+    total_sections = len(SECTIONS)
+    completed_sections = sum(1 for status in st.session_state.project_config.get('completion_status', {}).values() if status)
+    completion_percentage = (completed_sections / total_sections) * 100
+    
+    st.metric("Completion", f"{completion_percentage:.0f}%")
+    st.progress(completion_percentage / 100)
+    
+    st.subheader("📋 Next Steps")
+    
+    incomplete_sections = [
+        section for section in SECTIONS 
+        if not st.session_state.project_config.get('completion_status', {}).get(section, False)
+    ]
+    
+    if incomplete_sections:
+        st.write("Complete these sections:")
+        for section in incomplete_sections[:3]:  # Show top 3
+            st.write(f"• {section}")
+    else:
+        st.success("All sections completed! 🎉")
+        st.write("Ready to export configuration and start development.")
+    
+    st.subheader("🔧 Quick Config")
+    
+    # Load existing configs
+    config_files = []
+    if os.path.exists("configs"):
+        config_files = [f for f in os.listdir("configs") if f.endswith('.json')]
+    
+    if config_files:
+        selected_config = st.selectbox("Load Previous Config", ["None"] + config_files)
+        if selected_config != "None" and st.button("Load Config"):
+            if load_config_from_file(f"configs/{selected_config}"):
+                st.success("Configuration loaded!")
+                st.rerun()
+
+    st.subheader("🔎 Similar Projects")
+    current_config = st.session_state.project_config
+    if current_config.get('problem_statement') or any(current_config.get(field) for field in SIMILARITY_FIELDS):
+        similar = get_similarity_index().query(current_config, k=5, exclude_project=current_config.get('project_name') or None)
+        if similar:
+            for match in similar:
+                st.write(f"• **{match['project_name'] or 'Untitled'}** — {match['score']:.0%} similar")
+                st.caption(os.path.basename(match['path']))
+        else:
+            st.caption("No similar saved projects yet.")
+    else:
+        st.caption("Describe the problem, users or components to find similar saved projects.")
@@ -0,0 +1,98 @@
+"""
+Export & Deploy page: generated charter, technical spec, Python config and deployment files.
+"""
+
+import streamlit as st
+
+from utils.exports import (
+    generate_project_charter, generate_technical_spec, generate_python_config,
+    generate_dockerfile, generate_requirements
+)
+from utils.bundle import build_bundle, bundle_file_name
+from utils.functions import save_config_to_file
+from utils.scaffold import config_fingerprint, write_if_changed
+from utils.search import note_saved_file
+
+st.title("📤 Export & Deploy")
+
+st.subheader("Generate Project Files")
+
+
+def save_export(path: str, content: str, label: str, index: bool = False):
+    """Write an export only if its content changed (unchanged files do not trigger a rerun)."""
+    status = write_if_changed(path, content)
+    if status == "unchanged":
+        st.info(f"{label} in {path} is already up to date")
+        return
+    if index:
+        note_saved_file(path)
+    st.success(f"{label} saved to {path}")
+
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.write("**Available Exports:**")
+    
+    # Generate different file formats
+    if st.button("📋 Generate Project Charter"):
+        charter_content = generate_project_charter(st.session_state.project_config)
+        st.text_area("Project Charter (Markdown)", charter_content, height=300)
+        save_export("docs/generated_charter.md", charter_content, "Charter", index=True)
+    
+    if st.button("⚙️ Generate Technical Spec"):
+        tech_spec = generate_technical_spec(st.session_state.project_config)
+        st.text_area("Technical Specification", tech_spec, height=300)
+        save_export("docs/technical_spec.md", tech_spec, "Technical spec", index=True)
+    
+    if st.button("🐍 Generate Python Config"):
+        python_config = generate_python_config(st.session_state.project_config)
+        st.code(python_config, language="python")
+        save_export("src/config.py", python_config, "Python config")
+
+with col2:
+    st.write("**Deployment Options:**")
+    
+    deployment_type = st.selectbox(
+        "Deployment Type",
+        ["Local Development", "Docker Container", "Cloud Platform", "Kubernetes"]
+    )
+    
+    if st.button("🚀 Generate Deployment Files"):
+        if deployment_type == "Docker Container":
+            dockerfile_content = generate_dockerfile(st.session_state.project_config)
+            st.code(dockerfile_content, language="dockerfile")
+            save_export("Dockerfile", dockerfile_content, "Dockerfile")
+        
+        elif deployment_type == "Cloud Platform":
+            requirements_content = generate_requirements(st.session_state.project_config)
+            st.code(requirements_content, language="text")
+            save_export("requirements.txt", requirements_content, "Requirements")
+    
+    st.divider()
+    
+    st.write("**Configuration Files:**")
+    
+    # Save final configuration
+    if st.button("💾 Save Final Configuration"):
+        filename = save_config_to_file(st.session_state.project_config)
+        st.success(f"Configuration saved to {filename}")
+
+    st.divider()
+
+    st.write("**Download Bundle:**")
+
+    # All exports in one ZIP, rebuilt only when the configuration changed
+    fingerprint = config_fingerprint(st.session_state.project_config)
+    bundle = st.session_state.get("export_bundle")
+    if bundle is None or bundle["fingerprint"] != fingerprint:
+        data, stats = build_bundle(st.session_state.project_config)
+        bundle = {"fingerprint": fingerprint, "data": data, "stats": stats}
+        st.session_state["export_bundle"] = bundle
+    st.download_button(
+        "📦 Download All Exports (ZIP)",
+        bundle["data"],
+        file_name=bundle_file_name(st.session_state.project_config),
+        mime="application/zip",
+    )
+    st.caption(f"Charter, spec, Python config, Dockerfile and requirements · {bundle['stats']['size_bytes'] / 1024:.1f} KB, built in {bundle['stats']['build_ms']} ms")
@@ -0,0 +1,160 @@
+"""
+Interactive Chat page: planning chat with the LLM agent, guided questions,
+extraction into the project config and handoff between sessions.
+"""
+
+import pathlib
+import time
+
+import streamlit as st
+
+from chat.agent import multi_agent_chat, get_last_generation_stats, get_generation_token_report, get_llm_pipeline
+from chat.extraction import extract_from_transcript, apply_extraction
+from chat.handoff import export_handoff, load_handoff, seed_snapshot
+from chat.personas import get_persona_registry
+from chat.retrieval import retrieve_context, TOP_K as RETRIEVAL_TOP_K
+from utils.event_bus import get_app_event_bus
+from utils.project import PLANNING_QUESTIONS
+from utils.search import get_search_index
+
+event_bus = get_app_event_bus()
+persona_registry = get_persona_registry()
+
+# Read charter_template.md once per session
+CHARTER_TEMPLATE_PATH = pathlib.Path(__file__).parent.parent.parent / "charter_template.md"
+if 'charter_template_content' not in st.session_state:
+    try:
+        with open(CHARTER_TEMPLATE_PATH, "r") as f:
+            st.session_state['charter_template_content'] = f.read()
+    except Exception:
+        st.session_state['charter_template_content'] = ""
+
+
+def charter_context():
+    """
+    Charter context of the conversation's system message: the whole template, or
+    none when sections are retrieved per turn (see turn_context). A system message
+    that changed every turn would miss the prompt cache and break handoff seeding.
+    """
+    if not st.session_state.get('use_charter_context', True) or st.session_state.get('retrieve_charter_sections', True):
+        return None
+    return st.session_state['charter_template_content']
+
+
+def turn_context(prompt):
+    """Charter sections retrieved for a prompt of the planning agent that the conversation does not hold yet."""
+    if not st.session_state.get('use_charter_context', True) or not st.session_state.get('retrieve_charter_sections', True):
+        return None
+    if persona_registry.get(st.session_state.get("active_persona", "default")) is not None:
+        # Personas run on their own system prompt, without charter context
+        return None
+    earlier = "\n\n".join(m["context"] for m in st.session_state.chat_messages if m.get("context"))
+    return retrieve_context(prompt, RETRIEVAL_TOP_K, exclude=earlier) or None
+
+
+def persona_context(persona_id):
+    """System context the chat turns of a persona run with (see multi_agent_chat)."""
+    persona = persona_registry.get(persona_id)
+    return persona.system_prompt if persona is not None else charter_context()
+
+
+st.title("🤖 Interactive Project Planning Chat")
+chat_container = st.container()
+col1, col2 = st.columns([3, 1])
+with col1:
+    for message in st.session_state.chat_messages:
+        with st.chat_message(message["role"]):
+            st.write(message["content"])
+    if prompt := st.chat_input("Ask about your project or answer the questions..."):
+        user_message = {"role": "user", "content": prompt, "timestamp": time.time()}
+        context = turn_context(prompt)
+        if context:
+            # Kept with the message, so later turns render it the same way and hit the prompt cache
+            user_message["context"] = context
+        st.session_state.chat_messages.append(user_message)
+        # Pass selected model and charter context to the agent
+        model_name = st.session_state.get("llm_model", "Qwen/Qwen2-7B-Instruct")
+        # Earlier turns are passed as chat messages; their encoded tokens are cached by the agent
+        ai_response = multi_agent_chat(prompt, agent_type=st.session_state.get("active_persona", "default"), history=st.session_state.chat_messages[:-1], model_name=model_name, system_context=charter_context(), draft_model_name=st.session_state.get("draft_model"), category=st.session_state.get("active_question_category"), session_id=st.session_state.session_id, project=st.session_state.project_config.get('project_name'), constraints=st.session_state.project_config.get('constraints'), context=context)
+        assistant_message = {"role": "assistant", "content": ai_response, "timestamp": time.time()}
+        st.session_state.chat_messages.append(assistant_message)
+        search_index = get_search_index()
+        for message in (user_message, assistant_message):
+            search_index.add_chat_message(st.session_state.session_id, message["role"], message["content"], message["timestamp"])
+        st.session_state["last_generation_stats"] = get_last_generation_stats(st.session_state.session_id)
+        event_bus.publish(f"session/{st.session_state.session_id}/chat", {"role": "user", "chars": len(prompt), "persona": st.session_state.get("active_persona", "default")}, source=st.session_state.session_id)
+        st.rerun()
+    generation_stats = st.session_state.get("last_generation_stats")
+    if generation_stats and generation_stats.get("shed_reason"):
+        st.caption(f"⏳ Answered by the rules-based agent: {generation_stats['shed_reason']}")
+    elif generation_stats:
+        stats_line = f"⚡ {generation_stats['new_tokens']} tokens in {generation_stats['elapsed_sec']}s ({generation_stats['tokens_per_sec']} tok/s)"
+        if generation_stats.get("assisted"):
+            stats_line += f" · draft acceptance {generation_stats['acceptance_rate']:.0%}"
+        token_report = get_generation_token_report()
+        if token_report["turns"]:
+            stats_line += f" · avg {token_report['avg_tokens_per_turn']} tokens/turn ({token_report['reduction_pct']}% below the {token_report['baseline_max_new_tokens']}-token budget)"
+        st.caption(stats_line)
+with col2:
+    st.subheader("💡 Guided Questions")
+    selected_category = st.selectbox(
+        "Question Category",
+        list(PLANNING_QUESTIONS.keys())
+    )
+    st.write(f"**{selected_category} Questions:**")
+    for i, question in enumerate(PLANNING_QUESTIONS[selected_category]):
+        if st.button(f"Q{i+1}: {question[:30]}...", key=f"q_{selected_category}_{i}"):
+            st.session_state.chat_messages.append({"role": "assistant", "content": question, "timestamp": time.time()})
+            # Answers to this question use the category's generation profile
+            st.session_state["active_question_category"] = selected_category
+            st.rerun()
+    st.divider()
+    if st.button("Clear Chat"):
+        st.session_state.chat_messages = []
+        st.session_state.pop("active_question_category", None)
+        st.rerun()
+
+    # Turn the answers given in chat into Dashboard fields (only new messages are processed)
+    st.subheader("📥 Fill Config from Chat")
+    if st.button("Extract Answers", disabled=not st.session_state.chat_messages):
+        extracted, extraction_stats = extract_from_transcript(
+            st.session_state.chat_messages,
+            pipe=get_llm_pipeline(st.session_state.get("llm_model"))
+        )
+        changed_fields = apply_extraction(st.session_state.project_config, extracted)
+        st.session_state["extraction_result"] = (changed_fields, extraction_stats)
+    if st.session_state.get("extraction_result"):
+        changed_fields, extraction_stats = st.session_state["extraction_result"]
+        if changed_fields:
+            st.success("Updated: " + ", ".join(changed_fields))
+        else:
+            st.info("No new project details found in the chat.")
+        st.caption(f"{extraction_stats['processed']} new / {extraction_stats['cached']} cached answers ({extraction_stats['backend']})")
+
+    # Handoff: continue this conversation in another session or on another device
+    st.subheader("🔀 Handoff")
+    persona_id = st.session_state.get("active_persona", "default")
+    if st.button("Create Handoff Token", disabled=not st.session_state.chat_messages):
+        st.session_state["handoff_token"] = export_handoff(
+            st.session_state.chat_messages,
+            persona=persona_id,
+            model_name=st.session_state.get("llm_model"),
+            system_context=persona_context(persona_id),
+        )
+    if st.session_state.get("handoff_token"):
+        st.code(st.session_state["handoff_token"], language="text")
+    resume_token = st.text_input("Resume from token", key="resume_token")
+    if st.button("Resume Conversation") and resume_token:
+        snapshot = load_handoff(resume_token)
+        if snapshot is None:
+            st.error("Unknown or expired handoff token")
+        else:
+            # The conversation continues with the exporting session's persona and model; retrieved sections travel with the messages
+            resumed_persona = snapshot.get("persona") if persona_registry.get(snapshot.get("persona")) is not None else "default"
+            if snapshot.get("model"):
+                st.session_state["llm_model"] = snapshot["model"]
+            # The sidebar widgets are already drawn; the entrypoint applies these on the rerun
+            st.session_state["handoff_restore"] = {"persona": resumed_persona, "model": snapshot.get("model")}
+            seed_snapshot(snapshot, persona_context(resumed_persona))
+            st.session_state.chat_messages = snapshot["messages"]
+            st.rerun()
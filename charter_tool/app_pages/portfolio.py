@@ -0,0 +1,39 @@
+"""
+Portfolio page: analytics over all saved configurations (pandas + Parquet cache).
+"""
+
+import streamlit as st
+
+from utils import portfolio
+
+st.title("📊 Portfolio Analytics")
+
+portfolio_table = portfolio.load_portfolio()
+all_versions = st.checkbox("Count every saved version", value=False)
+if not all_versions:
+    portfolio_table = portfolio.latest_versions(portfolio_table)
+
+if portfolio_table.empty:
+    st.info("No saved configurations yet. Use 'Save Progress' in the sidebar.")
+else:
+    summary = portfolio.portfolio_summary(portfolio_table)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Projects", summary["projects"])
+    col2.metric("Total budget", f"€{summary['total_monthly_budget']:,.0f}/mo")
+    col3.metric("Median budget", f"€{summary['median_budget']:,.0f}")
+    col4.metric("Avg completion", f"{summary['avg_completion']:.0%}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("💰 Budget Distribution")
+        st.bar_chart(portfolio.budget_distribution(portfolio_table))
+        st.subheader("✅ Completion Rates")
+        st.bar_chart(portfolio.completion_rates(portfolio_table))
+    with col2:
+        st.subheader("🏗️ System Components")
+        st.bar_chart(portfolio.value_frequency(portfolio_table, "system_components"))
+        st.subheader("👥 Users")
+        st.bar_chart(portfolio.value_frequency(portfolio_table, "users"))
+
+    st.subheader("Projects")
+    st.dataframe(portfolio_table[["project_name", "budget", "performance", "tech_stack", "start_date", "end_date"]])
@@ -0,0 +1,86 @@
+"""
+Telemetry page: inference metrics, request coalescing, cost control and the event bus.
+"""
+
+import sys
+from datetime import datetime
+
+import streamlit as st
+
+from chat import telemetry
+from chat.admission import get_admission_controller, write_cost_report
+from utils.event_bus import get_app_event_bus
+
+event_bus = get_app_event_bus()
+
+st.title("📈 Inference Telemetry")
+
+# Recording is process-wide, so it is set for the server (CHARTER_TELEMETRY=0 turns it off), not per visitor
+if telemetry.is_enabled():
+    st.caption("🟢 Recording telemetry for all sessions (start the app with CHARTER_TELEMETRY=0 to turn it off)")
+else:
+    st.caption("⚪ Telemetry recording is off (CHARTER_TELEMETRY=0)")
+
+summary = telemetry.summarize()
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Turns (rolling)", summary["turns"])
+col2.metric("Avg time to first token", f"{summary['avg_ttft_sec']:.2f}s")
+col3.metric("Avg decode speed", f"{summary['avg_decode_tokens_per_sec']:.1f} tok/s")
+col4.metric("Process RSS", f"{summary['rss_bytes'] / 1024 ** 2:.0f} MB")
+
+model_loads = telemetry.get_model_loads()
+if model_loads:
+    st.subheader("Model Loads")
+    for model_name, load in model_loads.items():
+        status = "✅" if load["success"] else "❌"
+        st.write(f"{status} **{model_name}** — {load['seconds']:.1f}s")
+
+# Only sessions that chatted have imported the model code
+agent = sys.modules.get("chat.agent")
+coalescing = agent.get_coalescing_stats() if agent else {"requests": 0}
+if coalescing["requests"]:
+    st.subheader("Request Coalescing")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Chat requests", coalescing["requests"])
+    col2.metric("Generations run", coalescing["generations"])
+    col3.metric("Deduplicated", coalescing["deduplicated"])
+
+recent_turns = telemetry.get_recent_turns()
+if recent_turns:
+    st.subheader("Recent Turns")
+    llm_turns = [t for t in recent_turns if t.get("backend") != "rules"]
+    if llm_turns:
+        st.line_chart(
+            [{"ttft_sec": t.get("ttft_sec", 0), "queue_wait_sec": t.get("queue_wait_sec", 0)} for t in llm_turns]
+        )
+    st.dataframe(recent_turns[::-1])
+else:
+    st.info("No chat turns recorded yet. Ask something on the Interactive Chat page.")
+
+st.subheader("Cost Control")
+admission = get_admission_controller()
+project_usage = admission.project_usage()
+if project_usage:
+    st.dataframe([{"project": name, **usage} for name, usage in project_usage.items()])
+else:
+    st.caption("No LLM turns accounted yet.")
+if st.button("Write cost report"):
+    report_path = write_cost_report(admission)
+    st.success(f"Cost report written to {report_path}")
+
+st.subheader("Event Bus")
+new_events = event_bus.drain(st.session_state.event_subscription)
+st.session_state.recent_events = (st.session_state.recent_events + [
+    {"topic": e.topic, "source": e.source, "payload": str(e.payload)[:80], "published_at": datetime.fromtimestamp(e.published_at).strftime('%H:%M:%S')}
+    for e in new_events
+])[-50:]
+col1, col2 = st.columns(2)
+col1.metric("Events published", event_bus.bus.stats["published"])
+col2.metric("Deliveries", event_bus.bus.stats["delivered"])
+if st.session_state.recent_events:
+    st.dataframe(st.session_state.recent_events[::-1])
+
+st.subheader("Prometheus Export")
+metrics_text = telemetry.render_prometheus()
+st.code(metrics_text, language="text")
+st.download_button("Download metrics", metrics_text, file_name="charter_metrics.prom", mime="text/plain")
@@ -0,0 +1,95 @@
+"""
+LoRA adapters on the shared base model.
+
+Instead of one checkpoint per persona, personas with an `adapter` in
+configs/personas.yaml attach a lightweight LoRA adapter to the one resident base
+model. Loaded adapters are kept in an LRU cache, so switching to a recently used
+persona only flips the active adapter. Requires the optional `peft` package.
+"""
+
+import importlib.util
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# peft (and the torch it pulls in) is only imported once an adapter is attached
+PEFT_AVAILABLE = importlib.util.find_spec("peft") is not None
+
+# Adapters kept attached to the base model before the least recently used is dropped
+MAX_LOADED_ADAPTERS = 16
+
+
+class AdapterCache:
+    """LRU cache of LoRA adapters attached to one pipeline's base model."""
+
+    def __init__(self, max_loaded: int = MAX_LOADED_ADAPTERS):
+        self.max_loaded = max_loaded
+        self._loaded = OrderedDict()  # adapter name -> source path or hub id
+        self.active = None
+        self.stats = {"loads": 0, "hits": 0, "evictions": 0, "last_switch_ms": 0.0}
+
+    def loaded(self):
+        return list(self._loaded)
+
+    def activate(self, pipe, name: str, source: str) -> float:
+        """Attach (if needed) and enable an adapter. Returns the switch time in milliseconds."""
+        start = time.perf_counter()
+        if name in self._loaded:
+            self._loaded.move_to_end(name)
+            self.stats["hits"] += 1
+        else:
+            if not PEFT_AVAILABLE:
+                raise RuntimeError("peft is required for persona adapters")
+            from peft import PeftModel
+            if isinstance(pipe.model, PeftModel):
+                pipe.model.load_adapter(source, adapter_name=name)
+            else:
+                pipe.model = PeftModel.from_pretrained(pipe.model, source, adapter_name=name)
+            self._loaded[name] = source
+            self.stats["loads"] += 1
+            self._evict(pipe)
+        if self.active != name:
+            pipe.model.set_adapter(name)
+        pipe.model.base_model.enable_adapter_layers()
+        self.active = name
+        self.stats["last_switch_ms"] = (time.perf_counter() - start) * 1000
+        return self.stats["last_switch_ms"]
+
+    def deactivate(self, pipe):
+        """Run the plain base model (adapters stay loaded for later switches)."""
+        if self.active is not None and PEFT_AVAILABLE:
+            from peft import PeftModel
+            if isinstance(pipe.model, PeftModel):
+                pipe.model.base_model.disable_adapter_layers()
+        self.active = None
+
+    def _evict(self, pipe):
+        # The adapter just loaded is the most recent one, so it is never evicted
+        while len(self._loaded) > max(self.max_loaded, 1):
+            name, _ = self._loaded.popitem(last=False)
+            if self.active == name:
+                self.active = None
+            pipe.model.delete_adapter(name)
+            self.stats["evictions"] += 1
+
+
+def get_adapter_cache(pipe) -> Optional[AdapterCache]:
+    """The adapter cache of a pipeline, created on first use (None for non-PyTorch backends)."""
+    if pipe is None or getattr(pipe, "backend", "pytorch") != "pytorch":
+        return None
+    cache = getattr(pipe, "adapter_cache", None)
+    if cache is None:
+        cache = AdapterCache()
+        pipe.adapter_cache = cache
+    return cache
+
+
+def use_adapter(pipe, name: Optional[str] = None, source: Optional[str] = None) -> float:
+    """Activate a persona's adapter, or the plain base model when source is None. Call under the model lock."""
+    cache = get_adapter_cache(pipe)
+    if cache is None:
+        return 0.0
+    if source is None:
+        cache.deactivate(pipe)
+        return 0.0
+    return cache.activate(pipe, name, source)
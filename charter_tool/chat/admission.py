@@ -0,0 +1,325 @@
+"""
+Admission control and cost accounting for the shared chat model.
+
+Each session draws its turns from a token bucket sized from the project's monthly
+budget (`constraints.budget`), so one session cannot monopolize the CPU model. All
+sessions of a project also share one bucket of that size, so together they cannot
+spend more than the project's budget.
+When the estimated wait for the model exceeds the latency SLO taken from
+`constraints.performance`, turns are shed to the rules-based agent. Tokens in/out
+and compute seconds are accounted per session and project, and can be written as a
+cost report to generated/cost_control.md. Sessions idle for longer than idle_ttl are
+evicted with their bucket; their usage is folded into their project's totals.
+"""
+
+import pathlib
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+COST_REPORT_PATH = pathlib.Path(__file__).parent.parent.parent / "generated" / "cost_control.md"
+
+# Price of processed tokens (prompt + response) on the local model
+EUR_PER_1K_TOKENS = 0.01
+
+# Used when the project has no budget or performance constraint yet
+DEFAULT_MONTHLY_BUDGET_EUR = 500
+DEFAULT_SLO_SECONDS = 10.0
+
+SECONDS_PER_MONTH = 30 * 24 * 3600
+
+# A session may burst this many seconds' worth of its budget at once...
+BURST_SECONDS = 600
+# ...but always enough for one full turn
+MIN_BUCKET_TOKENS = 4096
+
+# Seconds without a turn after which a session's bucket and usage are evicted
+SESSION_IDLE_TTL = 60 * 60
+
+# Weight of the newest turn in the moving average of the model's service time
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+def parse_performance_slo(performance) -> float:
+    """'< 2 sec' -> 2.0 seconds."""
+    if isinstance(performance, (int, float)) and performance > 0:
+        return float(performance)
+    match = re.search(r"(\d+(?:\.\d+)?)\s*(ms|s|sec|seconds?)?\b", str(performance or ""))
+    if not match:
+        return DEFAULT_SLO_SECONDS
+    value = float(match.group(1))
+    return value / 1000 if match.group(2) == "ms" else value
+
+
+def monthly_budget(constraints: Optional[Dict]) -> float:
+    budget = (constraints or {}).get("budget")
+    return DEFAULT_MONTHLY_BUDGET_EUR if budget is None or budget == "" else float(budget)
+
+
+class TokenBucket:
+    """
+    Refills at `rate` tokens per second up to `capacity`. A turn is admitted while
+    the bucket is not empty and charged its actual tokens afterwards, so the level
+    may go negative and the session waits until the debt is refilled.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def consume(self, tokens: float):
+        self._refill()
+        self.tokens -= tokens
+
+    def seconds_until_available(self) -> float:
+        tokens = self.available()
+        if tokens > 0:
+            return 0.0
+        return (-tokens + 1) / self.rate if self.rate > 0 else float("inf")
+
+    def is_full(self) -> bool:
+        return self.available() >= self.capacity
+
+    @classmethod
+    def for_budget(cls, budget_eur: float) -> "TokenBucket":
+        if budget_eur <= 0:
+            # No budget: the model is never used
+            return cls(0.0, 0.0)
+        rate = budget_eur / EUR_PER_1K_TOKENS * 1000 / SECONDS_PER_MONTH
+        return cls(rate, max(rate * BURST_SECONDS, MIN_BUCKET_TOKENS))
+
+
+class AdmissionController:
+    """Per-session and per-project token buckets, queue-based load shedding and usage accounting."""
+
+    def __init__(self, idle_ttl: Optional[float] = SESSION_IDLE_TTL):
+        self.idle_ttl = idle_ttl
+        self._lock = threading.Lock()
+        self._buckets = {}  # session id -> TokenBucket
+        self._project_buckets = {}  # project -> (budget, TokenBucket)
+        self._usage = {}  # session id -> usage totals
+        self._last_seen = {}  # session id -> monotonic time of its last turn
+        self._evicted = {}  # project -> usage totals of evicted sessions
+        self.waiting = 0  # turns waiting for the model
+        self.avg_service_sec = None
+
+    def estimated_wait(self) -> float:
+        """Time a new turn would wait for the model behind those already queued."""
+        return self.waiting * (self.avg_service_sec or 0.0)
+
+    def admit(self, session_id: str, project: Optional[str] = None, constraints: Optional[Dict] = None):
+        """(True, None) if the turn may use the model, else (False, reason) to answer with the rules agent."""
+        budget = monthly_budget(constraints)
+        slo = parse_performance_slo((constraints or {}).get("performance"))
+        self.evict_idle()
+        with self._lock:
+            usage = self._session_usage(session_id, project, budget)
+            bucket = self._buckets.get(session_id)
+            if bucket is None or usage["budget_eur"] != budget:
+                bucket = self._buckets[session_id] = TokenBucket.for_budget(budget)
+                usage["budget_eur"] = budget
+            project_bucket = self._project_bucket(usage["project"], budget)
+            if budget <= 0:
+                usage["throttled"] += 1
+                return False, "the project has no budget for the model"
+            for scope, limit in (("session", bucket), ("project", project_bucket)):
+                if limit.available() <= 0:
+                    usage["throttled"] += 1
+                    return False, f"{scope} token budget exhausted, refills in {limit.seconds_until_available():.0f}s"
+            wait = self.estimated_wait()
+            if wait > slo:
+                usage["shed"] += 1
+                return False, f"model queue ~{wait:.1f}s exceeds the {slo:g}s SLO"
+            return True, None
+
+    @contextmanager
+    def queued(self):
+        """Count a turn as waiting for the model while the block runs."""
+        with self._lock:
+            self.waiting += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    def record(self, session_id: str, prompt_tokens: int, response_tokens: int, compute_seconds: float, shared: bool = False):
+        """
+        Charge a finished turn to its session. A shared turn was answered by another
+        session's identical generation, so it does not count towards the model's service time.
+        """
+        with self._lock:
+            usage = self._session_usage(session_id)
+            usage["turns"] += 1
+            usage["prompt_tokens"] += prompt_tokens
+            usage["response_tokens"] += response_tokens
+            usage["compute_seconds"] += compute_seconds
+            for bucket in (self._buckets.get(session_id), self._project_buckets.get(usage["project"] or "(unnamed)", (None, None))[1]):
+                if bucket is not None:
+                    bucket.consume(prompt_tokens + response_tokens)
+            if shared:
+                return
+            if self.avg_service_sec is None:
+                self.avg_service_sec = compute_seconds
+            else:
+                self.avg_service_sec += SERVICE_TIME_SMOOTHING * (compute_seconds - self.avg_service_sec)
+
+    def evict_idle(self) -> int:
+        """Drop sessions idle for longer than idle_ttl. Returns how many were dropped."""
+        if self.idle_ttl is None:
+            return 0
+        deadline = time.monotonic() - self.idle_ttl
+        with self._lock:
+            idle = [session_id for session_id, seen in self._last_seen.items() if seen < deadline]
+            for session_id in idle:
+                usage = self._usage.pop(session_id)
+                self._buckets.pop(session_id, None)
+                del self._last_seen[session_id]
+                total = self._evicted.setdefault(usage["project"] or "(unnamed)", {
+                    "sessions": 0, "budget_eur": usage["budget_eur"], "turns": 0, "prompt_tokens": 0,
+                    "response_tokens": 0, "compute_seconds": 0.0, "throttled": 0, "shed": 0,
+                })
+                total["sessions"] += 1
+                for key in ("turns", "prompt_tokens", "response_tokens", "compute_seconds", "throttled", "shed"):
+                    total[key] += usage[key]
+            # A project's bucket goes once its sessions are gone and it holds no debt
+            active = {usage["project"] or "(unnamed)" for usage in self._usage.values()}
+            for project in [p for p, (_, bucket) in self._project_buckets.items() if p not in active and bucket.is_full()]:
+                del self._project_buckets[project]
+        return len(idle)
+
+    def _project_bucket(self, project: str, budget: float) -> TokenBucket:
+        project = project or "(unnamed)"
+        current = self._project_buckets.get(project)
+        if current is None or current[0] != budget:
+            current = self._project_buckets[project] = (budget, TokenBucket.for_budget(budget))
+        return current[1]
+
+    def _session_usage(self, session_id: str, project: Optional[str] = None, budget: Optional[float] = None) -> Dict:
+        self._last_seen[session_id] = time.monotonic()
+        usage = self._usage.get(session_id)
+        if usage is None:
+            usage = self._usage[session_id] = {
+                "project": project or "", "budget_eur": budget or DEFAULT_MONTHLY_BUDGET_EUR,
+                "turns": 0, "prompt_tokens": 0, "response_tokens": 0, "compute_seconds": 0.0,
+                "throttled": 0, "shed": 0,
+            }
+        elif project:
+            usage["project"] = project
+        return usage
+
+    def usage(self) -> Dict[str, Dict]:
+        """Usage per session, with the estimated cost of its tokens."""
+        with self._lock:
+            sessions = {session_id: dict(usage) for session_id, usage in self._usage.items()}
+        for usage in sessions.values():
+            usage["cost_eur"] = (usage["prompt_tokens"] + usage["response_tokens"]) / 1000 * EUR_PER_1K_TOKENS
+        return sessions
+
+    def project_usage(self) -> Dict[str, Dict]:
+        """Usage summed per project, including its evicted sessions."""
+        projects = {}
+        for usage in self.usage().values():
+            total = projects.setdefault(usage["project"] or "(unnamed)", {
+                "sessions": 0, "budget_eur": usage["budget_eur"], "turns": 0, "prompt_tokens": 0,
+                "response_tokens": 0, "compute_seconds": 0.0, "throttled": 0, "shed": 0, "cost_eur": 0.0,
+            })
+            total["sessions"] += 1
+            for key in ("turns", "prompt_tokens", "response_tokens", "compute_seconds", "throttled", "shed", "cost_eur"):
+                total[key] += usage[key]
+        with self._lock:
+            evicted = {project: dict(usage) for project, usage in self._evicted.items()}
+        for project, usage in evicted.items():
+            total = projects.setdefault(project, {
+                "sessions": 0, "budget_eur": usage["budget_eur"], "turns": 0, "prompt_tokens": 0,
+                "response_tokens": 0, "compute_seconds": 0.0, "throttled": 0, "shed": 0, "cost_eur": 0.0,
+            })
+            for key in ("sessions", "turns", "prompt_tokens", "response_tokens", "compute_seconds", "throttled", "shed"):
+                total[key] += usage[key]
+            total["cost_eur"] += (usage["prompt_tokens"] + usage["response_tokens"]) / 1000 * EUR_PER_1K_TOKENS
+        return projects
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self._project_buckets.clear()
+            self._usage.clear()
+            self._last_seen.clear()
+            self._evicted.clear()
+            self.avg_service_sec = None
+
+
+def render_cost_report(controller: "AdmissionController") -> str:
+    """Markdown cost report of the sessions and projects seen by a controller."""
+    lines = [
+        "# Cost Control",
+        "",
+        f"_Generated {datetime.now().strftime('%Y-%m-%d %H:%M')} by `chat/admission.py`._",
+        "",
+        "Chat turns on the shared model are admitted through token buckets, one per session and one per project, refilled from",
+        f"the project's monthly budget (`constraints.budget`, default €{DEFAULT_MONTHLY_BUDGET_EUR}) at €{EUR_PER_1K_TOKENS} per 1k tokens,",
+        f"with bursts of up to {BURST_SECONDS // 60} minutes of budget. Turns are shed to the rules-based agent when the",
+        f"estimated wait for the model exceeds the response-time SLO (`constraints.performance`, default {DEFAULT_SLO_SECONDS:g}s).",
+        "",
+        "## Projects",
+        "",
+    ]
+    projects = controller.project_usage()
+    if not projects:
+        lines += ["No chat turns recorded yet.", ""]
+        return "\n".join(lines)
+    lines += [
+        "| Project | Sessions | Turns | Tokens in | Tokens out | Compute (s) | Cost (€) | Budget (€/month) | Throttled | Shed |",
+        "|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for name, usage in sorted(projects.items()):
+        lines.append(
+            f"| {name} | {usage['sessions']} | {usage['turns']} | {usage['prompt_tokens']} | {usage['response_tokens']} "
+            f"| {usage['compute_seconds']:.1f} | {usage['cost_eur']:.4f} | {usage['budget_eur']:g} "
+            f"| {usage['throttled']} | {usage['shed']} |"
+        )
+    lines += [
+        "",
+        "## Sessions",
+        "",
+        "| Session | Project | Turns | Tokens in | Tokens out | Compute (s) | Cost (€) | Throttled | Shed |",
+        "|---|---|---|---|---|---|---|---|---|",
+    ]
+    for session_id, usage in controller.usage().items():
+        lines.append(
+            f"| {session_id[:8]} | {usage['project'] or '(unnamed)'} | {usage['turns']} | {usage['prompt_tokens']} "
+            f"| {usage['response_tokens']} | {usage['compute_seconds']:.1f} | {usage['cost_eur']:.4f} "
+            f"| {usage['throttled']} | {usage['shed']} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def write_cost_report(controller: "AdmissionController", path=COST_REPORT_PATH) -> pathlib.Path:
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(render_cost_report(controller), encoding="utf-8")
+    return path
+
+
+_controller = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController()
+    return _controller
@@ -1,10 +1,25 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from datetime import datetime
 import streamlit as st
 
 from typing import List, Optional
 
+from chat import telemetry
+from chat.admission import get_admission_controller
+from chat.adapters import use_adapter
+from chat.models import DRAFT_MODEL_OPTIONS
+from chat import cpu_tuning, onnx_backend
+from chat.personas import copy_prefix_cache, get_persona_registry
+from chat.prompt_builder import get_prompt_builder, normalize_messages
+
 try:
-    from transformers import pipeline, AutoModelForCausalLM, AutoTokenizer
+    from transformers import pipeline, AutoModelForCausalLM, AutoTokenizer, StoppingCriteria, StoppingCriteriaList
     import torch
     HF_AVAILABLE = True
 except ImportError:
@@ -13,20 +28,152 @@ except ImportError:
 # Global cache for the pipeline
 _llm_pipeline = None
 
+# Generation runs one at a time on the shared model; waiting for it is the queue time
+_generation_lock = threading.RLock()
+
+# Single-flight loading: one load per key in progress, other callers wait on its Future
+_loads_lock = threading.Lock()
+_inflight_loads = {}
+
+# Negative cache of failed loads: key -> {"failures": n, "retry_at": monotonic time, "error": str}
+_load_failures = {}
+
+# Backoff before retrying a failed model load (doubles per failure)
+LOAD_RETRY_BASE_SECONDS = 5
+LOAD_RETRY_MAX_SECONDS = 600
+
+# Global cache for the assisted-decoding draft model
+_draft_model = None
+
+# Stats of each session's most recent chat turn (tokens/sec, draft acceptance rate,
+# shed reason); the least recently active sessions are dropped past MAX_TRACKED_SESSIONS
+_generation_stats = OrderedDict()
+_generation_stats_lock = threading.Lock()
+MAX_TRACKED_SESSIONS = 1024
+
 # Model selection (change as needed)
 HF_MODEL_NAME = "Qwen/Qwen2-7B-Instruct"  # or "meta-llama/Llama-3-8B-Instruct"
 
+# Generation backends: "pytorch" loads the HF checkpoint, "onnx" the artifact
+# exported ahead of time by chat/onnx_backend.py (ONNX Runtime on the CPU) and
+# "rules" answers with the keyword agent without loading a model (offline, load tests)
+BACKENDS = ("pytorch", "onnx", "rules")
+LLM_BACKEND = os.environ.get("CHARTER_LLM_BACKEND", "pytorch")
+
+# Markers where the model starts writing the next dialogue turn itself
+STOP_SEQUENCES = ["👤 You:", "\nYou:", "\nUser:"]
+
+# Keywords identifying the planning intent of a prompt (checked in order)
+INTENT_KEYWORDS = [
+    ("problem", ['problem', 'solve', 'issue']),
+    ("users", ['user', 'customer', 'people']),
+    ("interface", ['interface', 'ui', 'interaction']),
+    ("architecture", ['architecture', 'system', 'components']),
+    ("constraints", ['budget', 'cost', 'constraint']),
+    ("timeline", ['timeline', 'schedule', 'deadline']),
+]
+
+# Guided Questions categories of the chat page mapped to intents
+CATEGORY_INTENTS = {
+    "Problem Definition": "problem",
+    "User Analysis": "users",
+    "Interaction Design": "interface",
+    "Architecture": "architecture",
+    "Constraints": "constraints",
+}
+
+# Generation profile per intent. Most turns only need a short clarifying
+# question, so only architecture/timeline answers get the full token budget.
+GENERATION_PROFILES = {
+    "general": {"max_new_tokens": 96, "repetition_ngram": 6},
+    "problem": {"max_new_tokens": 160, "repetition_ngram": 6},
+    "users": {"max_new_tokens": 128, "repetition_ngram": 6},
+    "interface": {"max_new_tokens": 128, "repetition_ngram": 6},
+    "architecture": {"max_new_tokens": 256, "repetition_ngram": 8},
+    "constraints": {"max_new_tokens": 160, "repetition_ngram": 6},
+    "timeline": {"max_new_tokens": 192, "repetition_ngram": 8},
+}
+
+# Sampling settings passed to model.generate
+GENERATION_DEFAULTS = {"do_sample": True, "temperature": 0.7}
+
+# Former fixed budget, used to report the reduction in generated tokens
+BASELINE_MAX_NEW_TOKENS = 256
+
+# Generated tokens per intent across turns: {intent: {"turns": n, "tokens": n}}
+_generation_token_totals = {}
 
-def get_llm_pipeline(model_name=None):
+# Request coalescing: identical concurrent chat requests share one in-flight generation
+_requests_lock = threading.Lock()
+_inflight_requests = {}
+_coalescing_stats = {"requests": 0, "generations": 0, "deduplicated": 0}
+
+
+def _single_flight_load(key, loader):
+    """
+    Run loader() once per key even if many sessions ask at the same time; the others
+    wait for its result. A failed load is cached and retried only after an exponential
+    backoff, so callers in between get None at once (degraded mode).
+    """
+    with _loads_lock:
+        failure = _load_failures.get(key)
+        if failure and time.monotonic() < failure["retry_at"]:
+            return None
+        future = _inflight_loads.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _inflight_loads[key] = future
+    if not is_owner:
+        return future.result()
+
+    result, error = None, None
+    try:
+        result = loader()
+    except Exception as e:
+        error = str(e)
+        print(f"[LLM] Error loading {key}: {e}")
+    except BaseException as e:
+        # Interrupted (KeyboardInterrupt, SystemExit): release the waiting sessions too
+        with _loads_lock:
+            del _inflight_loads[key]
+        future.set_exception(e)
+        raise
+    with _loads_lock:
+        del _inflight_loads[key]
+        if result is None:
+            failures = _load_failures.get(key, {}).get("failures", 0) + 1
+            delay = min(LOAD_RETRY_BASE_SECONDS * 2 ** (failures - 1), LOAD_RETRY_MAX_SECONDS)
+            _load_failures[key] = {
+                "failures": failures,
+                "retry_at": time.monotonic() + delay,
+                "error": error or "loader returned None",
+            }
+        else:
+            _load_failures.pop(key, None)
+    future.set_result(result)
+    return result
+
+
+def _pipeline_key(model_name, backend):
+    return ("pipeline", model_name) if backend == "pytorch" else ("pipeline", model_name, backend)
+
+
+def _load_pipeline(model_name, backend="pytorch"):
     global _llm_pipeline
-    if model_name is None:
-        model_name = HF_MODEL_NAME
-    # If the pipeline is already loaded for this model, return it
-    if _llm_pipeline is not None and getattr(_llm_pipeline, 'model_name', None) == model_name:
-        return _llm_pipeline
-    if not HF_AVAILABLE:
-        return None
+    load_start = time.perf_counter()
     try:
+        # The host's tuned thread/pinning layout (see chat/cpu_tuning.py), applied before the weights load
+        cpu_profile = cpu_tuning.get_cpu_profile(model_name)
+        if backend == "onnx":
+            cpu_layout = cpu_tuning.apply_profile(cpu_profile)
+            pipe = onnx_backend.load_onnx_pipeline(model_name, session_options=cpu_tuning.onnx_session_options(cpu_profile))
+            pipe.cpu_layout = cpu_layout
+            pipe.generation_lock = _generation_lock
+            _llm_pipeline = pipe
+            telemetry.record_model_load(f"{model_name} (onnx)", time.perf_counter() - load_start)
+            return pipe
+        cpu_layout = cpu_tuning.apply_profile(cpu_profile) if not torch.cuda.is_available() else {}
         tokenizer = AutoTokenizer.from_pretrained(model_name)
         model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32)
         pipe = pipeline(
@@ -34,57 +181,442 @@ def get_llm_pipeline(model_name=None):
             model=model,
             tokenizer=tokenizer,
             device=0 if torch.cuda.is_available() else -1,
-            max_new_tokens=256,
             do_sample=True,
             temperature=0.7
         )
-        pipe.model_name = model_name  # Attach for cache check
-        _llm_pipeline = pipe
+    except Exception:
+        telemetry.record_model_load(model_name if backend == "pytorch" else f"{model_name} ({backend})", time.perf_counter() - load_start, success=False)
+        raise
+    pipe.model_name = model_name  # Attach for cache check
+    pipe.backend = "pytorch"
+    pipe.cpu_layout = cpu_layout
+    pipe.generation_lock = _generation_lock  # Shared with persona prefix/adapter setup
+    _llm_pipeline = pipe
+    telemetry.record_model_load(model_name, time.perf_counter() - load_start)
+    return pipe
+
+
+def _backend_available(backend):
+    if backend == "rules":
+        return False
+    return onnx_backend.ORT_AVAILABLE if backend == "onnx" else HF_AVAILABLE
+
+
+def get_llm_pipeline(model_name=None, backend=None):
+    """The resident pipeline for a model, loaded on first use with the given backend (default LLM_BACKEND)."""
+    if model_name is None:
+        model_name = HF_MODEL_NAME
+    backend = backend or LLM_BACKEND
+    # If the pipeline is already loaded for this model and backend, return it
+    if (_llm_pipeline is not None and getattr(_llm_pipeline, 'model_name', None) == model_name
+            and getattr(_llm_pipeline, 'backend', 'pytorch') == backend):
         return _llm_pipeline
-    except Exception as e:
-        print(f"[LLM] Error loading model: {e}")
+    if not _backend_available(backend):
+        return None
+    return _single_flight_load(_pipeline_key(model_name, backend), lambda: _load_pipeline(model_name, backend))
+
+
+def get_model_status(model_name: Optional[str] = None, backend: Optional[str] = None) -> dict:
+    """
+    Whether chat runs in degraded mode (rules fallback) for a model, and why.
+    Degraded means the backend's packages are missing or the last load failed and is backing off.
+    """
+    model_name = model_name or HF_MODEL_NAME
+    backend = backend or LLM_BACKEND
+    if backend == "rules":
+        return {"degraded": False, "reason": None, "retry_in": None}
+    if not _backend_available(backend):
+        missing = "optimum/onnxruntime" if backend == "onnx" else "transformers/torch"
+        return {"degraded": True, "reason": f"{missing} not installed", "retry_in": None}
+    key = _pipeline_key(model_name, backend)
+    with _loads_lock:
+        failure = _load_failures.get(key)
+        loading = key in _inflight_loads
+    if failure:
+        retry_in = max(failure["retry_at"] - time.monotonic(), 0.0)
+        return {"degraded": True, "reason": failure["error"], "retry_in": retry_in, "failures": failure["failures"]}
+    return {"degraded": False, "reason": "loading" if loading else None, "retry_in": None}
+
+
+def is_degraded(model_name: Optional[str] = None, backend: Optional[str] = None) -> bool:
+    return get_model_status(model_name, backend)["degraded"]
+
+
+def classify_prompt_intent(prompt: str, category: Optional[str] = None) -> str:
+    """Pick the planning intent of a prompt, preferring an explicit Guided Questions category."""
+    if category in CATEGORY_INTENTS:
+        return CATEGORY_INTENTS[category]
+    prompt_lower = prompt.lower()
+    for intent, keywords in INTENT_KEYWORDS:
+        if any(word in prompt_lower for word in keywords):
+            return intent
+    return "general"
+
+
+def get_generation_profile(intent: str) -> dict:
+    """Token budget and stopping settings for an intent."""
+    profile = dict(GENERATION_PROFILES.get(intent, GENERATION_PROFILES["general"]))
+    profile.setdefault("stop_sequences", STOP_SEQUENCES)
+    return profile
+
+
+def truncate_at_stop_sequence(text: str, stop_sequences: List[str]) -> str:
+    """Cut generated text at the first stop sequence."""
+    cut = len(text)
+    for stop in stop_sequences:
+        index = text.find(stop)
+        if index != -1:
+            cut = min(cut, index)
+    return text[:cut]
+
+
+def is_repeating(token_ids: List[int], ngram: int) -> bool:
+    """True if the last n-gram of the generated tokens already occurred earlier."""
+    if ngram <= 0 or len(token_ids) < 2 * ngram:
+        return False
+    tail = token_ids[-ngram:]
+    for start in range(len(token_ids) - 2 * ngram + 1):
+        if token_ids[start:start + ngram] == tail:
+            return True
+    return False
+
+
+if HF_AVAILABLE:
+    class StopOnSequences(StoppingCriteria):
+        """Stop once the newly generated text contains a stop sequence."""
+
+        def __init__(self, tokenizer, stop_sequences, prompt_length):
+            self.tokenizer = tokenizer
+            self.stop_sequences = stop_sequences
+            self.prompt_length = prompt_length
+
+        def __call__(self, input_ids, scores, **kwargs):
+            tail = self.tokenizer.decode(input_ids[0, self.prompt_length:][-16:], skip_special_tokens=True)
+            done = any(stop in tail for stop in self.stop_sequences)
+            return torch.full((input_ids.shape[0],), done, dtype=torch.bool, device=input_ids.device)
+
+    class StopOnRepetition(StoppingCriteria):
+        """Stop once the model starts repeating an n-gram it already generated."""
+
+        def __init__(self, ngram, prompt_length):
+            self.ngram = ngram
+            self.prompt_length = prompt_length
+
+        def __call__(self, input_ids, scores, **kwargs):
+            done = is_repeating(input_ids[0, self.prompt_length:].tolist(), self.ngram)
+            return torch.full((input_ids.shape[0],), done, dtype=torch.bool, device=input_ids.device)
+
+    class NotifyFirstToken(StoppingCriteria):
+        """Never stops; tells the telemetry timer when the first new token exists."""
+
+        def __init__(self, turn):
+            self.turn = turn
+
+        def __call__(self, input_ids, scores, **kwargs):
+            self.turn.first_token()
+            return torch.zeros((input_ids.shape[0],), dtype=torch.bool, device=input_ids.device)
+
+
+def record_generated_tokens(intent: str, new_tokens: int):
+    totals = _generation_token_totals.setdefault(intent, {"turns": 0, "tokens": 0})
+    totals["turns"] += 1
+    totals["tokens"] += new_tokens
+
+
+def get_generation_token_report() -> dict:
+    """Average generated tokens per turn, overall and per intent, against the fixed 256-token budget."""
+    turns = sum(t["turns"] for t in _generation_token_totals.values())
+    tokens = sum(t["tokens"] for t in _generation_token_totals.values())
+    average = tokens / turns if turns else 0.0
+    return {
+        "turns": turns,
+        "avg_tokens_per_turn": round(average, 1),
+        "baseline_max_new_tokens": BASELINE_MAX_NEW_TOKENS,
+        "reduction_pct": round((1 - average / BASELINE_MAX_NEW_TOKENS) * 100, 1) if turns else 0.0,
+        "per_intent": {
+            intent: round(t["tokens"] / t["turns"], 1)
+            for intent, t in _generation_token_totals.items() if t["turns"]
+        },
+    }
+
+
+def get_draft_model(draft_model_name):
+    """
+    Load the small draft model used for assisted decoding. The main model verifies
+    the tokens it proposes, so output quality is that of the main model.
+    """
+    if _draft_model is not None and getattr(_draft_model, 'model_name', None) == draft_model_name:
+        return _draft_model
+    if not HF_AVAILABLE:
         return None
+    return _single_flight_load(("draft", draft_model_name), lambda: _load_draft_model(draft_model_name))
+
+
+def _load_draft_model(draft_model_name):
+    global _draft_model
+    draft = AutoModelForCausalLM.from_pretrained(draft_model_name, torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32)
+    if torch.cuda.is_available():
+        draft = draft.to("cuda")
+    draft.model_name = draft_model_name  # Attach for cache check
+    _draft_model = draft
+    return _draft_model
+
+
+def _count_forward_calls(model):
+    """Attach a forward hook counting how many times the model runs. Returns (counter, handle)."""
+    counter = {"calls": 0}
+    if not hasattr(model, "register_forward_hook"):
+        # ONNX Runtime models are not torch modules; their calls are not counted
+        return counter, None
+
+    def hook(module, inputs, output):
+        counter["calls"] += 1
+
+    return counter, model.register_forward_hook(hook)
+
+
+def compute_generation_stats(new_tokens: int, elapsed: float, main_calls: int = 0, draft_calls: int = 0, intent: str = "general") -> dict:
+    """
+    Summarize a generation. With assisted decoding every main-model forward pass
+    yields one token of its own, so the remaining tokens are accepted draft tokens.
+    """
+    stats = {
+        "new_tokens": new_tokens,
+        "elapsed_sec": round(elapsed, 3),
+        "tokens_per_sec": round(new_tokens / elapsed, 2) if elapsed > 0 else 0.0,
+        "assisted": draft_calls > 0,
+        "intent": intent,
+    }
+    if draft_calls > 0:
+        accepted = max(new_tokens - main_calls, 0)
+        stats["draft_tokens"] = draft_calls
+        stats["accepted_tokens"] = accepted
+        stats["acceptance_rate"] = round(min(accepted / draft_calls, 1.0), 3)
+    return stats
+
+
+def _record_generation_stats(session_id: Optional[str], stats: dict):
+    with _generation_stats_lock:
+        key = session_id or "default"
+        _generation_stats[key] = stats
+        _generation_stats.move_to_end(key)
+        while len(_generation_stats) > MAX_TRACKED_SESSIONS:
+            _generation_stats.popitem(last=False)
+
+
+def get_last_generation_stats(session_id: Optional[str] = None) -> dict:
+    """Stats of a session's most recent chat turn (empty if the rules fallback answered)."""
+    with _generation_stats_lock:
+        return dict(_generation_stats.get(session_id or "default", {}))
+
+
+def request_key(prompt: str, history=None, model_name: Optional[str] = None, system_context: Optional[str] = None, draft_model_name: Optional[str] = None, category: Optional[str] = None, adapter: Optional[tuple] = None, context: Optional[str] = None) -> tuple:
+    """
+    Coalescing key of a chat request: model, prompt (with its retrieved sections),
+    hash of the conversation (system context and history) and the decoding parameters the request would run with.
+    """
+    messages = normalize_messages(prompt, history, system_context, context)
+    context_hash = hashlib.sha1(json.dumps(messages[:-1], sort_keys=True).encode("utf-8")).hexdigest()
+    intent = classify_prompt_intent(prompt, category)
+    decoding = json.dumps({**GENERATION_DEFAULTS, **get_generation_profile(intent)}, sort_keys=True)
+    return (model_name or HF_MODEL_NAME, messages[-1]["content"], context_hash, decoding, draft_model_name, tuple(adapter or ()))
+
+
+def get_coalescing_stats() -> dict:
+    """Chat requests received, generations actually run, and requests served by another's generation."""
+    with _requests_lock:
+        return dict(_coalescing_stats)
 
 
 # Placeholder for a real LLM agent (OpenAI, etc.)
-def llm_chat_agent(prompt: str, history: Optional[List[str]] = None, model_name: Optional[str] = None, system_context: Optional[str] = None):
+def llm_chat_agent(prompt: str, history: Optional[List[str]] = None, model_name: Optional[str] = None, system_context: Optional[str] = None, draft_model_name: Optional[str] = None, category: Optional[str] = None, prefix_state: Optional[dict] = None, adapter: Optional[tuple] = None, session_id: Optional[str] = None, project: Optional[str] = None, constraints: Optional[dict] = None, context: Optional[str] = None):
     """
     Use a HuggingFace LLM for chat. Falls back to the keyword-based agent if transformers is not available or model fails to load.
+    If draft_model_name is given, generation uses assisted decoding with that draft model.
+    The token budget and stop criteria come from the generation profile of the prompt's intent
+    (taken from the Guided Questions category when given).
+    The prompt is built with the model's chat template; history may be chat message dicts or strings.
+    A prefix_state (see chat.personas) supplies the precomputed KV cache of the system prompt.
+    adapter is the (name, source) of a LoRA adapter to run on the base model; None runs the plain base model.
+    context holds the charter sections retrieved for the prompt; they go in front of it in the user turn.
+    Identical concurrent requests (see request_key) share one generation. Each of them is
+    still admitted and charged the generation's tokens on its own session.
+    With a session_id, the turn goes through admission control (see chat.admission) against the
+    project's constraints and is answered by the rules agent if the session is over budget or the
+    model queue is over the latency SLO.
     """
+    key = request_key(prompt, history, model_name, system_context, draft_model_name, category, adapter, context)
+    with _requests_lock:
+        _coalescing_stats["requests"] += 1
+        future = _inflight_requests.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _inflight_requests[key] = future
+            _coalescing_stats["generations"] += 1
+        else:
+            _coalescing_stats["deduplicated"] += 1
+    if not is_owner:
+        # An identical request is generating right now; share its answer
+        admission = get_admission_controller()
+        if session_id is not None and get_llm_pipeline(model_name) is not None:
+            admitted, reason = admission.admit(session_id, project, constraints)
+            if not admitted:
+                _record_generation_stats(session_id, {"shed_reason": reason})
+                return rules_chat_agent(prompt)
+        response, stats = future.result()
+        if session_id is not None and "new_tokens" in stats:
+            # The model ran once for all of them; the follower pays its tokens but no compute time
+            admission.record(session_id, stats["prompt_tokens"], stats["new_tokens"], 0.0, shared=True)
+        _record_generation_stats(session_id, {**stats, "coalesced": True} if stats else {})
+        return response
+    try:
+        response, stats = _generate_chat_response(prompt, history, model_name, system_context, draft_model_name, category, prefix_state, adapter, session_id, project, constraints, context)
+    except BaseException as e:
+        with _requests_lock:
+            del _inflight_requests[key]
+        future.set_exception(e)
+        raise
+    with _requests_lock:
+        del _inflight_requests[key]
+    future.set_result((response, stats))
+    _record_generation_stats(session_id, stats)
+    return response
+
+
+def _generate_chat_response(prompt, history, model_name, system_context, draft_model_name, category, prefix_state, adapter, session_id=None, project=None, constraints=None, context=None):
+    """The response to a chat turn and the stats of its generation."""
+    intent = classify_prompt_intent(prompt, category)
     pipe = get_llm_pipeline(model_name)
+    admission = get_admission_controller()
+    shed_stats = {}
+    if pipe is not None and session_id is not None:
+        admitted, reason = admission.admit(session_id, project, constraints)
+        if not admitted:
+            # Load shedding: answer from the rules agent instead of queueing on the model
+            shed_stats = {"shed_reason": reason}
+            pipe = None
     if pipe is not None:
+        backend = getattr(pipe, "backend", "pytorch")
+        turn = telemetry.start_turn(pipe.model_name, backend="llm" if backend == "pytorch" else backend)
+        prompt_length = 0
         try:
-            # Optionally, prepend system context and history for context
-            full_prompt = prompt
-            if system_context:
-                full_prompt = system_context.strip() + "\n\n" + prompt
-            if history:
-                full_prompt = (system_context.strip() + "\n\n" if system_context else "") + "\n".join(history + [prompt])
-            result = pipe(full_prompt, max_new_tokens=256)
-            if isinstance(result, list) and len(result) > 0:
-                return result[0]["generated_text"][len(full_prompt):].strip()
-            return str(result)
+            # Encoded system context and previous turns are reused from the builder's cache
+            messages = normalize_messages(prompt, history, system_context, context)
+            prompt_ids = get_prompt_builder(pipe.model_name, pipe.tokenizer).encode(messages)
+            prompt_length = len(prompt_ids)
+            input_ids = torch.tensor([prompt_ids], device=pipe.model.device)
+            profile = get_generation_profile(intent)
+            generate_kwargs = {
+                **GENERATION_DEFAULTS,
+                "attention_mask": torch.ones_like(input_ids),
+                "pad_token_id": pipe.tokenizer.pad_token_id if pipe.tokenizer.pad_token_id is not None else pipe.tokenizer.eos_token_id,
+                "max_new_tokens": profile["max_new_tokens"],
+                "stopping_criteria": StoppingCriteriaList([
+                    StopOnSequences(pipe.tokenizer, profile["stop_sequences"], prompt_length),
+                    StopOnRepetition(profile["repetition_ngram"], prompt_length),
+                ]),
+            }
+            if prefix_state and prompt_ids[:len(prefix_state["prefix_ids"])] == prefix_state["prefix_ids"]:
+                # Only the tokens after the persona's system prompt need prefilling
+                past_key_values = copy_prefix_cache(prefix_state)
+                if past_key_values is not None:
+                    generate_kwargs["past_key_values"] = past_key_values
+            if telemetry.is_enabled():
+                generate_kwargs["stopping_criteria"].append(NotifyFirstToken(turn))
+            # Assisted decoding and adapters need the PyTorch model
+            draft = get_draft_model(draft_model_name) if draft_model_name and backend == "pytorch" else None
+            with admission.queued(), _generation_lock:
+                turn.queue_acquired()
+                use_adapter(pipe, *(adapter or (None, None)))
+                main_counter, main_hook = _count_forward_calls(pipe.model)
+                draft_counter, draft_hook = (None, None)
+                if draft is not None:
+                    generate_kwargs["assistant_model"] = draft
+                    draft_counter, draft_hook = _count_forward_calls(draft)
+                turn.generation_started()
+                start = time.perf_counter()
+                try:
+                    with torch.no_grad():
+                        output_ids = pipe.model.generate(input_ids, **generate_kwargs)
+                finally:
+                    if main_hook is not None:
+                        main_hook.remove()
+                    if draft_hook is not None:
+                        draft_hook.remove()
+                elapsed = time.perf_counter() - start
+            # Only the newly generated tokens are decoded
+            new_ids = output_ids[0, prompt_length:]
+            generated = pipe.tokenizer.decode(new_ids, skip_special_tokens=True)
+            new_tokens = len(new_ids)
+            record_generated_tokens(intent, new_tokens)
+            stats = compute_generation_stats(
+                new_tokens, elapsed,
+                main_calls=main_counter["calls"],
+                draft_calls=draft_counter["calls"] if draft_counter else 0,
+                intent=intent,
+            )
+            stats["prompt_tokens"] = prompt_length
+            stats["backend"] = backend
+            admission.record(session_id or "default", prompt_length, new_tokens, elapsed)
+            turn.finish(prompt_tokens=prompt_length, response_tokens=new_tokens)
+            return truncate_at_stop_sequence(generated, profile["stop_sequences"]).strip(), stats
         except Exception as e:
             print(f"[LLM] Generation error: {e}")
-            return "[LLM Error] Could not generate a response."
+            turn.finish(prompt_tokens=prompt_length, error=True)
+            return "[LLM Error] Could not generate a response.", {}
     # Fallback to rules-based agent
-    prompt_lower = prompt.lower()
-    if any(word in prompt_lower for word in ['problem', 'solve', 'issue']):
-        return "Great! Understanding the problem is crucial. Can you be more specific about the current pain points and what metrics you'd use to measure success?"
-    elif any(word in prompt_lower for word in ['user', 'customer', 'people']):
-        return "User analysis is key! Tell me more about their technical skills and how they currently handle this process. Are they technical or non-technical users?"
-    elif any(word in prompt_lower for word in ['interface', 'ui', 'interaction']):
-        return "Interface design is important! Are you thinking of a chat interface, web dashboard, API, or something else? What would work best for your users?"
-    elif any(word in prompt_lower for word in ['architecture', 'system', 'components']):
-        return "Let's break down the system architecture. What specialized functions do you need? Think about data processing, analysis, storage, and user interface components."
-    elif any(word in prompt_lower for word in ['budget', 'cost', 'constraint']):
-        return "Constraints help guide technical decisions. What's your budget, performance requirements, and any compliance needs like GDPR or security standards?"
-    elif any(word in prompt_lower for word in ['timeline', 'schedule', 'deadline']):
-        return "Timeline planning is crucial! What's your target go-live date? Should we plan for phases like prototype, development, testing, and deployment?"
-    else:
-        return "That's an interesting point! Can you elaborate on how this fits into your overall project goals? I'm here to help you structure your AI project effectively."
-
-# Multi-agent support (future extension)
-def multi_agent_chat(prompt: str, agent_type: str = "default", history=None, model_name=None, system_context=None):
-    # For now, just use the default agent
-    return llm_chat_agent(prompt, history, model_name, system_context)
+    turn = telemetry.start_turn(model_name or HF_MODEL_NAME, backend="rules")
+    turn.queue_acquired()
+    response = rules_chat_agent(prompt)
+    turn.finish()
+    return response, shed_stats
+
+
+# Canned answers of the rules-based agent, per intent
+RULES_RESPONSES = {
+    "problem": "Great! Understanding the problem is crucial. Can you be more specific about the current pain points and what metrics you'd use to measure success?",
+    "users": "User analysis is key! Tell me more about their technical skills and how they currently handle this process. Are they technical or non-technical users?",
+    "interface": "Interface design is important! Are you thinking of a chat interface, web dashboard, API, or something else? What would work best for your users?",
+    "architecture": "Let's break down the system architecture. What specialized functions do you need? Think about data processing, analysis, storage, and user interface components.",
+    "constraints": "Constraints help guide technical decisions. What's your budget, performance requirements, and any compliance needs like GDPR or security standards?",
+    "timeline": "Timeline planning is crucial! What's your target go-live date? Should we plan for phases like prototype, development, testing, and deployment?",
+    "general": "That's an interesting point! Can you elaborate on how this fits into your overall project goals? I'm here to help you structure your AI project effectively.",
+}
+
+
+def rules_chat_agent(prompt: str) -> str:
+    """Keyword-based agent used when no LLM is available."""
+    return RULES_RESPONSES[classify_prompt_intent(prompt)]
+
+
+def switch_persona(persona_id: str, model_name: Optional[str] = None, session_key: str = "default") -> float:
+    """
+    Activate a persona for a session and return the switch latency in milliseconds.
+    If the model is already resident its prefix state is precomputed now; the model is never loaded here.
+    """
+    model_name = model_name or HF_MODEL_NAME
+    pipe = _llm_pipeline if getattr(_llm_pipeline, 'model_name', None) == model_name else None
+    return get_persona_registry().switch(persona_id, pipe, session_key)
+
+
+# Multi-agent support: agent_type selects a persona from configs/personas.yaml
+def multi_agent_chat(prompt: str, agent_type: str = "default", history=None, model_name=None, system_context=None, draft_model_name=None, category=None, session_id=None, project=None, constraints=None, context=None):
+    registry = get_persona_registry()
+    persona = registry.get(agent_type)
+    session_info = {"session_id": session_id, "project": project, "constraints": constraints, "context": context}
+    if persona is None:
+        # Not a persona: the default planning agent
+        return llm_chat_agent(prompt, history, model_name, system_context, draft_model_name, category, **session_info)
+    # Personas share the resident model; only their adapter and precomputed prefix state differ
+    adapter = persona.adapter_spec
+    try:
+        prefix_state = registry.prefix_state(persona.id, get_llm_pipeline(model_name))
+    except Exception as e:
+        # The adapter could not be activated (e.g. peft is missing): run the persona on the base model
+        print(f"[LLM] Adapter of persona {persona.id} unavailable, using the base model: {e}")
+        prefix_state, adapter = None, None
+    return llm_chat_agent(
+        prompt, persona.retained_history(history), model_name, persona.system_prompt,
+        draft_model_name, category, prefix_state=prefix_state, adapter=adapter, **session_info,
+    )
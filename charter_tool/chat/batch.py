@@ -0,0 +1,277 @@
+"""
+Offline batch generation for many planning prompts.
+
+`run` reads a JSONL of prompts. Each line holds {"id", "prompt"} and optionally
+"system_context", "category" and "history". Each prompt is encoded with the
+model's chat template. Prompts are grouped by token budget and sorted by length,
+so each padded batch wastes few pad tokens. Batches are left-padded and
+generated together. Every row stops on its own stop sequence or repetition, and
+the finished rows ride along as padding. Results are appended to the output
+JSONL after each batch and synced to disk. The output file is therefore the
+checkpoint: a rerun skips the ids already written and drops a half-written
+last line.
+
+    python charter_tool/chat/batch.py build --output prompts.jsonl        # every Guided Question x every saved project
+    python charter_tool/chat/batch.py run --input prompts.jsonl --output answers.jsonl --batch-size 8
+
+Without a loadable model (or with --backend rules) the prompts are answered by
+the rules agent, as in the chat.
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+if not __package__:
+    # Run as a script: make the app's packages importable
+    sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+from chat import agent
+from chat.prompt_builder import get_prompt_builder, normalize_messages
+
+if agent.HF_AVAILABLE:
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+CONFIGS_DIR = pathlib.Path(__file__).parent.parent.parent / "configs"
+
+# Prompts generated together in one padded batch
+DEFAULT_BATCH_SIZE = 8
+
+
+def read_prompts(path) -> List[Dict]:
+    """Prompts of a JSONL file; a line without an "id" gets its line number."""
+    prompts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                item = json.loads(line)
+                item.setdefault("id", str(number))
+                prompts.append(item)
+    return prompts
+
+
+def project_prompts(configs_dir=CONFIGS_DIR) -> List[Dict]:
+    """Every Guided Question asked about every saved project, with its charter as context."""
+    from utils.exports import generate_project_charter
+    from utils.project import PLANNING_QUESTIONS
+    prompts = []
+    for path in sorted(pathlib.Path(configs_dir).glob("project_config_*.json")):
+        with open(path, "r") as f:
+            config = json.load(f)
+        charter = generate_project_charter(config)
+        for category, questions in PLANNING_QUESTIONS.items():
+            for index, question in enumerate(questions):
+                prompts.append({
+                    "id": f"{path.stem}:{category}:{index}",
+                    "prompt": question,
+                    "category": category,
+                    "system_context": charter,
+                })
+    return prompts
+
+
+def completed_ids(output_path) -> Set[str]:
+    """
+    Ids already written to the output. A last line cut off by an interrupted run is
+    truncated away, so the file only holds whole results before appending resumes.
+    """
+    path = pathlib.Path(output_path)
+    if not path.exists():
+        return set()
+    done = set()
+    good_bytes = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                item_id = json.loads(line)["id"]
+            except (ValueError, KeyError):
+                break
+            if not line.endswith(b"\n"):
+                break
+            done.add(item_id)
+            good_bytes += len(line)
+    if good_bytes < path.stat().st_size:
+        with open(path, "r+b") as f:
+            f.truncate(good_bytes)
+    return done
+
+
+def bucket_batches(items: List[Dict], batch_size: int) -> List[List[Dict]]:
+    """
+    Batches of prompts with the same token budget and similar lengths. Each item
+    has "ids" (prompt tokens) and "max_new_tokens".
+    """
+    ordered = sorted(items, key=lambda item: (item["max_new_tokens"], len(item["ids"])))
+    batches = []
+    for item in ordered:
+        if batches and len(batches[-1]) < batch_size and batches[-1][0]["max_new_tokens"] == item["max_new_tokens"]:
+            batches[-1].append(item)
+        else:
+            batches.append([item])
+    return batches
+
+
+def padding_efficiency(batches: List[List[Dict]]) -> float:
+    """Share of real prompt tokens among all (padded) prompt positions."""
+    real = sum(len(item["ids"]) for batch in batches for item in batch)
+    padded = sum(len(batch) * max(len(item["ids"]) for item in batch) for batch in batches)
+    return real / padded if padded else 1.0
+
+
+if agent.HF_AVAILABLE:
+    class StopRowsOnSequences(StoppingCriteria):
+        """Per-row stop once a row's new text contains a stop sequence."""
+
+        def __init__(self, tokenizer, stop_sequences, prompt_length):
+            self.tokenizer = tokenizer
+            self.stop_sequences = stop_sequences
+            self.prompt_length = prompt_length
+
+        def __call__(self, input_ids, scores, **kwargs):
+            tails = self.tokenizer.batch_decode(input_ids[:, self.prompt_length:][:, -16:], skip_special_tokens=True)
+            done = [any(stop in tail for stop in self.stop_sequences) for tail in tails]
+            return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+
+    class StopRowsOnRepetition(StoppingCriteria):
+        """Per-row stop once a row repeats an n-gram it already generated."""
+
+        def __init__(self, ngram, prompt_length):
+            self.ngram = ngram
+            self.prompt_length = prompt_length
+
+        def __call__(self, input_ids, scores, **kwargs):
+            done = [agent.is_repeating(row.tolist(), self.ngram) for row in input_ids[:, self.prompt_length:]]
+            return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+
+
+def generate_batch(pipe, batch: List[Dict]) -> List[Dict]:
+    """Generate one bucket of prompts together. Returns {"response", "new_tokens"} per item."""
+    tokenizer = pipe.tokenizer
+    pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+    prompt_length = max(len(item["ids"]) for item in batch)
+    # Decoder-only models continue from the last position, so padding goes on the left
+    input_ids = torch.tensor([[pad_token_id] * (prompt_length - len(item["ids"])) + item["ids"] for item in batch], device=pipe.model.device)
+    attention_mask = torch.tensor([[0] * (prompt_length - len(item["ids"])) + [1] * len(item["ids"]) for item in batch], device=pipe.model.device)
+    profile = batch[0]["profile"]
+    with agent._generation_lock, torch.no_grad():
+        output_ids = pipe.model.generate(
+            input_ids,
+            **agent.GENERATION_DEFAULTS,
+            attention_mask=attention_mask,
+            pad_token_id=pad_token_id,
+            max_new_tokens=profile["max_new_tokens"],
+            stopping_criteria=StoppingCriteriaList([
+                StopRowsOnSequences(tokenizer, profile["stop_sequences"], prompt_length),
+                StopRowsOnRepetition(profile["repetition_ngram"], prompt_length),
+            ]),
+        )
+    results = []
+    for row in output_ids[:, prompt_length:].tolist():
+        # Rows that finished early are filled up with pad tokens
+        while row and row[-1] == pad_token_id:
+            row.pop()
+        text = tokenizer.decode(row, skip_special_tokens=True)
+        results.append({
+            "response": agent.truncate_at_stop_sequence(text, profile["stop_sequences"]).strip(),
+            "new_tokens": len(row),
+        })
+    return results
+
+
+def _prepare(pipe, item: Dict) -> Dict:
+    intent = agent.classify_prompt_intent(item["prompt"], item.get("category"))
+    profile = agent.get_generation_profile(intent)
+    prepared = {"item": item, "intent": intent, "profile": profile, "max_new_tokens": profile["max_new_tokens"], "ids": []}
+    if pipe is not None:
+        messages = normalize_messages(item["prompt"], item.get("history"), item.get("system_context"))
+        prepared["ids"] = get_prompt_builder(pipe.model_name, pipe.tokenizer).encode(messages)
+    return prepared
+
+
+def run_batch(input_path, output_path, model_name: Optional[str] = None, backend: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE, log: Callable[[str], None] = print) -> Dict:
+    """Answer every prompt of input_path not yet in output_path. Returns the run's stats."""
+    prompts = read_prompts(input_path)
+    done = completed_ids(output_path)
+    pending = [item for item in prompts if item["id"] not in done]
+    pipe = agent.get_llm_pipeline(model_name, backend)
+    backend_used = getattr(pipe, "backend", "pytorch") if pipe is not None else "rules"
+    if pipe is None and pending:
+        log(f"[Batch] No model ({agent.get_model_status(model_name, backend)['reason'] or 'rules backend'}); answering with the rules agent")
+
+    batches = bucket_batches([_prepare(pipe, item) for item in pending], batch_size)
+    stats = {
+        "prompts": len(prompts),
+        "resumed": len(done),
+        "generated": 0,
+        "batches": len(batches),
+        "new_tokens": 0,
+        "elapsed_sec": 0.0,
+        "tokens_per_sec": 0.0,
+        "padding_efficiency": round(padding_efficiency(batches), 3) if pipe is not None else None,
+        "backend": backend_used,
+    }
+    start = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as out:
+        for number, batch in enumerate(batches, 1):
+            if pipe is not None:
+                results = generate_batch(pipe, batch)
+            else:
+                results = [{"response": agent.rules_chat_agent(p["item"]["prompt"]), "new_tokens": 0} for p in batch]
+            for prepared, result in zip(batch, results, strict=True):
+                out.write(json.dumps({
+                    "id": prepared["item"]["id"],
+                    "prompt": prepared["item"]["prompt"],
+                    "response": result["response"],
+                    "intent": prepared["intent"],
+                    "prompt_tokens": len(prepared["ids"]),
+                    "new_tokens": result["new_tokens"],
+                    "backend": backend_used,
+                }) + "\n")
+                stats["new_tokens"] += result["new_tokens"]
+            # The output is the checkpoint: a batch counts as done once it is on disk
+            out.flush()
+            os.fsync(out.fileno())
+            stats["generated"] += len(batch)
+            elapsed = time.perf_counter() - start
+            log(f"[Batch] {number}/{len(batches)}: {stats['generated']}/{len(pending)} prompts, {stats['new_tokens'] / elapsed if elapsed else 0:.1f} tok/s")
+    stats["elapsed_sec"] = round(time.perf_counter() - start, 2)
+    stats["tokens_per_sec"] = round(stats["new_tokens"] / stats["elapsed_sec"], 2) if stats["elapsed_sec"] else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch generation of planning prompts with checkpoint/resume")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="write every Guided Question x every saved project as a prompts JSONL")
+    build.add_argument("--output", type=pathlib.Path, required=True)
+    build.add_argument("--configs", type=pathlib.Path, default=CONFIGS_DIR)
+    run = commands.add_parser("run", help="answer a prompts JSONL (resumes into an existing output)")
+    run.add_argument("--input", type=pathlib.Path, required=True)
+    run.add_argument("--output", type=pathlib.Path, required=True)
+    run.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    run.add_argument("--model", help="model to generate with (default: the agent's HF_MODEL_NAME)")
+    run.add_argument("--backend", choices=list(agent.BACKENDS), help="generation backend (default: CHARTER_LLM_BACKEND)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        prompts = project_prompts(args.configs)
+        with open(args.output, "w", encoding="utf-8") as f:
+            for item in prompts:
+                f.write(json.dumps(item) + "\n")
+        print(f"📝 {len(prompts)} prompts written to {args.output}")
+        return
+
+    stats = run_batch(args.input, args.output, args.model, args.backend, args.batch_size)
+    if stats["resumed"]:
+        print(f"⏩ Resumed: {stats['resumed']} prompts were already answered")
+    print(f"✅ {stats['generated']} prompts in {stats['batches']} batches, {stats['elapsed_sec']}s on {stats['backend']}")
+    if stats["new_tokens"]:
+        print(f"⚡ {stats['new_tokens']} tokens, {stats['tokens_per_sec']} tok/s, padding efficiency {stats['padding_efficiency']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+CPU thread and affinity tuning for local inference.
+
+On CPU-only hosts the torch defaults (one intra-op thread per logical CPU, SMT
+siblings included, no pinning) either oversubscribe the cores or leave them
+idle. `tune` benchmarks greedy generation of the configured model over a grid of
+layouts: thread counts, pinning (none, compact logical CPUs, one CPU per physical
+core) and N replicas, each pinned to its own core group and run concurrently.
+Every candidate runs in a fresh process, because torch fixes its inter-op pool
+at first use. The layout with the best total tokens/sec is stored per host in
+configs/cpu_profiles/<host>.json, and `get_llm_pipeline` applies it when it
+loads the model.
+
+    python charter_tool/chat/cpu_tuning.py tune [--model NAME] [--max-replicas 4]
+    python charter_tool/chat/cpu_tuning.py show
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+PROFILES_DIR = pathlib.Path(__file__).parent.parent.parent / "configs" / "cpu_profiles"
+SYS_CPU_DIR = pathlib.Path("/sys/devices/system/cpu")
+
+# Generated tokens per benchmark run (after a short warm-up)
+BENCH_TOKENS = 32
+WARMUP_TOKENS = 4
+BENCH_PROMPT = "Summarize the goals of an AI project charter in three sentences."
+
+# Largest number of pinned replicas tried by default
+MAX_REPLICAS = 4
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """CPUs of a kernel cpu list such as "0-3,8,10-11"."""
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus += range(int(first), int(last) + 1)
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def available_cpus() -> List[int]:
+    """Logical CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+# CPUs of the host as the process started (a profile pins the process to fewer)
+HOST_CPUS = available_cpus()
+
+
+def physical_cores(cpus: Optional[List[int]] = None, sys_cpu_dir: pathlib.Path = SYS_CPU_DIR) -> List[List[int]]:
+    """The available CPUs grouped by physical core (SMT siblings together)."""
+    cpus = HOST_CPUS if cpus is None else cpus
+    allowed = set(cpus)
+    cores, seen = [], set()
+    for cpu in cpus:
+        if cpu in seen:
+            continue
+        try:
+            siblings = parse_cpu_list((sys_cpu_dir / f"cpu{cpu}" / "topology" / "thread_siblings_list").read_text())
+        except OSError:
+            siblings = [cpu]
+        core = [c for c in siblings if c in allowed] or [cpu]
+        seen.update(core)
+        cores.append(core)
+    return cores
+
+
+def _thread_counts(n: int) -> List[int]:
+    counts, t = [], 1
+    while t < n:
+        counts.append(t)
+        t *= 2
+    return counts + [n]
+
+
+def candidate_layouts(cores: List[List[int]], max_replicas: int = MAX_REPLICAS) -> List[Dict]:
+    """
+    Layouts to benchmark for a core topology. A layout is a list of replica groups,
+    each with its intra-op thread count and the CPUs it is pinned to (None = unpinned).
+    """
+    logical = sorted(c for core in cores for c in core)
+    one_per_core = [core[0] for core in cores]
+    layouts = []
+    for threads in _thread_counts(len(logical)):
+        layouts.append({"pinning": "none", "groups": [{"threads": threads, "cpus": None}]})
+        layouts.append({"pinning": "compact", "groups": [{"threads": threads, "cpus": logical[:threads]}]})
+    if len(one_per_core) < len(logical):
+        for threads in _thread_counts(len(one_per_core)):
+            layouts.append({"pinning": "physical", "groups": [{"threads": threads, "cpus": one_per_core[:threads]}]})
+    replicas = 2
+    while replicas <= min(max_replicas, len(cores)):
+        size = len(cores) // replicas
+        groups = [sorted(c for core in cores[i * size:(i + 1) * size] for c in core) for i in range(replicas)]
+        layouts.append({"pinning": "replicas", "groups": [{"threads": len(group), "cpus": group} for group in groups]})
+        replicas *= 2
+    return layouts
+
+
+def describe(layout: Dict) -> str:
+    groups = layout["groups"]
+    if len(groups) > 1:
+        return f"{len(groups)} replicas × {groups[0]['threads']} threads"
+    return f"{groups[0]['threads']} threads, {layout['pinning']} pinning"
+
+
+def _replica_group(profile: Dict, replica: Optional[int]) -> Dict:
+    # A single process runs the best one-group layout; replica i of a multi-process deployment its own group
+    if replica is None:
+        return profile.get("single", profile)["groups"][0]
+    return profile["groups"][replica % len(profile["groups"])]
+
+
+def _pin_process(cpus: List[int]):
+    """Pin every thread of this process (sched_setaffinity(0) only pins the calling thread)."""
+    try:
+        thread_ids = [int(tid) for tid in os.listdir("/proc/self/task")]
+    except OSError:
+        thread_ids = [0]
+    for tid in thread_ids:
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except OSError:
+            pass  # the thread exited meanwhile
+
+
+def apply_profile(profile: Optional[Dict], replica: Optional[int] = None) -> Dict:
+    """
+    Apply a tuned layout to this process: pin it to the layout's CPUs and set the
+    torch thread counts. Call before the model is loaded. Returns what was applied.
+    """
+    if not profile:
+        return {}
+    group = _replica_group(profile, replica)
+    applied = {"threads": group["threads"], "cpus": group["cpus"]}
+    if group["cpus"] and hasattr(os, "sched_setaffinity"):
+        _pin_process(group["cpus"])
+    if TORCH_AVAILABLE:
+        torch.set_num_threads(group["threads"])
+        try:
+            torch.set_num_interop_threads(profile.get("inter_op_threads", 1))
+        except RuntimeError:
+            # Fixed once torch ran parallel work in this process
+            applied["inter_op_threads"] = torch.get_num_interop_threads()
+        else:
+            applied["inter_op_threads"] = profile.get("inter_op_threads", 1)
+    return applied
+
+
+def onnx_session_options(profile: Optional[Dict], replica: Optional[int] = None):
+    """ONNX Runtime session options with the profile's thread count (None without a profile)."""
+    if not profile:
+        return None
+    import onnxruntime
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = _replica_group(profile, replica)["threads"]
+    options.inter_op_num_threads = profile.get("inter_op_threads", 1)
+    return options
+
+
+def profile_path(host: Optional[str] = None, profiles_dir: pathlib.Path = PROFILES_DIR) -> pathlib.Path:
+    return pathlib.Path(profiles_dir) / f"{host or socket.gethostname()}.json"
+
+
+def load_profile(model_name: str, host: Optional[str] = None, profiles_dir: pathlib.Path = PROFILES_DIR) -> Optional[Dict]:
+    """The tuned profile of a model on this host; None if untuned or tuned for other CPUs."""
+    try:
+        with open(profile_path(host, profiles_dir), "r") as f:
+            profile = json.load(f).get("models", {}).get(model_name)
+    except (OSError, ValueError):
+        return None
+    if profile is None or profile.get("cpus") != HOST_CPUS:
+        return None
+    return profile
+
+
+def save_profile(model_name: str, profile: Dict, host: Optional[str] = None, profiles_dir: pathlib.Path = PROFILES_DIR) -> pathlib.Path:
+    path = profile_path(host, profiles_dir)
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {"host": host or socket.gethostname(), "models": {}}
+    data["models"][model_name] = profile
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    tmp_path.replace(path)
+    return path
+
+
+_profiles = {}
+
+
+def get_cpu_profile(model_name: str) -> Optional[Dict]:
+    """The tuned profile of a model on this host, read once per process."""
+    if model_name not in _profiles:
+        _profiles[model_name] = load_profile(model_name)
+    return _profiles[model_name]
+
+
+def _bench_replica(model_name: str, profile: Dict, replica: int, tokens: int) -> Dict:
+    """Worker: apply one replica's layout, load the model and time greedy generation."""
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+    apply_profile(profile, replica)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32)
+    input_ids = tokenizer.apply_chat_template([{"role": "user", "content": BENCH_PROMPT}], add_generation_prompt=True, return_tensors="pt")
+    pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+    kwargs = {"attention_mask": torch.ones_like(input_ids), "do_sample": False, "pad_token_id": pad_token_id}
+    with torch.no_grad():
+        model.generate(input_ids, max_new_tokens=WARMUP_TOKENS, **kwargs)
+        start = time.perf_counter()
+        output_ids = model.generate(input_ids, max_new_tokens=tokens, min_new_tokens=tokens, **kwargs)
+    elapsed = time.perf_counter() - start
+    new_tokens = output_ids.shape[1] - input_ids.shape[1]
+    return {"tokens_per_sec": new_tokens / elapsed}
+
+
+def run_layout(model_name: str, layout: Dict, tokens: int = BENCH_TOKENS) -> float:
+    """Total tokens/sec of a layout: one fresh process per replica, all generating at once."""
+    workers = [
+        subprocess.Popen(
+            [sys.executable, __file__, "_bench", model_name, json.dumps(layout), str(replica), str(tokens)],
+            stdout=subprocess.PIPE, text=True,
+        )
+        for replica in range(len(layout["groups"]))
+    ]
+    total = 0.0
+    for worker in workers:
+        output, _ = worker.communicate()
+        if worker.returncode != 0:
+            raise RuntimeError(f"benchmark worker failed for {describe(layout)}")
+        total += json.loads(output.strip().splitlines()[-1])["tokens_per_sec"]
+    return total
+
+
+def tune(model_name: str, layouts: List[Dict], run: Callable[[str, Dict], float] = run_layout, log: Callable[[str], None] = print) -> Dict:
+    """Benchmark every layout and return the fastest as a profile (with all results)."""
+    results = []
+    for layout in layouts:
+        try:
+            tokens_per_sec = run(model_name, layout)
+        except Exception as e:
+            log(f"   {describe(layout)}: failed ({e})")
+            continue
+        log(f"   {describe(layout)}: {tokens_per_sec:.2f} tok/s")
+        results.append({**layout, "tokens_per_sec": round(tokens_per_sec, 2)})
+    if not results:
+        raise RuntimeError("no layout could be benchmarked")
+    best = max(results, key=lambda r: r["tokens_per_sec"])
+    single = max((r for r in results if len(r["groups"]) == 1), key=lambda r: r["tokens_per_sec"], default=best)
+    baseline = next((r for r in results if r["pinning"] == "none" and r["groups"][0]["threads"] == len(HOST_CPUS)), None)
+    return {
+        **best,
+        "single": {key: single[key] for key in ("pinning", "groups", "tokens_per_sec")},
+        "inter_op_threads": 1,
+        "cpus": HOST_CPUS,
+        "tuned_at": datetime.now().isoformat(timespec="seconds"),
+        "default_tokens_per_sec": baseline["tokens_per_sec"] if baseline else None,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune CPU threads and pinning for local inference")
+    commands = parser.add_subparsers(dest="command", required=True)
+    tune_parser = commands.add_parser("tune", help="benchmark layouts and store the best one for this host")
+    tune_parser.add_argument("--model", help="model to tune for (default: the agent's HF_MODEL_NAME)")
+    tune_parser.add_argument("--max-replicas", type=int, default=MAX_REPLICAS)
+    tune_parser.add_argument("--tokens", type=int, default=BENCH_TOKENS)
+    commands.add_parser("show", help="show the profiles stored for this host")
+    bench_parser = commands.add_parser("_bench")  # internal: one benchmark worker
+    bench_parser.add_argument("model")
+    bench_parser.add_argument("layout")
+    bench_parser.add_argument("replica", type=int)
+    bench_parser.add_argument("tokens", type=int)
+    args = parser.parse_args()
+
+    if args.command == "_bench":
+        print(json.dumps(_bench_replica(args.model, json.loads(args.layout), args.replica, args.tokens)))
+        return
+
+    if args.command == "show":
+        path = profile_path()
+        if not path.exists():
+            print(f"⏳ No CPU profiles for {socket.gethostname()} yet (run `tune`)")
+            return
+        with open(path, "r") as f:
+            for model_name, profile in json.load(f)["models"].items():
+                print(f"🧵 {model_name}: {describe(profile)} → {profile['tokens_per_sec']} tok/s (defaults: {profile['default_tokens_per_sec']} tok/s, tuned {profile['tuned_at']})")
+                print(f"   single process: {describe(profile['single'])} → {profile['single']['tokens_per_sec']} tok/s")
+        return
+
+    if not TORCH_AVAILABLE:
+        print("❌ torch and transformers are required to tune generation")
+        sys.exit(1)
+    model_name = args.model
+    if model_name is None:
+        sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+        from chat.agent import HF_MODEL_NAME
+        model_name = HF_MODEL_NAME
+    cores = physical_cores()
+    layouts = candidate_layouts(cores, args.max_replicas)
+    print(f"🧪 Tuning {model_name} on {len(HOST_CPUS)} CPUs / {len(cores)} cores: {len(layouts)} layouts")
+    profile = tune(model_name, layouts, run=lambda name, layout: run_layout(name, layout, args.tokens))
+    path = save_profile(model_name, profile)
+    print(f"✅ Best: {describe(profile)} at {profile['tokens_per_sec']} tok/s (defaults: {profile['default_tokens_per_sec']} tok/s) → {path}")
+
+
+if __name__ == "__main__":
+    main()
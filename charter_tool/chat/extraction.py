@@ -0,0 +1,436 @@
+"""
+Structured extraction from the chat transcript into project_config.
+
+Each user answer is turned into the fields of the Dashboard tabs (users, system
+components, constraints, timeline) in a single generation: the LLM writes one JSON
+object for all fields, and decoding is constrained so only JSON matching
+EXTRACTION_SCHEMA (options from the Dashboard, numbers, ISO dates) can come out.
+Results are cached per message, so re-running the extraction only processes new
+messages. Without an LLM, a keyword matcher fills the same schema.
+"""
+
+import contextlib
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from utils.project import COMPLIANCE_OPTIONS, PERFORMANCE_OPTIONS, PHASES, SYSTEM_COMPONENTS, USER_TYPES
+
+try:
+    from transformers import LogitsProcessor, LogitsProcessorList
+    import torch
+    HF_AVAILABLE = True
+except ImportError:
+    HF_AVAILABLE = False
+
+# JSON-schema subset the decoder enforces: every property, in this order, always present
+EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "users": {"type": "array", "items": {"enum": USER_TYPES}},
+        "system_components": {"type": "array", "items": {"enum": SYSTEM_COMPONENTS}},
+        "constraints": {
+            "type": "object",
+            "properties": {
+                "budget": {"type": "integer", "nullable": True},
+                "performance": {"enum": PERFORMANCE_OPTIONS, "nullable": True},
+                "compliance": {"type": "array", "items": {"enum": COMPLIANCE_OPTIONS}},
+            },
+        },
+        "timeline": {
+            "type": "object",
+            "properties": {
+                "start_date": {"type": "date", "nullable": True},
+                "end_date": {"type": "date", "nullable": True},
+                "phases": {"type": "array", "items": {"enum": PHASES}},
+            },
+        },
+    },
+}
+
+# Longest JSON answer generated per message
+MAX_EXTRACTION_TOKENS = 160
+
+# Candidate tokens checked against the schema per decoding step (by logit)
+CANDIDATE_TOKENS = 32
+
+# Cached per-message results
+MAX_CACHED_MESSAGES = 1024
+
+_message_cache = OrderedDict()
+_cache_stats = {"processed": 0, "cached": 0}
+
+
+class _Incomplete(Exception):
+    """The text ended before the value did (a valid prefix so far)."""
+
+
+class _Invalid(Exception):
+    """The text cannot be extended into a value matching the schema."""
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+def _literal(text: str, pos: int, literal: str) -> int:
+    rest = text[pos:pos + len(literal)]
+    if rest == literal:
+        return pos + len(literal)
+    if literal.startswith(rest):
+        raise _Incomplete
+    raise _Invalid
+
+
+def _match_enum(options: List[str], text: str, pos: int) -> int:
+    rest = text[pos:]
+    incomplete = False
+    for option in options:
+        encoded = json.dumps(option)
+        if rest.startswith(encoded):
+            return pos + len(encoded)
+        if encoded.startswith(rest):
+            incomplete = True
+    if incomplete:
+        raise _Incomplete
+    raise _Invalid
+
+
+def _match_integer(text: str, pos: int) -> int:
+    end = pos
+    while end < len(text) and text[end].isdigit() and end - pos < 9:
+        end += 1
+    if end == len(text):
+        raise _Incomplete
+    if end == pos:
+        raise _Invalid
+    return end
+
+
+_DATE_TEMPLATE = '"dddd-dd-dd"'
+
+
+def _match_date(text: str, pos: int) -> int:
+    for i, expected in enumerate(_DATE_TEMPLATE):
+        if pos + i >= len(text):
+            raise _Incomplete
+        char = text[pos + i]
+        if char != expected and not (expected == "d" and char.isdigit()):
+            raise _Invalid
+    return pos + len(_DATE_TEMPLATE)
+
+
+def _match_array(schema: Dict, text: str, pos: int) -> int:
+    pos = _skip_ws(text, _literal(text, pos, "["))
+    if pos >= len(text):
+        raise _Incomplete
+    if text[pos] == "]":
+        return pos + 1
+    while True:
+        pos = _skip_ws(text, _match_value(schema["items"], text, pos))
+        if pos >= len(text):
+            raise _Incomplete
+        if text[pos] == "]":
+            return pos + 1
+        pos = _skip_ws(text, _literal(text, pos, ","))
+
+
+def _match_object(schema: Dict, text: str, pos: int) -> int:
+    pos = _literal(text, pos, "{")
+    for i, (name, prop) in enumerate(schema["properties"].items()):
+        if i:
+            pos = _literal(text, _skip_ws(text, pos), ",")
+        pos = _literal(text, _skip_ws(text, pos), json.dumps(name))
+        pos = _literal(text, _skip_ws(text, pos), ":")
+        pos = _match_value(prop, text, _skip_ws(text, pos))
+    return _literal(text, _skip_ws(text, pos), "}")
+
+
+def _match_value(schema: Dict, text: str, pos: int) -> int:
+    if pos >= len(text):
+        raise _Incomplete
+    if schema.get("nullable") and text[pos] == "n":
+        return _literal(text, pos, "null")
+    if "enum" in schema:
+        return _match_enum(schema["enum"], text, pos)
+    kind = schema["type"]
+    if kind == "object":
+        return _match_object(schema, text, pos)
+    if kind == "array":
+        return _match_array(schema, text, pos)
+    if kind == "integer":
+        return _match_integer(text, pos)
+    if kind == "date":
+        return _match_date(text, pos)
+    raise ValueError(f"Unsupported schema type: {kind}")
+
+
+def check_json_prefix(text: str, schema: Dict = EXTRACTION_SCHEMA) -> str:
+    """'complete', 'partial' (can still become valid) or 'invalid' for generated text."""
+    try:
+        end = _match_value(schema, text, _skip_ws(text, 0))
+    except _Incomplete:
+        return "partial"
+    except _Invalid:
+        return "invalid"
+    return "complete" if not text[end:].strip() else "invalid"
+
+
+if HF_AVAILABLE:
+    class SchemaLogitsProcessor(LogitsProcessor):
+        """
+        Masks every token that would make the generated text stop being a prefix of
+        schema-valid JSON. Only the top CANDIDATE_TOKENS by logit are checked; once the
+        JSON is complete only EOS is allowed.
+        """
+
+        def __init__(self, tokenizer, prompt_length: int, schema: Dict = EXTRACTION_SCHEMA):
+            self.tokenizer = tokenizer
+            self.prompt_length = prompt_length
+            self.schema = schema
+
+        def __call__(self, input_ids, scores):
+            generated = input_ids[0, self.prompt_length:].tolist()
+            text = self.tokenizer.decode(generated, skip_special_tokens=True)
+            allowed = []
+            if check_json_prefix(text, self.schema) == "complete":
+                allowed = [self.tokenizer.eos_token_id]
+            else:
+                for token_id in torch.topk(scores[0], CANDIDATE_TOKENS).indices.tolist():
+                    candidate = self.tokenizer.decode(generated + [token_id], skip_special_tokens=True)
+                    if candidate != text and check_json_prefix(candidate, self.schema) != "invalid":
+                        allowed.append(token_id)
+                if not allowed:
+                    # The model has no valid continuation among its top tokens; give up
+                    allowed = [self.tokenizer.eos_token_id]
+            mask = torch.full_like(scores, float("-inf"))
+            mask[:, allowed] = 0
+            return scores + mask
+
+
+def _skeleton() -> str:
+    return json.dumps({
+        "users": [], "system_components": [],
+        "constraints": {"budget": None, "performance": None, "compliance": []},
+        "timeline": {"start_date": None, "end_date": None, "phases": []},
+    })
+
+
+def _extraction_messages(question: Optional[str], answer: str) -> List[Dict[str, str]]:
+    system = (
+        "Extract project planning details from the user's answer. Reply with JSON only, in exactly this shape:\n"
+        f"{_skeleton()}\n"
+        f"users: any of {USER_TYPES}. system_components: any of {SYSTEM_COMPONENTS}. "
+        f"budget: monthly euros as an integer. performance: one of {PERFORMANCE_OPTIONS}. "
+        f"compliance: any of {COMPLIANCE_OPTIONS}. dates: YYYY-MM-DD. phases: any of {PHASES}. "
+        "Use [] or null for anything the answer does not state."
+    )
+    user = f"Question: {question}\nAnswer: {answer}" if question else answer
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+
+def llm_extract(pipe, question: Optional[str], answer: str) -> Optional[Dict]:
+    """All fields from one answer in a single schema-constrained generation (None on failure)."""
+    if not HF_AVAILABLE or pipe is None:
+        return None
+    try:
+        prompt_ids = pipe.tokenizer.apply_chat_template(_extraction_messages(question, answer), add_generation_prompt=True, tokenize=True)
+        input_ids = torch.tensor([prompt_ids], device=pipe.model.device)
+        model_lock = getattr(pipe, "generation_lock", None) or contextlib.nullcontext()
+        with model_lock, torch.no_grad():
+            output_ids = pipe.model.generate(
+                input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                do_sample=False,
+                max_new_tokens=MAX_EXTRACTION_TOKENS,
+                logits_processor=LogitsProcessorList([SchemaLogitsProcessor(pipe.tokenizer, len(prompt_ids))]),
+                pad_token_id=pipe.tokenizer.pad_token_id if pipe.tokenizer.pad_token_id is not None else pipe.tokenizer.eos_token_id,
+            )
+        text = pipe.tokenizer.decode(output_ids[0, len(prompt_ids):], skip_special_tokens=True)
+        if check_json_prefix(text) != "complete":
+            return None
+        return _compact(json.loads(text))
+    except Exception as e:
+        print(f"[LLM] Extraction error: {e}")
+        return None
+
+
+# Phrases that point to a Dashboard option, besides the option's own name
+KEYWORDS = {
+    "users": {
+        "Technical Users": ["technical user", "developer", "engineer"],
+        "Business Users": ["business user", "manager", "stakeholder"],
+        "End Customers": ["end customer", "customer", "end user", "client"],
+        "Analysts": ["analyst"],
+        "Administrators": ["administrator", "admin"],
+    },
+    "system_components": {
+        "Data Ingestion": ["ingestion", "ingest"],
+        "Data Processing": ["data processing", "etl"],
+        "ML Models": ["ml model", "machine learning", "classifier", "llm"],
+        "API Gateway": ["api gateway", "rest api", "api"],
+        "User Interface": ["user interface", "frontend", "ui"],
+        "Database": ["database", "postgres", "sql"],
+        "Cache Layer": ["cache", "redis"],
+        "Message Queue": ["message queue", "kafka", "rabbitmq"],
+        "Authentication": ["authentication", "login", "sso"],
+        "Monitoring": ["monitoring", "alerting"],
+        "Logging": ["logging", "logs"],
+        "Analytics": ["analytics", "reporting"],
+    },
+    "compliance": {option: [option.lower()] for option in COMPLIANCE_OPTIONS},
+    "phases": {option: [option.lower()] for option in PHASES},
+}
+
+_BUDGET = re.compile(r"(?:€|eur\b|euros?\b|\$)\s*(\d[\d,.]*)\s*(k\b)?|(\d[\d,.]*)\s*(k\b)?\s*(?:€|eur\b|euros?\b|\$)", re.I)
+_LATENCY = re.compile(r"(\d+(?:\.\d+)?)\s*(ms|milliseconds?|s|secs?|seconds?)\b", re.I)
+_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+_END_HINT = re.compile(r"go-live|go live|launch|deadline|\bby\b|\bend\b|finish", re.I)
+
+
+def _match_keywords(text: str, keywords: Dict[str, List[str]]) -> List[str]:
+    return [
+        option for option, phrases in keywords.items()
+        if any(re.search(rf"\b{re.escape(phrase)}s?\b", text) for phrase in phrases)
+    ]
+
+
+def _parse_amount(digits: str, thousands: Optional[str]) -> Optional[int]:
+    try:
+        value = float(digits.replace(",", "").rstrip("."))
+    except ValueError:
+        return None
+    return int(value * 1000 if thousands else value)
+
+
+def rules_extract(question: Optional[str], answer: str) -> Dict:
+    """Keyword-based extraction into the same shape as llm_extract."""
+    text = answer.lower()
+    result = {
+        "users": _match_keywords(text, KEYWORDS["users"]),
+        "system_components": _match_keywords(text, KEYWORDS["system_components"]),
+        "constraints": {"compliance": _match_keywords(text, KEYWORDS["compliance"])},
+        "timeline": {"phases": _match_keywords(text, KEYWORDS["phases"])},
+    }
+    budget = _BUDGET.search(answer)
+    if budget:
+        result["constraints"]["budget"] = _parse_amount(budget.group(1) or budget.group(3), budget.group(2) or budget.group(4))
+    latency = _LATENCY.search(answer)
+    if latency:
+        seconds = float(latency.group(1)) / (1000 if latency.group(2).lower().startswith("m") else 1)
+        # The loosest option that still meets the stated requirement
+        fitting = [option for option in PERFORMANCE_OPTIONS if float(option.split()[1]) <= seconds]
+        result["constraints"]["performance"] = fitting[-1] if fitting else PERFORMANCE_OPTIONS[0]
+    dates = sorted(_DATE.findall(answer))
+    if len(dates) >= 2:
+        result["timeline"]["start_date"], result["timeline"]["end_date"] = dates[0], dates[-1]
+    elif dates:
+        result["timeline"]["end_date" if _END_HINT.search(answer) else "start_date"] = dates[0]
+    return _compact(result)
+
+
+def _compact(result: Dict) -> Dict:
+    """Drop empty lists, nulls and options that are not in the schema."""
+    compact = {}
+    for name, prop in EXTRACTION_SCHEMA["properties"].items():
+        value = result.get(name)
+        if prop["type"] == "object":
+            inner = {}
+            for key, inner_prop in prop["properties"].items():
+                item = (value or {}).get(key)
+                if inner_prop.get("type") == "array":
+                    item = [v for v in item or [] if v in inner_prop["items"]["enum"]]
+                elif "enum" in inner_prop and item not in inner_prop["enum"]:
+                    item = None
+                if item not in (None, []):
+                    inner[key] = item
+            if inner:
+                compact[name] = inner
+        else:
+            items = [v for v in value or [] if v in prop["items"]["enum"]]
+            if items:
+                compact[name] = items
+    return compact
+
+
+def merge_extractions(results: List[Dict]) -> Dict:
+    """Combine per-message results in order: lists are unioned, later scalars win."""
+    merged = {}
+    for result in results:
+        for name, value in result.items():
+            if isinstance(value, dict):
+                target = merged.setdefault(name, {})
+                for key, item in value.items():
+                    if isinstance(item, list):
+                        target[key] = target.get(key, []) + [v for v in item if v not in target.get(key, [])]
+                    else:
+                        target[key] = item
+            else:
+                merged[name] = merged.get(name, []) + [v for v in value if v not in merged.get(name, [])]
+    return merged
+
+
+def _cache_key(backend: str, question: Optional[str], answer: str) -> str:
+    return hashlib.sha1(f"{backend}\x00{question or ''}\x00{answer}".encode("utf-8")).hexdigest()
+
+
+def extract_from_transcript(messages: List[Dict], pipe=None) -> Tuple[Dict, Dict]:
+    """
+    Extract project fields from every user answer of a chat transcript (with the
+    assistant question before it as context). Returns (merged fields, stats); only
+    messages not seen before are sent to the model.
+    """
+    backend = getattr(pipe, "model_name", None) or "rules"
+    results = []
+    stats = {"messages": 0, "processed": 0, "cached": 0, "backend": backend}
+    question = None
+    for message in messages:
+        if message.get("role") != "user":
+            question = str(message.get("content", ""))
+            continue
+        answer = str(message.get("content", ""))
+        stats["messages"] += 1
+        key = _cache_key(backend, question, answer)
+        result = _message_cache.get(key)
+        if result is None:
+            result = llm_extract(pipe, question, answer) if pipe is not None else None
+            if result is None:
+                result = rules_extract(question, answer)
+            _message_cache[key] = result
+            if len(_message_cache) > MAX_CACHED_MESSAGES:
+                _message_cache.popitem(last=False)
+            stats["processed"] += 1
+            _cache_stats["processed"] += 1
+        else:
+            _message_cache.move_to_end(key)
+            stats["cached"] += 1
+            _cache_stats["cached"] += 1
+        results.append(result)
+        question = None
+    return merge_extractions(results), stats
+
+
+def apply_extraction(project_config: Dict, extracted: Dict) -> List[str]:
+    """Merge extracted fields into a project config. Returns the names of the fields that changed."""
+    changed = []
+    for name, value in extracted.items():
+        if isinstance(value, dict):
+            target = project_config.get(name)
+            if not isinstance(target, dict):
+                target = project_config[name] = {}
+            for key, item in value.items():
+                new = target.get(key, []) + [v for v in item if v not in target.get(key, [])] if isinstance(item, list) else item
+                if new != target.get(key):
+                    target[key] = new
+                    changed.append(f"{name}.{key}")
+        else:
+            current = project_config.get(name) or []
+            new = current + [v for v in value if v not in current]
+            if new != current:
+                project_config[name] = new
+                changed.append(name)
+    return changed
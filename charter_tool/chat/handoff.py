@@ -0,0 +1,163 @@
+"""
+Conversation handoff between sessions.
+
+A snapshot holds the chat messages, the active persona and model and, optionally,
+the token IDs of the encoded conversation and the system context (for contexts
+the resuming session cannot rebuild itself). Sections retrieved for a user turn
+travel with its message. It is serialized to a compact, versioned
+binary blob (zlib-compressed JSON, token IDs packed as uint32) and stored under a
+short handoff token, so another session or device can resume the conversation.
+The resuming session restores the persona and model first, then seeds its prompt
+builder with the token IDs for the system context of that persona, so it does not
+re-tokenize the whole history.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import os
+import pathlib
+import secrets
+import time
+import zlib
+from array import array
+from typing import Dict, List, Optional
+
+from chat.prompt_builder import lookup_prompt_cache, seed_prompt_cache, with_context
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAGIC = b"CHS"
+
+HANDOFF_DIR = pathlib.Path(__file__).parent.parent.parent / "configs" / "handoffs"
+
+# Handoff tokens expire after a day
+HANDOFF_TTL_SECONDS = 24 * 3600
+
+
+def _pack_ids(token_ids: List[int]) -> str:
+    return base64.b64encode(array("I", token_ids).tobytes()).decode("ascii")
+
+
+def _unpack_ids(data: str) -> List[int]:
+    packed = array("I")
+    packed.frombytes(base64.b64decode(data))
+    return packed.tolist()
+
+
+def _system_hash(system_context: Optional[str]) -> str:
+    return hashlib.sha1((system_context or "").strip().encode("utf-8")).hexdigest()
+
+
+def _conversation(messages: List[Dict], system_context: Optional[str]) -> List[Dict[str, str]]:
+    """Messages as the prompt builder sees them: system context first, role/content only (see normalize_messages)."""
+    conversation = []
+    if system_context and system_context.strip():
+        conversation.append({"role": "system", "content": system_context.strip()})
+    conversation += [{"role": m["role"], "content": with_context(str(m["content"]), m.get("context"))} for m in messages]
+    return conversation
+
+
+def create_snapshot(messages: List[Dict], persona: Optional[str] = None, model_name: Optional[str] = None, system_context: Optional[str] = None, include_token_ids: bool = True, include_system_context: bool = False) -> Dict:
+    """
+    Build a snapshot of a conversation. The system context is only stored with
+    include_system_context (otherwise the resuming session rebuilds it); token IDs
+    are included if the prompt builder has them cached.
+    """
+    clean_messages = [
+        {key: m[key] for key in ("role", "content", "context", "timestamp") if key in m}
+        for m in messages
+    ]
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.time(),
+        "persona": persona,
+        "model": model_name,
+        "system_hash": _system_hash(system_context),
+        "messages": clean_messages,
+    }
+    if include_system_context and system_context:
+        snapshot["system_context"] = system_context
+    if include_token_ids and model_name:
+        covered, token_ids = lookup_prompt_cache(model_name, _conversation(clean_messages, system_context))
+        if token_ids:
+            snapshot["token_ids"] = _pack_ids(token_ids)
+            snapshot["token_ids_messages"] = covered
+    return snapshot
+
+
+def serialize_snapshot(snapshot: Dict) -> bytes:
+    payload = json.dumps(snapshot, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return SNAPSHOT_MAGIC + bytes([snapshot["version"]]) + zlib.compress(payload, 6)
+
+
+def deserialize_snapshot(blob: bytes) -> Dict:
+    if blob[:3] != SNAPSHOT_MAGIC:
+        raise ValueError("Not a conversation snapshot")
+    version = blob[3]
+    if version > SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot version {version} is newer than supported ({SNAPSHOT_VERSION})")
+    return json.loads(zlib.decompress(blob[4:]).decode("utf-8"))
+
+
+def export_handoff(messages: List[Dict], persona: Optional[str] = None, model_name: Optional[str] = None, system_context: Optional[str] = None, include_system_context: bool = False, handoff_dir=None) -> str:
+    """Store a snapshot and return its handoff token."""
+    handoff_dir = pathlib.Path(handoff_dir or HANDOFF_DIR)
+    handoff_dir.mkdir(parents=True, exist_ok=True)
+    token = secrets.token_urlsafe(6)
+    blob = serialize_snapshot(create_snapshot(messages, persona, model_name, system_context, include_system_context=include_system_context))
+    # Write then rename, so a concurrent import never reads half a snapshot
+    tmp_path = handoff_dir / f".{token}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(blob)
+    os.replace(tmp_path, handoff_dir / f"{token}.snap")
+    return token
+
+
+def load_handoff(token: str, handoff_dir=None) -> Optional[Dict]:
+    """The snapshot of a handoff token (None if unknown, expired or corrupt)."""
+    token = token.strip()
+    if not token or not token.replace("-", "").replace("_", "").isalnum():
+        return None
+    path = pathlib.Path(handoff_dir or HANDOFF_DIR) / f"{token}.snap"
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            snapshot = deserialize_snapshot(f.read())
+        if snapshot.get("token_ids"):
+            _unpack_ids(snapshot["token_ids"])
+    except (ValueError, zlib.error, binascii.Error, AttributeError, IndexError) as e:
+        # Corrupt or truncated snapshot: treat the token as unknown
+        print(f"[Handoff] Unreadable snapshot {path.name}: {e}")
+        return None
+    if time.time() - snapshot.get("created_at", 0) > HANDOFF_TTL_SECONDS:
+        path.unlink(missing_ok=True)
+        return None
+    return snapshot
+
+
+def seed_snapshot(snapshot: Dict, system_context: Optional[str] = None) -> bool:
+    """
+    Seed the prompt builder of the snapshot's model with its token IDs. Only done if
+    system_context (default: the one stored in the snapshot) is the one they were
+    encoded with. Returns whether the cache was seeded.
+    """
+    if system_context is None:
+        system_context = snapshot.get("system_context")
+    if not (snapshot.get("token_ids") and snapshot.get("model")) or snapshot.get("system_hash") != _system_hash(system_context):
+        return False
+    covered = _conversation(snapshot["messages"], system_context)[:snapshot["token_ids_messages"]]
+    seed_prompt_cache(snapshot["model"], covered, _unpack_ids(snapshot["token_ids"]))
+    return True
+
+
+def import_handoff(token: str, system_context: Optional[str] = None, handoff_dir=None) -> Optional[Dict]:
+    """
+    Load the snapshot of a handoff token (None if unknown or expired) and seed the
+    prompt builder if system_context matches the exporting session's.
+    """
+    snapshot = load_handoff(token, handoff_dir)
+    if snapshot is not None:
+        seed_snapshot(snapshot, system_context)
+    return snapshot
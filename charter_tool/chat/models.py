@@ -0,0 +1,20 @@
+"""
+Models and retrieval settings offered in the app. Kept apart from chat.agent and
+chat.retrieval so the sidebar can list them without importing transformers or numpy.
+"""
+
+# Sidebar label -> Hugging Face model name
+MODEL_OPTIONS = {
+    "Qwen2-7B-Instruct": "Qwen/Qwen2-7B-Instruct",
+    "Llama-3-8B-Instruct": "meta-llama/Llama-3-8B-Instruct",
+}
+
+# Small draft models for assisted (speculative) decoding. A draft must share the
+# tokenizer of its main model, so pairs stay within the same model family.
+DRAFT_MODEL_OPTIONS = {
+    "Qwen/Qwen2-7B-Instruct": "Qwen/Qwen2-0.5B-Instruct",
+    "meta-llama/Llama-3-8B-Instruct": "meta-llama/Llama-3.2-1B-Instruct",
+}
+
+# Charter sections retrieved per turn
+RETRIEVAL_TOP_K = 3
@@ -0,0 +1,235 @@
+"""
+ONNX Runtime backend for chat generation.
+
+Loading a model with `from_pretrained` converts and initializes the PyTorch
+weights on every process start. `prepare` does the expensive part once, offline:
+each configured model is exported to ONNX with KV-cache inputs/outputs (one
+merged decoder for prefill and decode steps), its graph is optimized by ONNX
+Runtime (operator fusions, constant folding) and the result is stored with its
+tokenizer under configs/models/onnx/. At runtime `get_llm_pipeline(model,
+backend="onnx")` (or CHARTER_LLM_BACKEND=onnx) opens the artifact in an ONNX
+Runtime CPU session. The model keeps the `generate()` API of transformers, so
+stopping criteria and the extraction's logits processor work unchanged.
+
+    python charter_tool/chat/onnx_backend.py prepare            # export all configured models
+    python charter_tool/chat/onnx_backend.py list
+    python charter_tool/chat/onnx_backend.py compare --model Qwen/Qwen2-0.5B-Instruct
+
+Requires the optional `optimum[onnxruntime]` package.
+"""
+
+import argparse
+import json
+import pathlib
+import shutil
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    from optimum.onnxruntime import ORTModelForCausalLM, ORTOptimizer
+    from optimum.onnxruntime.configuration import AutoOptimizationConfig
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+    import onnxruntime
+    import torch
+    ORT_AVAILABLE = True
+except ImportError:
+    ORT_AVAILABLE = False
+
+if not __package__:
+    # Run as a script: make the app's packages importable
+    sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+from chat.models import MODEL_OPTIONS, DRAFT_MODEL_OPTIONS
+
+ARTIFACTS_DIR = pathlib.Path(__file__).parent.parent.parent / "configs" / "models" / "onnx"
+MANIFEST_FILE = "manifest.json"
+
+# ONNX Runtime graph optimization level applied at export (O1 basic ... O4 with fp16)
+OPTIMIZATION_LEVEL = "O2"
+
+PROVIDER = "CPUExecutionProvider"
+
+# Prompt used by `compare`
+COMPARE_PROMPT = "List three questions to ask the users of a new AI support assistant."
+
+
+def configured_models() -> List[str]:
+    """The sidebar models and their draft models, exported by `prepare` without --model."""
+    models = list(MODEL_OPTIONS.values())
+    models += [DRAFT_MODEL_OPTIONS[m] for m in models if m in DRAFT_MODEL_OPTIONS]
+    return list(dict.fromkeys(models))
+
+
+def artifact_dir(model_name: str, artifacts_dir: pathlib.Path = ARTIFACTS_DIR) -> pathlib.Path:
+    return pathlib.Path(artifacts_dir) / model_name.replace("/", "--")
+
+
+def read_manifest(model_name: str, artifacts_dir: pathlib.Path = ARTIFACTS_DIR) -> Optional[Dict]:
+    """The manifest of a prepared model, or None if it was not exported (completely)."""
+    try:
+        with open(artifact_dir(model_name, artifacts_dir) / MANIFEST_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_prepared(model_name: str, artifacts_dir: pathlib.Path = ARTIFACTS_DIR) -> bool:
+    return read_manifest(model_name, artifacts_dir) is not None
+
+
+def _directory_size(path: pathlib.Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def prepare_model(model_name: str, optimize: bool = True, force: bool = False, artifacts_dir: pathlib.Path = ARTIFACTS_DIR) -> Dict:
+    """
+    Export a model to an optimized ONNX artifact with KV-cache I/O. The export is
+    written to a temporary directory and moved into place with its manifest last,
+    so an interrupted export is never loaded. Returns the manifest.
+    """
+    if not ORT_AVAILABLE:
+        raise RuntimeError("optimum[onnxruntime] is required to prepare ONNX models")
+    target = artifact_dir(model_name, artifacts_dir)
+    manifest = read_manifest(model_name, artifacts_dir)
+    if manifest is not None and not force:
+        return manifest
+
+    staging = target.with_name(target.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    start = time.perf_counter()
+    model = ORTModelForCausalLM.from_pretrained(model_name, export=True, use_cache=True, provider=PROVIDER)
+    model.save_pretrained(staging)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(staging)
+    optimization = None
+    if optimize:
+        optimizer = ORTOptimizer.from_pretrained(model)
+        optimizer.optimize(save_dir=staging, optimization_config=getattr(AutoOptimizationConfig, OPTIMIZATION_LEVEL)())
+        optimization = OPTIMIZATION_LEVEL
+    manifest = {
+        "model_name": model_name,
+        "exported_at": datetime.now().isoformat(timespec="seconds"),
+        "export_sec": round(time.perf_counter() - start, 1),
+        "optimization": optimization,
+        "use_cache": True,
+        "onnxruntime": onnxruntime.__version__,
+        "size_bytes": _directory_size(staging),
+    }
+    shutil.rmtree(target, ignore_errors=True)
+    staging.rename(target)
+    with open(target / MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class OnnxPipeline:
+    """The parts of a text-generation pipeline the agent uses, on an ONNX Runtime model."""
+
+    backend = "onnx"
+
+    def __init__(self, model, tokenizer, model_name: str):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.model_name = model_name
+
+
+def load_onnx_pipeline(model_name: str, artifacts_dir: pathlib.Path = ARTIFACTS_DIR, session_options=None) -> OnnxPipeline:
+    """Open a prepared artifact in an ONNX Runtime CPU session (no export, no PyTorch weights)."""
+    if not ORT_AVAILABLE:
+        raise RuntimeError("optimum[onnxruntime] is not installed")
+    manifest = read_manifest(model_name, artifacts_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"{model_name} has no ONNX artifact; run `python charter_tool/chat/onnx_backend.py prepare --model {model_name}`")
+    path = artifact_dir(model_name, artifacts_dir)
+    # The optimizer writes model_optimized.onnx next to the exported graph
+    file_name = "model_optimized.onnx" if manifest.get("optimization") and (path / "model_optimized.onnx").exists() else "model.onnx"
+    model = ORTModelForCausalLM.from_pretrained(path, file_name=file_name, use_cache=True, provider=PROVIDER, session_options=session_options)
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    return OnnxPipeline(model, tokenizer, model_name)
+
+
+def _time_generation(model, tokenizer, max_new_tokens: int) -> Dict:
+    messages = [{"role": "user", "content": COMPARE_PROMPT}]
+    input_ids = tokenizer.apply_chat_template(messages, add_generation_prompt=True, return_tensors="pt")
+    pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+    start = time.perf_counter()
+    with torch.no_grad():
+        output_ids = model.generate(
+            input_ids, attention_mask=torch.ones_like(input_ids), max_new_tokens=max_new_tokens,
+            min_new_tokens=max_new_tokens, do_sample=False, pad_token_id=pad_token_id,
+        )
+    elapsed = time.perf_counter() - start
+    new_tokens = output_ids.shape[1] - input_ids.shape[1]
+    return {"new_tokens": int(new_tokens), "generate_sec": round(elapsed, 3), "tokens_per_sec": round(new_tokens / elapsed, 2)}
+
+
+def compare_backends(model_name: str, max_new_tokens: int = 64, artifacts_dir: pathlib.Path = ARTIFACTS_DIR) -> Dict:
+    """Load time and greedy tokens/sec of the PyTorch and ONNX Runtime backends on the CPU."""
+    if not ORT_AVAILABLE:
+        raise RuntimeError("optimum[onnxruntime] is required to compare backends")
+    results = {}
+    start = time.perf_counter()
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32)
+    results["pytorch"] = {"load_sec": round(time.perf_counter() - start, 2), **_time_generation(model, tokenizer, max_new_tokens)}
+    del model
+
+    start = time.perf_counter()
+    pipe = load_onnx_pipeline(model_name, artifacts_dir)
+    results["onnx"] = {"load_sec": round(time.perf_counter() - start, 2), **_time_generation(pipe.model, pipe.tokenizer, max_new_tokens)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ahead-of-time ONNX artifacts for the chat models")
+    commands = parser.add_subparsers(dest="command", required=True)
+    prepare = commands.add_parser("prepare", help="export and optimize models (all configured models by default)")
+    prepare.add_argument("--model", action="append", help="model to export (repeatable)")
+    prepare.add_argument("--no-optimize", action="store_true", help="skip ONNX Runtime graph optimization")
+    prepare.add_argument("--force", action="store_true", help="re-export models that are already prepared")
+    commands.add_parser("list", help="show prepared artifacts")
+    compare = commands.add_parser("compare", help="load time and tokens/sec of PyTorch vs ONNX Runtime")
+    compare.add_argument("--model", required=True)
+    compare.add_argument("--max-new-tokens", type=int, default=64)
+    compare.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for model_name in configured_models():
+            manifest = read_manifest(model_name)
+            if manifest:
+                print(f"✅ {model_name}: {manifest['size_bytes'] / 1024 ** 2:,.0f} MB, optimization {manifest['optimization'] or 'none'}, exported {manifest['exported_at']}")
+            else:
+                print(f"⏳ {model_name}: not prepared")
+        return
+
+    if not ORT_AVAILABLE:
+        print("❌ optimum[onnxruntime] is not installed: pip install 'optimum[onnxruntime]'")
+        sys.exit(1)
+
+    if args.command == "prepare":
+        failed = False
+        for model_name in args.model or configured_models():
+            print(f"📦 Exporting {model_name}...")
+            try:
+                manifest = prepare_model(model_name, optimize=not args.no_optimize, force=args.force)
+            except Exception as e:
+                print(f"❌ {model_name}: {e}")
+                failed = True
+                continue
+            print(f"✅ {model_name} → {artifact_dir(model_name)} ({manifest['size_bytes'] / 1024 ** 2:,.0f} MB, {manifest['export_sec']}s)")
+        sys.exit(1 if failed else 0)
+
+    results = compare_backends(args.model, args.max_new_tokens)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'backend':<10} {'load':>8} {'tok/s':>8}")
+    for backend, result in results.items():
+        print(f"{backend:<10} {result['load_sec']:>7.2f}s {result['tokens_per_sec']:>8.2f}")
+    speedup = results["onnx"]["tokens_per_sec"] / results["pytorch"]["tokens_per_sec"] if results["pytorch"]["tokens_per_sec"] else 0
+    print(f"⚡ ONNX Runtime: {speedup:.2f}x tokens/sec, load {results['pytorch']['load_sec'] / max(results['onnx']['load_sec'], 1e-9):.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Persona registry and hot-swap engine.
+
+Personas are loaded from the YAML schema of the orchestration platform doc
+(id, voice, system_prompt, trigger, context_retention, plus an optional LoRA
+`adapter`). All personas share the one resident base model: switching only selects
+a persona's adapter and precomputed prefix state (the encoded system prompt and its
+KV cache), so no model is reloaded.
+"""
+
+import copy
+import contextlib
+import importlib.util
+import pathlib
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import yaml
+
+from chat.adapters import use_adapter
+from chat.prompt_builder import get_prompt_builder
+
+# torch is only imported once a prefix KV cache is computed (the sidebar lists personas without it)
+TORCH_AVAILABLE = importlib.util.find_spec("torch") is not None
+
+PERSONAS_PATH = pathlib.Path(__file__).parent.parent.parent / "configs" / "personas.yaml"
+
+# Persona switch target from the MVP success criteria
+SWITCH_TARGET_MS = 2000
+
+_RETENTION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_retention(value) -> Optional[int]:
+    """'24h' -> 86400 seconds. None or 'forever' keeps context indefinitely."""
+    if value is None or str(value).strip().lower() in ("", "forever", "none"):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r"\s*(\d+)\s*([smhd])\s*", str(value).lower())
+    if not match:
+        raise ValueError(f"Invalid context_retention: {value!r}")
+    return int(match.group(1)) * _RETENTION_UNITS[match.group(2)]
+
+
+@dataclass
+class Persona:
+    id: str
+    system_prompt: str
+    voice: str = ""
+    trigger: str = "button"
+    context_retention: Optional[int] = None  # seconds
+    adapter: Optional[str] = None  # LoRA adapter path or hub id
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Persona":
+        data = data.get("persona", data)
+        return cls(
+            id=str(data["id"]),
+            system_prompt=str(data["system_prompt"]).strip(),
+            voice=str(data.get("voice", "")),
+            trigger=str(data.get("trigger", "button")),
+            context_retention=parse_retention(data.get("context_retention")),
+            adapter=data.get("adapter") or None,
+        )
+
+    @property
+    def adapter_spec(self):
+        """(name, source) for llm_chat_agent's adapter argument."""
+        return (self.id, self.adapter) if self.adapter else None
+
+    def retained_history(self, history: Optional[List], now: Optional[float] = None) -> List:
+        """Drop chat messages older than the persona's context retention (messages without a timestamp are kept)."""
+        if not history or self.context_retention is None:
+            return list(history or [])
+        now = time.time() if now is None else now
+        return [
+            m for m in history
+            if not isinstance(m, dict) or "timestamp" not in m or now - m["timestamp"] <= self.context_retention
+        ]
+
+
+def load_personas(path=PERSONAS_PATH) -> Dict[str, Persona]:
+    """Load personas from a YAML file holding one `persona:` mapping or a `personas:` list of them."""
+    path = pathlib.Path(path)
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        data = yaml.safe_load(f) or {}
+    entries = data.get("personas", [data] if "persona" in data else [])
+    personas = {}
+    for entry in entries:
+        persona = Persona.from_dict(entry)
+        personas[persona.id] = persona
+    return personas
+
+
+class PersonaRegistry:
+    """Holds the personas and their precomputed prefix states for the resident model."""
+
+    def __init__(self, personas: Dict[str, Persona]):
+        self.personas = personas
+        self._lock = threading.Lock()
+        # (model name, persona id) -> {"prefix_ids": [...], "past_key_values": cache}
+        self._prefix_states = {}
+        # session key -> active persona id
+        self._active = {}
+        self.switch_timings_ms = []
+
+    def ids(self) -> List[str]:
+        return list(self.personas)
+
+    def get(self, persona_id: str) -> Optional[Persona]:
+        return self.personas.get(persona_id)
+
+    def active_persona(self, session_key: str = "default") -> Optional[Persona]:
+        return self.personas.get(self._active.get(session_key))
+
+    def prefix_state(self, persona_id: str, pipe) -> Optional[Dict]:
+        """Encoded system prompt and its KV cache for a persona, computed once per model."""
+        persona = self.personas.get(persona_id)
+        if persona is None or pipe is None:
+            return None
+        key = (getattr(pipe, "model_name", None), persona_id)
+        state = self._prefix_states.get(key)
+        if state is not None:
+            return state
+        # The KV cache depends on the persona's adapter, so it is computed with it active
+        model_lock = getattr(pipe, "generation_lock", None) or contextlib.nullcontext()
+        with self._lock, model_lock:
+            state = self._prefix_states.get(key)
+            if state is None:
+                builder = get_prompt_builder(key[0], pipe.tokenizer)
+                prefix_ids = builder.encode_conversation([{"role": "system", "content": persona.system_prompt}])
+                state = {"prefix_ids": prefix_ids, "past_key_values": None}
+                # The KV cache is computed with the PyTorch model; other backends prefill every turn
+                if TORCH_AVAILABLE and prefix_ids and getattr(pipe, "backend", "pytorch") == "pytorch":
+                    import torch
+                    use_adapter(pipe, persona.id, persona.adapter)
+                    with torch.no_grad():
+                        input_ids = torch.tensor([prefix_ids], device=pipe.model.device)
+                        state["past_key_values"] = pipe.model(input_ids=input_ids, use_cache=True).past_key_values
+                self._prefix_states[key] = state
+        return state
+
+    def warm(self, pipe):
+        """Precompute every persona's prefix state so switches never prefill."""
+        for persona_id in self.personas:
+            self.prefix_state(persona_id, pipe)
+
+    def switch(self, persona_id: str, pipe=None, session_key: str = "default") -> float:
+        """Make a persona active for a session. Returns the switch latency in milliseconds."""
+        if persona_id not in self.personas:
+            raise KeyError(f"Unknown persona: {persona_id}")
+        start = time.perf_counter()
+        if pipe is not None:
+            self.prefix_state(persona_id, pipe)
+        self._active[session_key] = persona_id
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.switch_timings_ms.append(elapsed_ms)
+        return elapsed_ms
+
+    def switch_report(self) -> Dict:
+        """Switch latencies measured so far against the <2s target."""
+        timings = sorted(self.switch_timings_ms)
+        if not timings:
+            return {"switches": 0, "target_ms": SWITCH_TARGET_MS}
+        return {
+            "switches": len(timings),
+            "p50_ms": round(timings[len(timings) // 2], 3),
+            "max_ms": round(timings[-1], 3),
+            "target_ms": SWITCH_TARGET_MS,
+            "meets_target": timings[-1] < SWITCH_TARGET_MS,
+        }
+
+
+def copy_prefix_cache(state: Optional[Dict]):
+    """Generation extends the KV cache in place, so every turn gets its own copy."""
+    if not state or state.get("past_key_values") is None:
+        return None
+    return copy.deepcopy(state["past_key_values"])
+
+
+_registry = None
+
+
+def get_persona_registry() -> PersonaRegistry:
+    global _registry
+    if _registry is None:
+        _registry = PersonaRegistry(load_personas())
+    return _registry
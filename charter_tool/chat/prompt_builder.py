@@ -0,0 +1,193 @@
+"""
+Prompt construction for the chat agent.
+
+Prompts are rendered with the tokenizer's own chat template and kept as token IDs.
+The encoded system segment and every conversation prefix are cached, so a new turn
+only tokenizes the text it adds instead of re-tokenizing the whole prompt.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+# Number of cached conversation prefixes per tokenizer
+MAX_CACHED_PREFIXES = 256
+
+
+def with_context(content: str, context: Optional[str] = None) -> str:
+    """A user turn with the charter sections retrieved for it put in front."""
+    if not context:
+        return content
+    return f"Relevant charter sections:\n{context}\n\n{content}"
+
+
+def _message_hash(previous: str, message: Dict[str, str]) -> str:
+    """Rolling hash of a conversation prefix, so equal prefixes share one key."""
+    digest = hashlib.sha1(previous.encode("utf-8"))
+    digest.update(message["role"].encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(message["content"].encode("utf-8"))
+    return digest.hexdigest()
+
+
+def normalize_messages(prompt: str, history=None, system_context: Optional[str] = None, context: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    Turn the agent's inputs into chat messages. History may be chat message dicts
+    (as kept in the app's session state) or plain strings, which are taken as user turns.
+    A message dict's "context" (retrieved sections) is put in front of its content,
+    as context is in front of the prompt.
+    """
+    messages = []
+    if system_context and system_context.strip():
+        messages.append({"role": "system", "content": system_context.strip()})
+    for item in history or []:
+        if isinstance(item, dict):
+            messages.append({"role": item.get("role", "user"), "content": with_context(str(item.get("content", "")), item.get("context"))})
+        else:
+            messages.append({"role": "user", "content": str(item)})
+    messages.append({"role": "user", "content": with_context(prompt, context)})
+    return messages
+
+
+class PromptBuilder:
+    """Encodes chat prompts for one tokenizer, reusing the token IDs of prefixes it has seen."""
+
+    def __init__(self, tokenizer, max_cached_prefixes: int = MAX_CACHED_PREFIXES):
+        self.tokenizer = tokenizer
+        self.max_cached_prefixes = max_cached_prefixes
+        # prefix hash -> (rendered text, token ids)
+        self._prefixes = OrderedDict()
+        # rendered generation-prompt suffix -> token ids
+        self._suffixes = {}
+        self.stats = {"encoded_chars": 0, "reused_chars": 0, "full_encodes": 0}
+
+    @property
+    def has_chat_template(self) -> bool:
+        return bool(getattr(self.tokenizer, "chat_template", None))
+
+    def render(self, messages: List[Dict[str, str]], add_generation_prompt: bool = False) -> str:
+        """Render messages with the chat template (plain 'role: content' lines without one)."""
+        if not messages:
+            return ""
+        if self.has_chat_template:
+            return self.tokenizer.apply_chat_template(
+                messages, tokenize=False, add_generation_prompt=add_generation_prompt
+            )
+        text = "".join(f"{m['role']}: {m['content']}\n" for m in messages)
+        return text + ("assistant: " if add_generation_prompt else "")
+
+    def _encode(self, text: str) -> List[int]:
+        self.stats["encoded_chars"] += len(text)
+        return list(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def _remember(self, key: str, text: str, ids: List[int]):
+        self._prefixes[key] = (text, ids)
+        self._prefixes.move_to_end(key)
+        while len(self._prefixes) > self.max_cached_prefixes:
+            self._prefixes.popitem(last=False)
+
+    def _prefix_keys(self, messages: List[Dict[str, str]]) -> List[str]:
+        keys = []
+        key = ""
+        for message in messages:
+            key = _message_hash(key, message)
+            keys.append(key)
+        return keys
+
+    def longest_cached_prefix(self, messages: List[Dict[str, str]]):
+        """(number of messages, token ids) of the longest prefix of messages already encoded."""
+        keys = self._prefix_keys(messages)
+        for i in range(len(keys), 0, -1):
+            if keys[i - 1] in self._prefixes:
+                return i, list(self._prefixes[keys[i - 1]][1])
+        return 0, []
+
+    def seed(self, messages: List[Dict[str, str]], ids: List[int]):
+        """Store token IDs encoded elsewhere (e.g. a handoff snapshot) for a conversation."""
+        if messages:
+            self._remember(self._prefix_keys(messages)[-1], self.render(messages), list(ids))
+
+    def encode_conversation(self, messages: List[Dict[str, str]]) -> List[int]:
+        """Token IDs of the rendered conversation (without the generation prompt)."""
+        return list(self._encode_conversation(messages)[1])
+
+    def _encode_conversation(self, messages: List[Dict[str, str]]):
+        keys = self._prefix_keys(messages)
+
+        # Longest prefix already encoded; the system segment is always the first one
+        cached_text, cached_ids, start = "", [], 0
+        for i in range(len(keys), 0, -1):
+            if keys[i - 1] in self._prefixes:
+                cached_text, cached_ids = self._prefixes[keys[i - 1]]
+                self._prefixes.move_to_end(keys[i - 1])
+                start = i
+                break
+
+        text, ids = cached_text, cached_ids
+        for i in range(start, len(messages)):
+            # Encode the system message on its own so every conversation reuses it
+            if i == 0 and messages[0]["role"] == "system":
+                end = 1
+            else:
+                end = len(messages)
+            rendered = self.render(messages[:end])
+            if rendered.startswith(text):
+                self.stats["reused_chars"] += len(text)
+                ids = ids + self._encode(rendered[len(text):])
+            else:
+                # Template is not prefix-stable for this conversation
+                self.stats["full_encodes"] += 1
+                ids = self._encode(rendered)
+            text = rendered
+            self._remember(keys[end - 1], text, ids)
+            if end == len(messages):
+                break
+        return text, ids
+
+    def encode(self, messages: List[Dict[str, str]]) -> List[int]:
+        """Token IDs of the full prompt, ending with the assistant generation prompt."""
+        if not messages:
+            return []
+        text, ids = self._encode_conversation(messages)
+        with_prompt = self.render(messages, add_generation_prompt=True)
+        if not with_prompt.startswith(text):
+            self.stats["full_encodes"] += 1
+            return self._encode(with_prompt)
+        suffix = with_prompt[len(text):]
+        if suffix not in self._suffixes:
+            self._suffixes[suffix] = self._encode(suffix)
+        return list(ids) + self._suffixes[suffix]
+
+
+# One builder per tokenizer (keyed by model name)
+_prompt_builders = {}
+
+# Seeds for builders whose tokenizer is not loaded yet: model name -> [(messages, ids)]
+_pending_seeds = {}
+
+
+def get_prompt_builder(model_name: str, tokenizer) -> PromptBuilder:
+    builder = _prompt_builders.get(model_name)
+    if builder is None or builder.tokenizer is not tokenizer:
+        builder = PromptBuilder(tokenizer)
+        for messages, ids in _pending_seeds.pop(model_name, []):
+            builder.seed(messages, ids)
+        _prompt_builders[model_name] = builder
+    return builder
+
+
+def seed_prompt_cache(model_name: str, messages: List[Dict[str, str]], ids: List[int]):
+    """Seed a model's prompt cache with encoded token IDs (applied once its tokenizer is loaded)."""
+    builder = _prompt_builders.get(model_name)
+    if builder is not None:
+        builder.seed(messages, ids)
+    else:
+        _pending_seeds.setdefault(model_name, []).append((messages, ids))
+
+
+def lookup_prompt_cache(model_name: str, messages: List[Dict[str, str]]):
+    """(number of messages, token ids) of the longest encoded prefix of messages for a model."""
+    builder = _prompt_builders.get(model_name)
+    if builder is None:
+        return 0, []
+    return builder.longest_cached_prefix(messages)
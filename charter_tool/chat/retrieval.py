@@ -0,0 +1,248 @@
+"""
+Retrieval over the charter template and the docs.
+
+Instead of prepending the whole charter_template.md to every prompt, the markdown
+of charter_template.md and docs/*.md is split into sections (one per heading) and
+scored against the user's prompt with BM25, vectorized over a NumPy term-frequency
+matrix. Only the top-k sections go into the prompt. The chat page retrieves them
+for every prompt and puts them in front of that user turn, leaving out sections the
+conversation already holds, so the system message (and its cached prefix) stays
+the same across turns. The sections and their term counts are persisted, and a file
+is only re-chunked when its mtime or size changed.
+"""
+
+import json
+import pathlib
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from chat.models import RETRIEVAL_TOP_K
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent.parent
+SOURCE_PATHS = [ROOT_DIR / "charter_template.md"]
+SOURCE_GLOBS = [(ROOT_DIR / "docs", "*.md")]
+INDEX_PATH = ROOT_DIR / "configs" / "retrieval" / "index.json"
+
+INDEX_VERSION = 1
+
+# Sections injected per turn
+TOP_K = RETRIEVAL_TOP_K
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Sections shorter than this (in characters, heading excluded) are merged into the next one
+MIN_SECTION_CHARS = 80
+
+STOPWORDS = set(
+    "a an and are as at be but by can do for from has have how i if in into is it its "
+    "of on or our so that the their them then there these they this to was we what when "
+    "where which who will with you your".split()
+)
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words without stopwords, with a plural 's' stripped."""
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        if len(word) < 2 or word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def _clean_heading(heading: str) -> str:
+    return re.sub(r"[*_`]", "", heading).strip()
+
+
+def chunk_markdown(text: str, source: str) -> List[Dict]:
+    """Split markdown into one chunk per heading section (headings in code fences are ignored)."""
+    chunks = []
+    path = []  # (level, heading) of the enclosing headings
+    lines = []
+    in_fence = False
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body or path:
+            chunks.append({
+                "source": source,
+                "heading": " › ".join(heading for _, heading in path),
+                "text": body,
+            })
+
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING.match(line)
+        if match:
+            flush()
+            lines = []
+            level = len(match.group(1))
+            path = [(lvl, heading) for lvl, heading in path if lvl < level] + [(level, _clean_heading(match.group(2)))]
+        else:
+            lines.append(line)
+    flush()
+
+    # Merge sections that are only a heading or a line into the following section
+    merged = []
+    pending = None
+    for chunk in chunks:
+        if pending is not None:
+            chunk = {**chunk, "text": f"{pending['text']}\n\n{chunk['text']}".strip()}
+            pending = None
+        if len(chunk["text"]) < MIN_SECTION_CHARS:
+            pending = chunk
+            continue
+        merged.append(chunk)
+    if pending is not None and pending["text"]:
+        merged.append(pending)
+    return merged
+
+
+class RetrievalIndex:
+    """BM25 index over markdown sections, rebuilt per changed file."""
+
+    def __init__(self, paths: Optional[List[pathlib.Path]] = None, index_path=INDEX_PATH):
+        self.paths = paths
+        self.index_path = pathlib.Path(index_path) if index_path else None
+        self._lock = threading.Lock()
+        self._files = {}  # source path -> {"mtime", "size", "chunks": [...]}
+        self._matrix = None
+        self.stats = {"files_indexed": 0, "files_reused": 0}
+        self._load()
+
+    def source_paths(self) -> List[pathlib.Path]:
+        if self.paths is not None:
+            return [pathlib.Path(p) for p in self.paths]
+        paths = [p for p in SOURCE_PATHS if p.exists()]
+        for directory, pattern in SOURCE_GLOBS:
+            if directory.is_dir():
+                paths += sorted(directory.glob(pattern))
+        return paths
+
+    def _load(self):
+        if self.index_path is None or not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self._files = data.get("files", {})
+
+    def _save(self):
+        if self.index_path is None:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "files": self._files}, f)
+        tmp_path.replace(self.index_path)
+
+    def refresh(self) -> bool:
+        """Re-chunk files whose mtime or size changed and drop removed ones. Returns True if anything changed."""
+        with self._lock:
+            changed = False
+            seen = set()
+            for path in self.source_paths():
+                key = str(path)
+                seen.add(key)
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entry = self._files.get(key)
+                if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                    self.stats["files_reused"] += 1
+                    continue
+                text = path.read_text(encoding="utf-8", errors="replace")
+                chunks = chunk_markdown(text, path.name)
+                for chunk in chunks:
+                    chunk["terms"] = Counter(tokenize(f"{chunk['heading']} {chunk['text']}"))
+                self._files[key] = {"mtime": stat.st_mtime, "size": stat.st_size, "chunks": chunks}
+                self.stats["files_indexed"] += 1
+                changed = True
+            for key in set(self._files) - seen:
+                del self._files[key]
+                changed = True
+            if changed or self._matrix is None:
+                self._build_matrix()
+            if changed:
+                self._save()
+            return changed
+
+    def _build_matrix(self):
+        self.chunks = [chunk for key in sorted(self._files) for chunk in self._files[key]["chunks"]]
+        vocabulary = sorted({term for chunk in self.chunks for term in chunk["terms"]})
+        self.vocabulary = {term: i for i, term in enumerate(vocabulary)}
+        tf = np.zeros((len(self.chunks), len(vocabulary)), dtype=np.float32)
+        for row, chunk in enumerate(self.chunks):
+            for term, count in chunk["terms"].items():
+                tf[row, self.vocabulary[term]] = count
+        lengths = tf.sum(axis=1)
+        avg_length = lengths.mean() if len(lengths) else 0.0
+        document_freq = (tf > 0).sum(axis=0)
+        n = len(self.chunks)
+        self._idf = np.log(1 + (n - document_freq + 0.5) / (document_freq + 0.5)).astype(np.float32)
+        # BM25 term weights precomputed per (chunk, term); a query only sums its columns
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_length) if avg_length else np.ones(n)
+        self._matrix = tf * (BM25_K1 + 1) / (tf + norm[:, None])
+
+    def search(self, query: str, k: int = TOP_K) -> List[Dict]:
+        """Top-k sections for a query with their BM25 score (sections without any query term are skipped)."""
+        self.refresh()
+        term_ids = [self.vocabulary[t] for t in set(tokenize(query)) if t in self.vocabulary]
+        if not term_ids or k <= 0:
+            return []
+        scores = self._matrix[:, term_ids] @ self._idf[term_ids]
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [
+            {"source": self.chunks[i]["source"], "heading": self.chunks[i]["heading"], "text": self.chunks[i]["text"], "score": float(scores[i])}
+            for i in top if scores[i] > 0
+        ]
+
+    def build_context(self, query: str, k: int = TOP_K, exclude: str = "") -> str:
+        """Context made of the top-k sections for a query, without those already in exclude."""
+        blocks = [
+            f"[{section['source']} › {section['heading']}]\n{section['text']}" if section["heading"] else f"[{section['source']}]\n{section['text']}"
+            for section in self.search(query, k)
+        ]
+        return "\n\n".join(block for block in blocks if block not in exclude)
+
+    def size_report(self) -> Dict:
+        self.refresh()
+        return {
+            "files": len(self._files),
+            "sections": len(self.chunks),
+            "vocabulary": len(self.vocabulary),
+            "indexed_chars": sum(len(c["text"]) for c in self.chunks),
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_retrieval_index() -> RetrievalIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = RetrievalIndex()
+    return _index
+
+
+def retrieve_context(query: str, k: int = TOP_K, exclude: str = "") -> str:
+    """Top-k charter/docs sections for a prompt, leaving out those in exclude (the conversation's earlier context)."""
+    return get_retrieval_index().build_context(query, k, exclude)
@@ -0,0 +1,210 @@
+"""
+Inference telemetry for the chat agent.
+
+Records model load times and per-turn timings (queue wait, prefill/time-to-first-token,
+decode speed), token counts and process RSS in a rolling window, and exports them as
+Prometheus text. Set CHARTER_TELEMETRY=0 to disable; recording then is a no-op.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Number of turns kept for the in-app dashboard
+ROLLING_WINDOW = 200
+
+_enabled = os.environ.get("CHARTER_TELEMETRY", "1") != "0"
+_lock = threading.Lock()
+_turns = deque(maxlen=ROLLING_WINDOW)
+_model_loads = {}
+_counters = {"turns_total": 0, "errors_total": 0}
+_totals = {"prompt_tokens": 0, "response_tokens": 0}
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool):
+    global _enabled
+    _enabled = enabled
+
+
+def get_rss_bytes() -> int:
+    """Resident set size of this process (0 if it cannot be determined)."""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class TurnTimer:
+    """Collects the timings of one chat turn. Use start_turn() to get one."""
+
+    def __init__(self, model_name: str, backend: str):
+        self.record = {"model": model_name, "backend": backend, "started_at": time.time()}
+        self._start = time.perf_counter()
+        self._generate_start = None
+        self._first_token = None
+
+    def queue_acquired(self):
+        """The model is free; the time so far was spent waiting for it."""
+        self.record["queue_wait_sec"] = time.perf_counter() - self._start
+
+    def generation_started(self):
+        self._generate_start = time.perf_counter()
+
+    def first_token(self):
+        """First new token is out: the prompt has been prefilled."""
+        if self._first_token is None and self._generate_start is not None:
+            self._first_token = time.perf_counter()
+            self.record["prefill_sec"] = self._first_token - self._generate_start
+            self.record["ttft_sec"] = self._first_token - self._start
+
+    def finish(self, prompt_tokens: int = 0, response_tokens: int = 0, error: bool = False):
+        end = time.perf_counter()
+        self.record["total_sec"] = end - self._start
+        self.record["prompt_tokens"] = prompt_tokens
+        self.record["response_tokens"] = response_tokens
+        self.record["error"] = error
+        if self._first_token is not None and response_tokens > 1 and end > self._first_token:
+            self.record["decode_tokens_per_sec"] = (response_tokens - 1) / (end - self._first_token)
+        self.record["rss_bytes"] = get_rss_bytes()
+        with _lock:
+            _turns.append(self.record)
+            _counters["turns_total"] += 1
+            if error:
+                _counters["errors_total"] += 1
+            _totals["prompt_tokens"] += prompt_tokens
+            _totals["response_tokens"] += response_tokens
+
+
+class _NullTurnTimer:
+    """Stand-in used while telemetry is disabled."""
+
+    record = {}
+
+    def queue_acquired(self):
+        pass
+
+    def generation_started(self):
+        pass
+
+    def first_token(self):
+        pass
+
+    def finish(self, prompt_tokens: int = 0, response_tokens: int = 0, error: bool = False):
+        pass
+
+
+_NULL_TURN = _NullTurnTimer()
+
+
+def start_turn(model_name: str, backend: str = "llm"):
+    """Start timing a chat turn (a no-op timer if telemetry is disabled)."""
+    if not _enabled:
+        return _NULL_TURN
+    return TurnTimer(model_name, backend)
+
+
+def record_model_load(model_name: str, seconds: float, success: bool = True):
+    if not _enabled:
+        return
+    with _lock:
+        _model_loads[model_name] = {
+            "seconds": seconds,
+            "success": success,
+            "loaded_at": time.time(),
+            "rss_bytes": get_rss_bytes(),
+        }
+
+
+def get_recent_turns() -> List[Dict]:
+    with _lock:
+        return list(_turns)
+
+
+def get_model_loads() -> Dict[str, Dict]:
+    with _lock:
+        return dict(_model_loads)
+
+
+def reset():
+    with _lock:
+        _turns.clear()
+        _model_loads.clear()
+        for key in _counters:
+            _counters[key] = 0
+        for key in _totals:
+            _totals[key] = 0
+
+
+def summarize(turns: Optional[List[Dict]] = None) -> Dict[str, float]:
+    """Averages over the rolling window (LLM turns only for timing metrics)."""
+    turns = get_recent_turns() if turns is None else turns
+    summary = {"turns": len(turns)}
+    llm_turns = [t for t in turns if t.get("backend") != "rules"]
+    for key in ("queue_wait_sec", "prefill_sec", "ttft_sec", "decode_tokens_per_sec", "total_sec"):
+        values = [t[key] for t in llm_turns if key in t]
+        summary[f"avg_{key}"] = sum(values) / len(values) if values else 0.0
+    summary["avg_response_tokens"] = (
+        sum(t.get("response_tokens", 0) for t in turns) / len(turns) if turns else 0.0
+    )
+    summary["rss_bytes"] = turns[-1]["rss_bytes"] if turns else get_rss_bytes()
+    return summary
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def render_prometheus() -> str:
+    """Metrics in the Prometheus text exposition format."""
+    turns = get_recent_turns()
+    summary = summarize(turns)
+    with _lock:
+        counters = dict(_counters)
+        totals = dict(_totals)
+        loads = dict(_model_loads)
+
+    lines = [
+        "# HELP charter_llm_turns_total Chat turns answered.",
+        "# TYPE charter_llm_turns_total counter",
+        f"charter_llm_turns_total {counters['turns_total']}",
+        "# HELP charter_llm_errors_total Chat turns that failed to generate.",
+        "# TYPE charter_llm_errors_total counter",
+        f"charter_llm_errors_total {counters['errors_total']}",
+        "# HELP charter_llm_tokens_total Prompt and response tokens processed.",
+        "# TYPE charter_llm_tokens_total counter",
+        f'charter_llm_tokens_total{{kind="prompt"}} {totals["prompt_tokens"]}',
+        f'charter_llm_tokens_total{{kind="response"}} {totals["response_tokens"]}',
+        "# HELP charter_llm_model_load_seconds Time to load each model.",
+        "# TYPE charter_llm_model_load_seconds gauge",
+    ]
+    for model_name, load in loads.items():
+        lines.append(f'charter_llm_model_load_seconds{{model="{_escape(model_name)}"}} {load["seconds"]:.6f}')
+    for key, help_text in (
+        ("queue_wait_sec", "Average wait for the model over the rolling window."),
+        ("prefill_sec", "Average prompt prefill time over the rolling window."),
+        ("ttft_sec", "Average time to first token over the rolling window."),
+        ("decode_tokens_per_sec", "Average decode speed over the rolling window."),
+    ):
+        name = f"charter_llm_{key}"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {summary[f'avg_{key}']:.6f}"]
+    lines += [
+        "# HELP charter_process_resident_memory_bytes Resident memory of the app process.",
+        "# TYPE charter_process_resident_memory_bytes gauge",
+        f"charter_process_resident_memory_bytes {get_rss_bytes()}",
+    ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,208 @@
+"""
+Preload-then-fork launcher for several Streamlit workers sharing one model.
+
+Running N `streamlit run` processes behind a load balancer loads the model N
+times. Here the parent process loads the pipeline once through
+`get_llm_pipeline`, freezes its objects out of the garbage collector, and
+forks N workers. Each worker serves the app on base_port + i. A forked worker
+inherits the loaded `chat.agent` module, so its pages find the model already
+resident. The weight pages are shared copy-on-write: generation only reads
+them, so they stay shared and each worker adds only its own private memory.
+With a tuned CPU profile (chat/cpu_tuning.py) worker i is pinned to
+replica group i.
+
+Once the workers are up, an RSS/PSS report per process is printed and written to
+generated/worker_memory.md. PSS divides shared pages among their processes, so the
+sum of PSS is the memory the deployment really uses.
+
+    python charter_tool/serve.py --workers 4 --base-port 8502   # from the project root
+
+Put a load balancer with sticky sessions (Streamlit keeps a websocket per
+session) in front of the ports. Linux only (fork, /proc).
+"""
+
+import argparse
+import gc
+import os
+import pathlib
+import signal
+import socket
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+APP_DIR = pathlib.Path(__file__).parent
+APP_PATH = APP_DIR / "streamlit_app.py"
+REPORT_PATH = APP_DIR.parent / "generated" / "worker_memory.md"
+
+# Seconds to wait for the workers to accept connections before measuring them
+STARTUP_TIMEOUT = 60
+
+_MEMORY_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def memory_usage(pid: int) -> Dict[str, int]:
+    """RSS, PSS and shared/private memory of a process in bytes (from /proc/<pid>/smaps_rollup)."""
+    usage = {}
+    with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in _MEMORY_FIELDS:
+                usage[name.lower()] = int(value.split()[0]) * 1024
+    usage["shared"] = usage.get("shared_clean", 0) + usage.get("shared_dirty", 0)
+    usage["private"] = usage.get("private_clean", 0) + usage.get("private_dirty", 0)
+    return usage
+
+
+def memory_report(parent_pid: int, worker_pids: List[int], model_bytes: int) -> Dict:
+    """
+    Memory of the parent and its workers. model_bytes is what loading the model
+    added to the parent's RSS; without sharing, every worker would hold its own copy.
+    """
+    processes = {"parent": memory_usage(parent_pid)}
+    for index, pid in enumerate(worker_pids):
+        processes[f"worker {index}"] = memory_usage(pid)
+    total_pss = sum(usage["pss"] for usage in processes.values())
+    total_rss = sum(usage["rss"] for usage in processes.values())
+    return {
+        "processes": processes,
+        "workers": len(worker_pids),
+        "model_bytes": model_bytes,
+        "total_rss": total_rss,
+        "total_pss": total_pss,
+        # Each unshared worker would add its own model copy on top of what it uses now
+        "unshared_estimate": total_pss + model_bytes * len(worker_pids),
+        "saved_bytes": model_bytes * len(worker_pids),
+    }
+
+
+def render_memory_report(report: Dict) -> str:
+    mb = 1024 ** 2
+    lines = [
+        "# Worker Memory",
+        "",
+        f"Generated {datetime.now().strftime('%Y-%m-%d %H:%M')} on {socket.gethostname()}: {report['workers']} workers forked from a parent holding the model ({report['model_bytes'] / mb:,.0f} MB).",
+        "",
+        "| Process | RSS | PSS | Shared | Private |",
+        "| --- | ---: | ---: | ---: | ---: |",
+    ]
+    for name, usage in report["processes"].items():
+        lines.append(f"| {name} | {usage['rss'] / mb:,.0f} MB | {usage['pss'] / mb:,.0f} MB | {usage['shared'] / mb:,.0f} MB | {usage['private'] / mb:,.0f} MB |")
+    lines += [
+        "",
+        f"- Sum of RSS (counts shared pages once per process): {report['total_rss'] / mb:,.0f} MB",
+        f"- Sum of PSS (actual usage): {report['total_pss'] / mb:,.0f} MB",
+        f"- Without sharing (one model copy per worker): ~{report['unshared_estimate'] / mb:,.0f} MB",
+        f"- Saved: ~{report['saved_bytes'] / mb:,.0f} MB",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def preload_model(model_name: Optional[str], backend: Optional[str]):
+    """Load the pipeline in this (parent) process. Returns (pipe or None, bytes the load added to RSS)."""
+    sys.path.insert(0, str(APP_DIR))
+    from chat import agent
+    before = memory_usage(os.getpid())["rss"]
+    pipe = agent.get_llm_pipeline(model_name, backend)
+    if pipe is None:
+        print(f"⚠️ No model preloaded ({agent.get_model_status(model_name, backend)['reason']}); workers answer with the rules agent")
+    # Objects that exist now are never collected, so the collector does not write to their (shared) pages
+    gc.freeze()
+    return pipe, max(memory_usage(os.getpid())["rss"] - before, 0)
+
+
+def fork_workers(count: int, target: Callable[[int], None]) -> List[int]:
+    """Fork count children running target(index). Returns their pids."""
+    pids = []
+    for index in range(count):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                target(index)
+            except BaseException as e:
+                print(f"[Serve] Worker {index} failed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        pids.append(pid)
+    return pids
+
+
+def run_streamlit_worker(index: int, port: int, address: str = "0.0.0.0"):
+    """Worker: pin to its CPU group (if tuned) and serve the app on its port."""
+    from chat import agent, cpu_tuning
+    profile = cpu_tuning.get_cpu_profile(agent.HF_MODEL_NAME if agent._llm_pipeline is None else agent._llm_pipeline.model_name)
+    if profile and len(profile["groups"]) > 1:
+        cpu_tuning.apply_profile(profile, replica=index)
+    from streamlit.web import bootstrap
+    flag_options = {
+        "server_port": port,
+        "server_address": address,
+        "server_headless": True,
+        # Modules must stay as forked: a reload would drop the shared model
+        "server_fileWatcherType": "none",
+    }
+    bootstrap.load_config_options(flag_options=flag_options)
+    bootstrap.run(str(APP_PATH), False, [], flag_options)
+
+
+def wait_for_ports(ports: List[int], timeout: float = STARTUP_TIMEOUT) -> bool:
+    deadline = time.monotonic() + timeout
+    pending = list(ports)
+    while pending and time.monotonic() < deadline:
+        for port in list(pending):
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                    pending.remove(port)
+            except OSError:
+                pass
+        time.sleep(0.5)
+    return not pending
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the app from N worker processes sharing one preloaded model")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--base-port", type=int, default=8502, help="worker i listens on base-port + i")
+    parser.add_argument("--address", default="0.0.0.0")
+    parser.add_argument("--model", help="model to preload (default: the agent's HF_MODEL_NAME)")
+    parser.add_argument("--backend", choices=["pytorch", "onnx", "rules"], help="generation backend (default: CHARTER_LLM_BACKEND)")
+    parser.add_argument("--no-report", action="store_true", help=f"do not write {REPORT_PATH.relative_to(APP_DIR.parent)}")
+    args = parser.parse_args()
+
+    print(f"📦 Preloading the model in the parent (pid {os.getpid()})...")
+    pipe, model_bytes = preload_model(args.model, args.backend)
+    ports = [args.base_port + i for i in range(args.workers)]
+    pids = fork_workers(args.workers, lambda index: run_streamlit_worker(index, ports[index], args.address))
+    print(f"🚀 {args.workers} workers on ports {', '.join(map(str, ports))}")
+
+    def stop(signum, frame):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    if wait_for_ports(ports):
+        report = memory_report(os.getpid(), pids, model_bytes)
+        print(render_memory_report(report))
+        if not args.no_report:
+            REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+            REPORT_PATH.write_text(render_memory_report(report), encoding="utf-8")
+            print(f"📝 Memory report written to {REPORT_PATH}")
+    else:
+        print(f"⚠️ Not all workers listened within {STARTUP_TIMEOUT}s; skipping the memory report")
+
+    for pid in pids:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+ZIP bundle of all export artifacts, built in memory as a stream.
+
+The artifacts of utils/exports.py are generated one at a time and written in
+CHUNK_SIZE pieces into a ZIP entry. The ZIP writes into an unseekable sink that
+is drained after every chunk, so entries use data descriptors and no temporary
+file is needed. The buffer never holds much more than one compressed chunk.
+`stream_bundle` yields the bytes as they are produced, for writing to a file or
+a response. The Export & Deploy page serves `build_bundle` through a download
+button.
+
+    python charter_tool/utils/bundle.py --output charter_bundle.zip   # latest saved config
+"""
+
+import argparse
+import io
+import json
+import pathlib
+import sys
+import time
+import zipfile
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+if not __package__:
+    # Run as a script: make the app's packages importable
+    sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+from utils.exports import EXPORT_FILES
+from utils.scaffold import latest_config, project_slug
+
+# Bytes of an artifact written to the ZIP before the buffer is drained
+CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable buffer that is emptied by drain()."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.peak = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        self.peak = max(self.peak, len(self.buffer))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def stream_bundle(config: Dict, chunk_size: int = CHUNK_SIZE, stats: Optional[Dict] = None) -> Iterator[bytes]:
+    """
+    Yield the ZIP of all export artifacts piece by piece. The entries sit in a
+    folder named after the project. If stats is given, it receives the file count
+    and the peak buffer size.
+    """
+    sink = _ChunkSink()
+    root = project_slug(config)
+    date_time = datetime.now().timetuple()[:6]
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for path, generate in EXPORT_FILES.items():
+            data = generate(config).encode("utf-8")
+            info = zipfile.ZipInfo(f"{root}/{path}", date_time=date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with bundle.open(info, "w") as entry:
+                for offset in range(0, len(data), chunk_size):
+                    entry.write(data[offset:offset + chunk_size])
+                    if len(sink.buffer) >= chunk_size:
+                        yield sink.drain()
+            if sink.buffer:
+                yield sink.drain()
+    # Closing the ZIP wrote the central directory
+    yield sink.drain()
+    if stats is not None:
+        stats.update({"files": len(EXPORT_FILES), "peak_buffer_bytes": sink.peak})
+
+
+def build_bundle(config: Dict) -> Tuple[bytes, Dict]:
+    """The complete bundle as bytes, with its size and build time."""
+    stats = {}
+    start = time.perf_counter()
+    data = b"".join(stream_bundle(config, stats=stats))
+    stats["size_bytes"] = len(data)
+    stats["build_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return data, stats
+
+
+def bundle_file_name(config: Dict) -> str:
+    return f"{project_slug(config)}_bundle.zip"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bundle all exports of a saved configuration into one ZIP")
+    parser.add_argument("--config", type=pathlib.Path, help="saved configuration (default: the most recent in configs/)")
+    parser.add_argument("--output", help="ZIP file to write, or - for stdout (default: <project>_bundle.zip)")
+    args = parser.parse_args()
+
+    config_path = args.config or latest_config()
+    if config_path is None:
+        print("❌ No saved configuration found. Please run: make streamlit")
+        sys.exit(1)
+    with open(config_path, "r") as f:
+        config = json.load(f)
+
+    stats = {}
+    start = time.perf_counter()
+    if args.output == "-":
+        for chunk in stream_bundle(config, stats=stats):
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+        return
+    output = pathlib.Path(args.output or bundle_file_name(config))
+    size = 0
+    with open(output, "wb") as f:
+        for chunk in stream_bundle(config, stats=stats):
+            f.write(chunk)
+            size += len(chunk)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"📦 {stats['files']} files → {output} ({size / 1024:.1f} KB) in {elapsed_ms:.1f} ms, peak buffer {stats['peak_buffer_bytes'] / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
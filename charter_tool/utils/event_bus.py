@@ -0,0 +1,363 @@
+"""
+In-process event bus for multi-session coordination.
+
+Sessions and agents subscribe to topics (MQTT-style patterns: `+` matches one
+level, `#` the rest) and get events through bounded asyncio queues. A full queue
+either applies backpressure to the publisher or drops events, per subscription.
+With an idle TTL, subscriptions nobody read or touched for that long (sessions
+that are gone) are dropped, so they stop receiving events and are freed.
+Delivery goes through a pluggable transport: InMemoryTransport within one process,
+or LocalSocketTransport connected to a LocalBroker, which stands in for an MQTT or
+WebSocket broker between processes.
+
+Run `python charter_tool/utils/event_bus.py` for a throughput benchmark.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+# What a subscription does when its queue is full
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+# Idle time after which the app bus drops a session's subscription
+SESSION_IDLE_TTL = 15 * 60
+
+_event_ids = itertools.count(1)
+
+
+@dataclass
+class Event:
+    topic: str
+    payload: Any = None
+    source: str = ""
+    id: int = field(default_factory=lambda: next(_event_ids))
+    published_at: float = field(default_factory=time.time)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"), default=str)
+
+    @classmethod
+    def from_json(cls, line: str) -> "Event":
+        return cls(**json.loads(line))
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """MQTT-style matching: 'session/+/chat' matches 'session/abc/chat', 'session/#' matches all below."""
+    pattern_parts = pattern.split("/")
+    topic_parts = topic.split("/")
+    for i, part in enumerate(pattern_parts):
+        if part == "#":
+            return True
+        if i >= len(topic_parts) or (part != "+" and part != topic_parts[i]):
+            return False
+    return len(pattern_parts) == len(topic_parts)
+
+
+class Subscription:
+    """A topic pattern with its own bounded queue."""
+
+    def __init__(self, bus: "EventBus", pattern: str, maxsize: int, overflow: str):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self.bus = bus
+        self.pattern = pattern
+        self.overflow = overflow
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+        self.last_active = time.monotonic()
+
+    def touch(self):
+        """Mark the subscriber as alive (reading does this too)."""
+        self.last_active = time.monotonic()
+
+    async def put(self, event: Event):
+        if self.overflow == "block":
+            await self.queue.put(event)
+        elif self.queue.full():
+            self.dropped += 1
+            if self.overflow == "drop_newest":
+                return
+            self.queue.get_nowait()
+            self.queue.put_nowait(event)
+        else:
+            self.queue.put_nowait(event)
+        self.delivered += 1
+
+    async def get(self) -> Event:
+        self.touch()
+        return await self.queue.get()
+
+    def drain(self) -> List[Event]:
+        """All queued events without waiting (for Streamlit reruns)."""
+        self.touch()
+        events = []
+        while not self.queue.empty():
+            events.append(self.queue.get_nowait())
+        return events
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Event:
+        return await self.get()
+
+
+class InMemoryTransport:
+    """Delivers events straight to the local bus."""
+
+    async def start(self, deliver):
+        self._deliver = deliver
+
+    async def send(self, event: Event):
+        await self._deliver(event)
+
+    async def close(self):
+        pass
+
+
+class LocalBroker:
+    """
+    Minimal pub/sub broker on a Unix socket (or localhost TCP port). Every event line
+    a client sends is forwarded to all connected clients, like an MQTT broker.
+    """
+
+    def __init__(self, path: Optional[str] = None, host: str = "127.0.0.1", port: int = 0):
+        self.path = path
+        self.host = host
+        self.port = port
+        self._server = None
+        self._writers = set()
+
+    async def start(self):
+        if self.path:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while line := await reader.readline():
+                for client in list(self._writers):
+                    client.write(line)
+                await asyncio.gather(*(client.drain() for client in list(self._writers)), return_exceptions=True)
+        except (asyncio.CancelledError, ConnectionError):
+            # Broker shutting down or client gone
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def close(self):
+        for writer in list(self._writers):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+class LocalSocketTransport:
+    """Sends events through a LocalBroker; events of every connected bus come back through it."""
+
+    def __init__(self, path: Optional[str] = None, host: str = "127.0.0.1", port: int = 0):
+        self.path = path
+        self.host = host
+        self.port = port
+        self._reader_task = None
+
+    async def start(self, deliver):
+        if self.path:
+            self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        else:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._reader_task = asyncio.create_task(self._read(deliver))
+
+    async def _read(self, deliver):
+        while line := await self._reader.readline():
+            await deliver(Event.from_json(line.decode("utf-8")))
+
+    async def send(self, event: Event):
+        self._writer.write(event.to_json().encode("utf-8") + b"\n")
+        await self._writer.drain()
+
+    async def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        self._writer.close()
+
+
+class EventBus:
+    """Topic-based pub/sub with bounded per-subscriber queues."""
+
+    def __init__(self, transport=None, idle_ttl: Optional[float] = None):
+        self.transport = transport or InMemoryTransport()
+        self.idle_ttl = idle_ttl
+        self._subscriptions: List[Subscription] = []
+        self.stats = {"published": 0, "delivered": 0, "expired": 0}
+        self._started = False
+
+    async def start(self):
+        if not self._started:
+            await self.transport.start(self._deliver)
+            self._started = True
+        return self
+
+    def subscribe(self, pattern: str, maxsize: int = 100, overflow: str = "block") -> Subscription:
+        self.expire_idle()
+        subscription = Subscription(self, pattern, maxsize, overflow)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.closed = True
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def expire_idle(self) -> int:
+        """Drop subscriptions idle for longer than idle_ttl. Returns how many were dropped."""
+        if self.idle_ttl is None:
+            return 0
+        deadline = time.monotonic() - self.idle_ttl
+        expired = [s for s in self._subscriptions if s.last_active < deadline]
+        for subscription in expired:
+            self.unsubscribe(subscription)
+        self.stats["expired"] += len(expired)
+        return len(expired)
+
+    async def publish(self, topic: str, payload: Any = None, source: str = "") -> Event:
+        await self.start()
+        event = Event(topic=topic, payload=payload, source=source)
+        self.stats["published"] += 1
+        await self.transport.send(event)
+        return event
+
+    async def _deliver(self, event: Event):
+        # Fan out; a blocking subscriber holds up delivery (backpressure on the publisher)
+        self.expire_idle()
+        for subscription in list(self._subscriptions):
+            if topic_matches(subscription.pattern, event.topic):
+                await subscription.put(event)
+                self.stats["delivered"] += 1
+
+    async def close(self):
+        await self.transport.close()
+        self._started = False
+
+
+class BackgroundEventBus:
+    """
+    An EventBus running on its own event-loop thread, for synchronous callers such
+    as Streamlit scripts. Subscriptions use drop_oldest so a session that is not
+    rerunning never blocks the others. Streamlit does not tell a script that its
+    session ended, so subscriptions expire after idle_ttl without a drain or touch.
+    """
+
+    def __init__(self, transport=None, idle_ttl: Optional[float] = SESSION_IDLE_TTL):
+        self.loop = asyncio.new_event_loop()
+        self.bus = EventBus(transport, idle_ttl)
+        self._thread = threading.Thread(target=self.loop.run_forever, name="event-bus", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.bus.start(), self.loop).result()
+
+    def publish(self, topic: str, payload: Any = None, source: str = ""):
+        """Publish without waiting for delivery."""
+        return asyncio.run_coroutine_threadsafe(self.bus.publish(topic, payload, source), self.loop)
+
+    def subscribe(self, pattern: str, maxsize: int = 100) -> Subscription:
+        async def _subscribe():
+            return self.bus.subscribe(pattern, maxsize, overflow="drop_oldest")
+        return asyncio.run_coroutine_threadsafe(_subscribe(), self.loop).result()
+
+    def drain(self, subscription: Subscription) -> List[Event]:
+        async def _drain():
+            return subscription.drain()
+        return asyncio.run_coroutine_threadsafe(_drain(), self.loop).result()
+
+    def unsubscribe(self, subscription: Subscription):
+        self.loop.call_soon_threadsafe(self.bus.unsubscribe, subscription)
+
+
+_app_bus = None
+_app_bus_lock = threading.Lock()
+
+
+def get_app_event_bus() -> BackgroundEventBus:
+    """The event bus shared by all sessions of this app process."""
+    global _app_bus
+    with _app_bus_lock:
+        if _app_bus is None:
+            _app_bus = BackgroundEventBus()
+    return _app_bus
+
+
+async def run_throughput_benchmark(events: int = 10_000, subscribers: int = 10, maxsize: int = 1000, transport=None) -> Dict[str, float]:
+    """Publish events to many subscribers; report events/sec and delivery latency percentiles."""
+    bus = await EventBus(transport).start()
+    latencies = []
+
+    async def consume(subscription):
+        for _ in range(events):
+            event = await subscription.get()
+            latencies.append(time.perf_counter() - event.payload)
+
+    subscriptions = [bus.subscribe("bench/#", maxsize=maxsize) for _ in range(subscribers)]
+    consumers = [asyncio.create_task(consume(s)) for s in subscriptions]
+    start = time.perf_counter()
+    for _ in range(events):
+        await bus.publish("bench/event", time.perf_counter())
+    await asyncio.gather(*consumers)
+    elapsed = time.perf_counter() - start
+    await bus.close()
+
+    latencies.sort()
+    return {
+        "events": events,
+        "subscribers": subscribers,
+        "elapsed_sec": elapsed,
+        "events_per_sec": events / elapsed,
+        "deliveries_per_sec": events * subscribers / elapsed,
+        "p50_latency_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_latency_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def _benchmark_socket(events: int, subscribers: int, maxsize: int) -> Dict[str, float]:
+    broker = await LocalBroker().start()
+    try:
+        return await run_throughput_benchmark(events, subscribers, maxsize, LocalSocketTransport(port=broker.port))
+    finally:
+        await broker.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event bus throughput benchmark")
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--subscribers", type=int, default=10)
+    parser.add_argument("--maxsize", type=int, default=1000)
+    parser.add_argument("--transport", choices=["memory", "socket"], default="memory")
+    args = parser.parse_args()
+
+    if args.transport == "socket":
+        result = asyncio.run(_benchmark_socket(args.events, args.subscribers, args.maxsize))
+    else:
+        result = asyncio.run(run_throughput_benchmark(args.events, args.subscribers, args.maxsize))
+    print(f"📡 Event bus ({args.transport}): {result['events']} events → {result['subscribers']} subscribers")
+    print(f"   {result['events_per_sec']:,.0f} events/sec ({result['deliveries_per_sec']:,.0f} deliveries/sec)")
+    print(f"   delivery latency p50 {result['p50_latency_ms']:.3f} ms, p99 {result['p99_latency_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,9 @@ import yaml
 from datetime import datetime
 import streamlit as st
 
+from utils.search import note_saved_file
+from utils.similarity import note_saved_config
+
 def save_config_to_file(project_config):
     os.makedirs("configs", exist_ok=True)
     project_name = project_config.get("project_name", "untitled_project")
@@ -12,6 +15,8 @@ def save_config_to_file(project_config):
     filename = f"configs/{safe_project_name}_{timestamp}.json"
     with open(filename, 'w') as f:
         json.dump(project_config, f, indent=2, default=str)
+    note_saved_config(project_config, filename)
+    note_saved_file(filename, project_config)
     st.toast(f"Configuration saved to `{filename}`")
     return filename
 
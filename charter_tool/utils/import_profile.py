@@ -0,0 +1,141 @@
+"""
+Import-time profile of the Streamlit app.
+
+The entrypoint's imports and each page's imports (read from the top-level import
+statements of app_pages/*.py) are run in a fresh interpreter with
+`python -X importtime`. A page is measured on top of the entrypoint, so its cost is
+what visiting it for the first time adds to a cold start.
+
+Run `python charter_tool/utils/import_profile.py` for the report; it exits with
+status 1 if the entrypoint is over STARTUP_BUDGET_MS or loads a deferred module.
+"""
+
+import argparse
+import ast
+import json
+import pathlib
+import re
+import subprocess
+import sys
+from typing import Dict, List
+
+APP_DIR = pathlib.Path(__file__).parent.parent
+ENTRYPOINT = APP_DIR / "streamlit_app.py"
+PAGES_DIR = APP_DIR / "app_pages"
+REPORT_PATH = APP_DIR.parent / "generated" / "import_profile.md"
+
+# Cold-start budget for the entrypoint's imports (streamlit itself takes ~120 ms)
+STARTUP_BUDGET_MS = 400
+
+# Heavy modules only the pages that need them may import
+DEFERRED_MODULES = ("transformers", "torch", "pandas", "pyarrow")
+
+_MARK = "--- page imports ---"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def import_statements(path: pathlib.Path) -> List[str]:
+    """The top-level import statements of a script, as source lines."""
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def parse_importtime(text: str) -> Dict:
+    """Modules in `-X importtime` output, with the total of the top-level imports in ms."""
+    modules = []
+    for line in text.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "name": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            })
+    return {
+        "total_ms": sum(m["cumulative_ms"] for m in modules if m["depth"] == 0),
+        "modules": modules,
+    }
+
+
+def profile_imports(statements: List[str], preload: List[str] = (), runs: int = 1) -> Dict:
+    """
+    Run import statements in a fresh interpreter (cwd = the app directory) and profile
+    them; `preload` runs first and is not counted. The fastest of `runs` runs is kept.
+    """
+    code = "\n".join([*preload, "import sys", f"sys.stderr.write({_MARK!r} + '\\n')", *statements])
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=APP_DIR, capture_output=True, text=True, check=True,
+        )
+        profile = parse_importtime(result.stderr.split(_MARK, 1)[-1])
+        if best is None or profile["total_ms"] < best["total_ms"]:
+            best = profile
+    best["deferred_loaded"] = sorted(
+        {m["name"].split(".")[0] for m in best["modules"]} & set(DEFERRED_MODULES)
+    )
+    return best
+
+
+def profile_app(runs: int = 1) -> Dict:
+    """Profiles of the entrypoint and of every page on top of it."""
+    entry_statements = import_statements(ENTRYPOINT)
+    profiles = {"Entrypoint": profile_imports(entry_statements, runs=runs)}
+    for path in sorted(PAGES_DIR.glob("*.py")):
+        profiles[path.stem] = profile_imports(import_statements(path), preload=entry_statements, runs=runs)
+    return profiles
+
+
+def _heaviest(profile: Dict, top: int) -> List[Dict]:
+    top_level = [m for m in profile["modules"] if m["depth"] == 0]
+    return sorted(top_level, key=lambda m: -m["cumulative_ms"])[:top]
+
+
+def render_report(profiles: Dict, top: int = 5) -> str:
+    lines = [
+        "# Import Profile",
+        "",
+        f"Cold-start imports of the Streamlit app (`python -X importtime`). Pages are measured on top of the entrypoint; budget for the entrypoint: {STARTUP_BUDGET_MS} ms.",
+        "",
+        "| Script | Import time | Modules | Deferred modules |",
+        "| --- | ---: | ---: | --- |",
+    ]
+    for name, profile in profiles.items():
+        deferred = ", ".join(profile["deferred_loaded"]) or "—"
+        lines.append(f"| {name} | {profile['total_ms']:.0f} ms | {len(profile['modules'])} | {deferred} |")
+    for name, profile in profiles.items():
+        lines += ["", f"## {name}", ""]
+        lines += [f"- `{m['name']}` {m['cumulative_ms']:.1f} ms" for m in _heaviest(profile, top)] or ["- nothing new"]
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of the Streamlit app entrypoint and pages")
+    parser.add_argument("--runs", type=int, default=3, help="keep the fastest of N runs per script")
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports listed per script")
+    parser.add_argument("--write", action="store_true", help=f"also write the report to {REPORT_PATH.relative_to(APP_DIR.parent)}")
+    parser.add_argument("--json", action="store_true", help="print the profiles as JSON")
+    args = parser.parse_args()
+
+    profiles = profile_app(runs=args.runs)
+    if args.json:
+        print(json.dumps({name: {k: v for k, v in p.items() if k != "modules"} for name, p in profiles.items()}, indent=2))
+    else:
+        print(render_report(profiles, args.top))
+    if args.write:
+        REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        REPORT_PATH.write_text(render_report(profiles, args.top), encoding="utf-8")
+        print(f"📝 Report written to {REPORT_PATH}")
+
+    entry = profiles["Entrypoint"]
+    if entry["total_ms"] > STARTUP_BUDGET_MS or entry["deferred_loaded"]:
+        print(f"❌ Entrypoint over budget: {entry['total_ms']:.0f} ms (budget {STARTUP_BUDGET_MS} ms), deferred modules loaded: {entry['deferred_loaded'] or 'none'}")
+        sys.exit(1)
+    print(f"✅ Entrypoint imports in {entry['total_ms']:.0f} ms (budget {STARTUP_BUDGET_MS} ms)")
+
+
+if __name__ == "__main__":
+    main()
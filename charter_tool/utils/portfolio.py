@@ -0,0 +1,210 @@
+"""
+Portfolio analytics over all saved project configurations.
+
+Configs in configs/ are flattened into one pandas table (list columns for users,
+components, compliance, ...). The table is cached as Parquet and refreshed
+incrementally: only configs whose file is new or has a newer mtime are re-read.
+Aggregates (budget distribution, component frequency, completion rates) are
+computed on the latest version of each project.
+
+Run `python charter_tool/utils/portfolio.py` for a report on the command line.
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import sys
+from typing import Dict, Optional
+
+import pandas as pd
+
+if not __package__:
+    # Run as a script: make the app's packages importable
+    sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+from utils.project import SECTIONS
+
+try:
+    import pyarrow  # noqa: F401 (Parquet engine)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+CONFIGS_DIR = "configs"
+# Parquet cache, relative to the configs directory
+CACHE_FILE = os.path.join("cache", "portfolio.parquet")
+
+BUDGET_BINS = [0, 100, 500, 1000, 5000, float("inf")]
+BUDGET_LABELS = ["< €100", "€100–500", "€500–1k", "€1k–5k", "≥ €5k"]
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value else []
+    return [str(item) for item in value]
+
+
+def flatten_config(config: Dict, path: str, mtime: float) -> Dict:
+    """One table row for a saved config."""
+    constraints = config.get("constraints") or {}
+    timeline = config.get("timeline") or {}
+    completion = config.get("completion_status") or {}
+    try:
+        budget = float(constraints.get("budget"))
+    except (TypeError, ValueError):
+        budget = float("nan")
+    return {
+        "path": path,
+        "mtime": mtime,
+        "project_name": str(config.get("project_name") or ""),
+        "tech_stack": str(config.get("tech_stack") or ""),
+        "budget": budget,
+        "performance": str(constraints.get("performance") or ""),
+        "users": _as_list(config.get("users")),
+        "interaction_patterns": _as_list(config.get("interaction_patterns")),
+        "system_components": _as_list(config.get("system_components")),
+        "compliance": _as_list(constraints.get("compliance")),
+        "phases": _as_list(timeline.get("phases")),
+        "start_date": str(timeline.get("start_date") or ""),
+        "end_date": str(timeline.get("end_date") or ""),
+        "completed_sections": [section for section in SECTIONS if completion.get(section)],
+    }
+
+
+def _empty_table() -> pd.DataFrame:
+    return pd.DataFrame(columns=list(flatten_config({}, "", 0.0)))
+
+
+def _read_cache(cache_path: str) -> pd.DataFrame:
+    if not PARQUET_AVAILABLE or not os.path.exists(cache_path):
+        return _empty_table()
+    try:
+        table = pd.read_parquet(cache_path)
+    except Exception as e:
+        print(f"[Portfolio] Ignoring unreadable cache {cache_path}: {e}")
+        return _empty_table()
+    return table
+
+
+def _write_cache(table: pd.DataFrame, cache_path: str):
+    if not PARQUET_AVAILABLE:
+        return
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    table.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+
+
+def load_portfolio(configs_dir: str = CONFIGS_DIR, cache_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    All saved configs as one table. Rows of unchanged files come from the Parquet
+    cache; only new or modified configs are parsed, and removed ones are dropped.
+    """
+    cache_path = cache_path or os.path.join(configs_dir, CACHE_FILE)
+    cached = _read_cache(cache_path)
+    if not os.path.isdir(configs_dir):
+        return _empty_table()
+
+    on_disk = {
+        entry.path: entry.stat().st_mtime
+        for entry in os.scandir(configs_dir)
+        if entry.is_file() and entry.name.endswith(".json")
+    }
+    cached_mtimes = dict(zip(cached["path"], cached["mtime"]))
+    keep = cached["path"].map(lambda path: path in on_disk and on_disk[path] == cached_mtimes[path])
+    table = cached[keep.astype(bool)]
+
+    new_rows = []
+    for path, mtime in on_disk.items():
+        if cached_mtimes.get(path) == mtime:
+            continue
+        try:
+            with open(path, "r") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[Portfolio] Skipping {path}: {e}")
+            continue
+        if isinstance(config, dict):
+            new_rows.append(flatten_config(config, path, mtime))
+
+    if new_rows or len(table) != len(cached):
+        if new_rows:
+            new_table = pd.DataFrame(new_rows)
+            table = pd.concat([table, new_table], ignore_index=True) if len(table) else new_table
+        table = table.reset_index(drop=True)
+        _write_cache(table, cache_path)
+    return table.sort_values("mtime", kind="stable").reset_index(drop=True)
+
+
+def latest_versions(table: pd.DataFrame) -> pd.DataFrame:
+    """Every save writes a new file; keep the most recent one per project name."""
+    return table.sort_values("mtime", kind="stable").drop_duplicates("project_name", keep="last").reset_index(drop=True)
+
+
+def budget_distribution(table: pd.DataFrame) -> pd.Series:
+    """Number of projects per monthly budget band."""
+    bands = pd.cut(table["budget"], bins=BUDGET_BINS, labels=BUDGET_LABELS, right=False)
+    return bands.value_counts(sort=False)
+
+
+def value_frequency(table: pd.DataFrame, field: str) -> pd.Series:
+    """How many projects use each value of a list column (e.g. system_components)."""
+    return table[field].explode().dropna().value_counts()
+
+
+def completion_rates(table: pd.DataFrame) -> pd.Series:
+    """Share of projects that completed each section."""
+    counts = value_frequency(table, "completed_sections").reindex(SECTIONS, fill_value=0)
+    return counts / len(table) if len(table) else counts.astype(float)
+
+
+def portfolio_summary(table: pd.DataFrame) -> Dict:
+    completed = table["completed_sections"].map(len) if len(table) else pd.Series(dtype=float)
+    return {
+        "projects": int(len(table)),
+        "total_monthly_budget": float(table["budget"].sum()) if len(table) else 0.0,
+        "median_budget": float(table["budget"].median()) if table["budget"].notna().any() else 0.0,
+        "avg_completion": float((completed / len(SECTIONS)).mean()) if len(table) else 0.0,
+        "fully_specified": int((completed == len(SECTIONS)).sum()) if len(table) else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio analytics over saved project configurations")
+    parser.add_argument("--configs-dir", default=CONFIGS_DIR)
+    parser.add_argument("--all-versions", action="store_true", help="count every saved file, not only the latest per project")
+    parser.add_argument("--json", action="store_true", help="print the aggregates as JSON")
+    args = parser.parse_args()
+
+    table = load_portfolio(args.configs_dir)
+    if not args.all_versions:
+        table = latest_versions(table)
+    report = {
+        "summary": portfolio_summary(table),
+        "budget_distribution": budget_distribution(table).to_dict(),
+        "system_components": value_frequency(table, "system_components").to_dict(),
+        "users": value_frequency(table, "users").to_dict(),
+        "completion_rates": completion_rates(table).round(3).to_dict(),
+    }
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    summary = report["summary"]
+    print(f"📊 Portfolio: {summary['projects']} projects, €{summary['total_monthly_budget']:,.0f}/month in total")
+    print(f"   median budget €{summary['median_budget']:,.0f}, average completion {summary['avg_completion']:.0%}, {summary['fully_specified']} fully specified")
+    print("\n💰 Budget distribution")
+    for band, count in report["budget_distribution"].items():
+        print(f"   {band:>10}: {count}")
+    print("\n🏗️ Most used components")
+    for component, count in list(report["system_components"].items())[:10]:
+        print(f"   {component}: {count}")
+    print("\n✅ Completion rates")
+    for section, rate in report["completion_rates"].items():
+        print(f"   {section}: {rate:.0%}")
+
+
+if __name__ == "__main__":
+    main()
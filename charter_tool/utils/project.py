@@ -0,0 +1,78 @@
+"""
+The project configuration edited by the app: its sections and the options the
+Dashboard offers. Kept free of heavy imports, the app entrypoint loads it on
+every cold start.
+"""
+
+from typing import Dict
+
+# Sections tracked in a config's completion_status
+SECTIONS = [
+    "Problem Definition", "User Analysis", "Interaction Design", "Architecture",
+    "Constraints", "Success Metrics", "Timeline",
+]
+
+# Options offered by the Dashboard tabs
+USER_TYPES = ["Technical Users", "Business Users", "End Customers", "Analysts", "Administrators"]
+INTERACTION_PATTERNS = ["Chat Interface", "API Calls", "Web Dashboard", "Mobile App", "Batch Processing", "Real-time Processing"]
+SYSTEM_COMPONENTS = [
+    "Data Ingestion", "Data Processing", "ML Models", "API Gateway",
+    "User Interface", "Database", "Cache Layer", "Message Queue",
+    "Authentication", "Monitoring", "Logging", "Analytics",
+]
+TECH_STACKS = ["Python + FastAPI", "Python + Django", "Node.js + Express", "Python + Streamlit", "Other"]
+PERFORMANCE_OPTIONS = ["< 1 sec", "< 2 sec", "< 5 sec", "< 10 sec"]
+COMPLIANCE_OPTIONS = ["GDPR", "HIPAA", "SOC2", "ISO27001"]
+PHASES = ["Discovery", "Prototype", "Development", "Testing", "Deployment", "Maintenance"]
+
+
+# Guided Questions of the chat page, per section
+PLANNING_QUESTIONS = {
+    "Problem Definition": [
+        "What specific inefficiency are you solving?",
+        "What are the current pain points in your process?",
+        "What quantifiable change will this system bring?",
+        "How does this align with your organizational objectives?"
+    ],
+    "User Analysis": [
+        "Who will directly interact with the system?",
+        "Are your users technical or non-technical?",
+        "How do users currently solve this problem?",
+        "How often will users interact with the system?"
+    ],
+    "Interaction Design": [
+        "What should be the primary interface - chat, API, or dashboard?",
+        "Do you need real-time responses or batch processing?",
+        "How should results be delivered to users?",
+        "What external systems need to connect?"
+    ],
+    "Architecture": [
+        "What specialized functions are needed?",
+        "What data sources will the system process?",
+        "What analysis or transformation is required?",
+        "How many users will the system handle?"
+    ],
+    "Constraints": [
+        "What's the maximum monthly operational cost?",
+        "What regulations must be followed?",
+        "What response times are acceptable?",
+        "What uptime is required?"
+    ]
+}
+
+
+def new_project_config() -> Dict:
+    """An empty project configuration."""
+    return {
+        'project_name': '',
+        'problem_statement': '',
+        'users': [],
+        'interaction_patterns': [],
+        'system_components': [],
+        'constraints': {},
+        'success_metrics': {},
+        'timeline': {},
+        'chat_history': [],
+        'current_step': 'concept',
+        'completion_status': {section: False for section in SECTIONS}
+    }
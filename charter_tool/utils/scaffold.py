@@ -0,0 +1,234 @@
+"""
+Project scaffolder driven by a saved configuration.
+
+The project skeleton is rendered from the config into {relative path: content}.
+It holds the exports of utils/exports.py, a README, main.py and one package per
+system component. The templates are compiled once, and a rendered skeleton is
+cached by config fingerprint, so re-scaffolding an unchanged config renders
+nothing. Files are written in parallel, and only when their content hash
+differs from the file on disk. The "Generated on" stamp does not count towards
+the hash. A changed file is written to a temporary file next to it and moved
+into place, so no reader ever sees it half written. Untouched files keep their
+mtime, so Streamlit's file watcher does not rerun the app for them.
+
+    python charter_tool/utils/scaffold.py --config configs/my_project.json --output generated/my_project
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pathlib
+import re
+import string
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+if not __package__:
+    # Run as a script: make the app's packages importable
+    sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+from utils.exports import EXPORT_FILES
+
+CONFIGS_DIR = pathlib.Path(__file__).parent.parent.parent / "configs"
+GENERATED_DIR = pathlib.Path(__file__).parent.parent.parent / "generated"
+
+# Threads writing files in parallel
+MAX_WRITERS = 8
+
+# Rendered skeletons kept per config fingerprint
+MAX_CACHED_RENDERS = 32
+
+# Mode of newly created files: what open() would give them under the process umask
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+NEW_FILE_MODE = 0o666 & ~_UMASK
+
+# Generation timestamps in the exports; a file differing only here is unchanged
+_STAMP = re.compile(rb"Generated on: [^\n]*")
+
+# Package per system component (components without one get no package)
+COMPONENT_PACKAGES = {
+    "Data Ingestion": "data_ingestion",
+    "Data Processing": "data_processing",
+    "ML Models": "models",
+    "API Gateway": "api",
+    "User Interface": "ui",
+    "Database": "database",
+    "Cache Layer": "cache",
+    "Message Queue": "messaging",
+    "Authentication": "auth",
+    "Monitoring": "monitoring",
+    "Logging": "logging_setup",
+    "Analytics": "analytics",
+}
+
+_TEMPLATE_SOURCES = {
+    "README.md": """# $project_name
+
+$problem_statement
+
+## Components
+
+$component_list
+
+## Getting started
+
+```bash
+pip install -r requirements.txt
+python main.py
+```
+
+See docs/generated_charter.md and docs/technical_spec.md for the project charter.
+""",
+    "main.py": '''"""
+Entry point of $project_name.
+"""
+
+from src.config import config
+
+
+def main():
+    print(f"Starting {config.PROJECT_NAME}")
+
+
+if __name__ == "__main__":
+    main()
+''',
+    "component": '''"""
+$component for $project_name.
+"""
+''',
+}
+
+_templates = {}
+_render_cache = OrderedDict()
+
+
+def get_template(name: str) -> string.Template:
+    """A skeleton template, compiled on first use."""
+    if name not in _templates:
+        _templates[name] = string.Template(_TEMPLATE_SOURCES[name])
+    return _templates[name]
+
+
+def config_fingerprint(config: Dict) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def render_project(config: Dict) -> Dict[str, str]:
+    """The project skeleton for a config as {relative path: content} (cached per fingerprint)."""
+    key = config_fingerprint(config)
+    if key in _render_cache:
+        _render_cache.move_to_end(key)
+        return _render_cache[key]
+    project_name = config.get("project_name") or "AI Project"
+    components = config.get("system_components", [])
+    files = {path: generate(config) for path, generate in EXPORT_FILES.items()}
+    context = {
+        "project_name": project_name,
+        "problem_statement": config.get("problem_statement") or "",
+        "component_list": "\n".join(f"- {c}" for c in components) or "- none selected",
+    }
+    files["README.md"] = get_template("README.md").substitute(context)
+    files["main.py"] = get_template("main.py").substitute(context)
+    files["src/__init__.py"] = ""
+    for component in components:
+        package = COMPONENT_PACKAGES.get(component)
+        if package:
+            files[f"src/{package}/__init__.py"] = get_template("component").substitute(context, component=component)
+    _render_cache[key] = files
+    while len(_render_cache) > MAX_CACHED_RENDERS:
+        _render_cache.popitem(last=False)
+    return files
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(_STAMP.sub(b"", data)).hexdigest()
+
+
+def write_if_changed(path, content: str) -> str:
+    """
+    Write a file atomically unless its content (ignoring the generation stamp) is
+    already on disk. Returns "created", "updated" or "unchanged".
+    """
+    path = pathlib.Path(path)
+    data = content.encode("utf-8")
+    try:
+        current = path.read_bytes()
+    except FileNotFoundError:
+        status, mode = "created", NEW_FILE_MODE
+    else:
+        if content_hash(current) == content_hash(data):
+            return "unchanged"
+        status, mode = "updated", path.stat().st_mode & 0o7777
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp creates the file owner-only; keep the target's mode instead
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return status
+
+
+def scaffold(config: Dict, output_dir, max_writers: int = MAX_WRITERS) -> Dict:
+    """Render the skeleton for a config and write the files that changed. Returns a report."""
+    start = time.perf_counter()
+    files = render_project(config)
+    output_dir = pathlib.Path(output_dir)
+    with ThreadPoolExecutor(max_workers=max_writers) as pool:
+        statuses = dict(zip(files, pool.map(lambda path: write_if_changed(output_dir / path, files[path]), files), strict=True))
+    return {
+        "output_dir": str(output_dir),
+        "files": statuses,
+        "created": sum(s == "created" for s in statuses.values()),
+        "updated": sum(s == "updated" for s in statuses.values()),
+        "unchanged": sum(s == "unchanged" for s in statuses.values()),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def latest_config(configs_dir=CONFIGS_DIR) -> Optional[pathlib.Path]:
+    """The most recently saved project configuration."""
+    configs = sorted(pathlib.Path(configs_dir).glob("*.json"), key=os.path.getmtime)
+    return configs[-1] if configs else None
+
+
+def project_slug(config: Dict) -> str:
+    name = config.get("project_name") or ""
+    slug = "".join(c for c in name.lower() if c.isalnum() or c in (" ", "_")).strip().replace(" ", "_")
+    # A name without letters or digits must not turn into an empty path component
+    return slug if slug.strip("_") else "untitled_project"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaffold a project from a saved charter configuration")
+    parser.add_argument("--config", type=pathlib.Path, help="saved configuration (default: the most recent in configs/)")
+    parser.add_argument("--output", type=pathlib.Path, help="project directory (default: generated/<project name>)")
+    parser.add_argument("--writers", type=int, default=MAX_WRITERS, help="parallel file writers")
+    args = parser.parse_args()
+
+    config_path = args.config or latest_config()
+    if config_path is None:
+        print("❌ No saved configuration found. Please run: make streamlit")
+        sys.exit(1)
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    output_dir = args.output or GENERATED_DIR / project_slug(config)
+
+    report = scaffold(config, output_dir, args.writers)
+    for path, status in report["files"].items():
+        print(f"{'⏭️ ' if status == 'unchanged' else '✅'} {status:<9} {path}")
+    print(f"📁 {output_dir}: {report['created']} created, {report['updated']} updated, {report['unchanged']} unchanged in {report['elapsed_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Full-text search over saved configs, docs/*.md and chat messages.
+
+Documents live in a SQLite FTS5 table (porter-stemmed, BM25-ranked, with
+highlighted snippets) persisted under configs/cache/. The index is updated
+document by document: saving a config, writing a doc export or sending a chat
+message replaces only that document. On startup, files whose mtime changed since
+they were indexed are re-indexed and deleted files are removed.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+CONFIGS_DIR = "configs"
+DOCS_DIR = "docs"
+INDEX_PATH = os.path.join(CONFIGS_DIR, "cache", "search.sqlite")
+
+# Document kinds
+CONFIG, DOC, CHAT = "config", "doc", "chat"
+
+# Words around a match in a result snippet
+SNIPPET_TOKENS = 12
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+    title, body, kind UNINDEXED, ref UNINDEXED, tokenize = 'porter unicode61', prefix = '2 3'
+);
+CREATE TABLE IF NOT EXISTS sources (
+    ref TEXT PRIMARY KEY,
+    doc_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    mtime REAL
+);
+"""
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def _flatten_values(value) -> Iterable[str]:
+    """All strings and numbers of a config, for indexing."""
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _flatten_values(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _flatten_values(item)
+    elif value is not None and not isinstance(value, bool):
+        yield str(value)
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    User input as an FTS5 query: every word must match, the last one as a prefix
+    (so results appear while typing). Words are quoted, so FTS syntax in the input is inert.
+    """
+    terms = _TERM.findall(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+class SearchIndex:
+    """Incremental FTS5 index; safe to share between Streamlit sessions."""
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def _upsert(self, kind: str, ref: str, title: str, body: str, mtime: Optional[float]):
+        row = self._db.execute("SELECT doc_id FROM sources WHERE ref = ?", (ref,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM documents WHERE rowid = ?", (row[0],))
+        cursor = self._db.execute(
+            "INSERT INTO documents (title, body, kind, ref) VALUES (?, ?, ?, ?)", (title, body, kind, ref)
+        )
+        self._db.execute(
+            "INSERT OR REPLACE INTO sources (ref, doc_id, kind, mtime) VALUES (?, ?, ?, ?)",
+            (ref, cursor.lastrowid, kind, mtime),
+        )
+
+    def upsert(self, kind: str, ref: str, title: str, body: str, mtime: Optional[float] = None):
+        """Index a document, replacing any earlier version with the same ref."""
+        with self._lock, self._db:
+            self._upsert(kind, ref, title, body, mtime)
+
+    def remove(self, ref: str):
+        with self._lock, self._db:
+            row = self._db.execute("SELECT doc_id FROM sources WHERE ref = ?", (ref,)).fetchone()
+            if row is not None:
+                self._db.execute("DELETE FROM documents WHERE rowid = ?", (row[0],))
+                self._db.execute("DELETE FROM sources WHERE ref = ?", (ref,))
+
+    def index_config(self, path: str, config: Optional[Dict] = None):
+        """Index a saved config file (read from disk unless given)."""
+        if config is None:
+            with open(path, "r") as f:
+                config = json.load(f)
+        title = str(config.get("project_name") or os.path.basename(path)) if isinstance(config, dict) else os.path.basename(path)
+        self.upsert(CONFIG, path, title, " ".join(_flatten_values(config)), os.path.getmtime(path))
+
+    def index_doc(self, path: str):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        self.upsert(DOC, path, os.path.basename(path), text, os.path.getmtime(path))
+
+    def add_chat_message(self, session_id: str, role: str, content: str, timestamp: Optional[float] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        ref = f"chat:{session_id}:{timestamp:.6f}:{role}"
+        self.upsert(CHAT, ref, f"{role} · session {session_id[:8]}", content, timestamp)
+
+    def sync_files(self, configs_dir: str = CONFIGS_DIR, docs_dir: str = DOCS_DIR) -> int:
+        """Re-index configs and docs changed on disk since they were indexed, drop deleted ones. Returns the files indexed."""
+        with self._lock:
+            known = {
+                ref: (kind, mtime)
+                for ref, kind, mtime in self._db.execute("SELECT ref, kind, mtime FROM sources WHERE kind != ?", (CHAT,))
+            }
+        seen = set()
+        indexed = 0
+        for directory, kind, suffix in ((configs_dir, CONFIG, ".json"), (docs_dir, DOC, ".md")):
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                if not entry.is_file() or not entry.name.endswith(suffix):
+                    continue
+                seen.add(entry.path)
+                if known.get(entry.path, (None, None))[1] == entry.stat().st_mtime:
+                    continue
+                try:
+                    self.index_config(entry.path) if kind == CONFIG else self.index_doc(entry.path)
+                    indexed += 1
+                except (OSError, ValueError) as e:
+                    print(f"[Search] Skipping {entry.path}: {e}")
+        for ref in set(known) - seen:
+            self.remove(ref)
+        return indexed
+
+    def search(self, query: str, limit: int = 10, kinds: Optional[List[str]] = None) -> List[Dict]:
+        """Best matches first (BM25, title weighted x2), each with a highlighted snippet."""
+        match = build_match_query(query)
+        if match is None:
+            return []
+        kind_filter, kind_params = "", []
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            kind_params = list(kinds)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT kind, ref, title, snippet(documents, 1, '**', '**', '…', ?), bm25(documents, 2.0, 1.0) AS score "
+                f"FROM documents WHERE documents MATCH ?{kind_filter} ORDER BY score LIMIT ?",
+                [SNIPPET_TOKENS, match, *kind_params, limit],
+            ).fetchall()
+        return [
+            {"kind": kind, "ref": ref, "title": title, "snippet": snippet, "score": -score}
+            for kind, ref, title, snippet, score in rows
+        ]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM sources").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """The app's search index, brought up to date with configs/ and docs/ on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+            _index.sync_files()
+    return _index
+
+
+def note_saved_file(path: str, config: Optional[Dict] = None):
+    """Index a config or doc the app just wrote, if the search index is open."""
+    if _index is None:
+        return
+    try:
+        if path.endswith(".json"):
+            _index.index_config(path, config)
+        else:
+            _index.index_doc(path)
+    except (OSError, ValueError) as e:
+        print(f"[Search] Could not index {path}: {e}")
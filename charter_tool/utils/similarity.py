@@ -0,0 +1,215 @@
+"""
+Similar-project search over the saved configurations.
+
+Every config in configs/ becomes one row of a NumPy matrix: one-hot columns for its
+users, interaction patterns and system components, followed by a hashed TF-IDF
+vector of its project name and problem statement. Rows are L2-normalized per block,
+so a top-k query is a single matrix-vector product. Saving a config adds its row
+without rescanning the directory.
+"""
+
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+CONFIGS_DIR = "configs"
+
+# Config fields encoded as one-hot columns
+CATEGORY_FIELDS = ("users", "interaction_patterns", "system_components")
+
+# Width of the hashed TF-IDF block
+HASH_DIM = 256
+
+# Share of the similarity coming from the categories vs the problem statement
+CATEGORY_WEIGHT = 0.6
+TEXT_WEIGHT = 0.4
+
+# IDF weights are recomputed once the number of configs grew by this fraction
+REWEIGHT_GROWTH = 0.1
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _hash_terms(text: str) -> Dict[int, int]:
+    counts = {}
+    for word in _WORD.findall(text.lower()):
+        if len(word) > 2:
+            bucket = zlib.crc32(word.encode("utf-8")) % HASH_DIM
+            counts[bucket] = counts.get(bucket, 0) + 1
+    return counts
+
+
+def _categories(config: Dict) -> List[str]:
+    values = []
+    for field in CATEGORY_FIELDS:
+        items = config.get(field) or []
+        if isinstance(items, str):
+            items = [items]
+        values += [f"{field}={item}" for item in items]
+    return values
+
+
+class SimilarityIndex:
+    """Top-k similar saved configs by one-hot categories and hashed TF-IDF text."""
+
+    def __init__(self, configs_dir: str = CONFIGS_DIR):
+        self.configs_dir = configs_dir
+        self._lock = threading.Lock()
+        self.entries = []  # {"path", "project_name"} per row
+        self._paths = set()
+        self._vocabulary = {}  # "field=value" -> category column
+        self._categories = np.zeros((64, 64), dtype=np.float32)
+        self._tf = np.zeros((64, HASH_DIM), dtype=np.float32)
+        self._df = np.zeros(HASH_DIM, dtype=np.float32)
+        self._idf = np.ones(HASH_DIM, dtype=np.float32)
+        self._weighted_rows = 0
+        self._text = np.zeros((64, HASH_DIM), dtype=np.float32)  # normalized TF-IDF rows
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _grow(self, rows: int, columns: int):
+        # Capacity doubles, so adding a config is amortized O(row width)
+        capacity = self._tf.shape[0]
+        if rows > capacity:
+            capacity = max(rows, capacity * 2)
+        width = self._categories.shape[1]
+        if columns > width:
+            width = max(columns, width * 2)
+        if (capacity, width) != self._categories.shape:
+            n = len(self.entries)
+            categories = np.zeros((capacity, width), dtype=np.float32)
+            categories[:n, :self._categories.shape[1]] = self._categories[:n]
+            self._categories = categories
+        if capacity != self._tf.shape[0]:
+            n = len(self.entries)
+            for name in ("_tf", "_text"):
+                grown = np.zeros((capacity, HASH_DIM), dtype=np.float32)
+                grown[:n] = getattr(self, name)[:n]
+                setattr(self, name, grown)
+
+    def _category_row(self, config: Dict, grow: bool) -> np.ndarray:
+        if grow:
+            for value in _categories(config):
+                self._vocabulary.setdefault(value, len(self._vocabulary))
+            self._grow(len(self.entries) + 1, len(self._vocabulary))
+        row = np.zeros(self._categories.shape[1], dtype=np.float32)
+        for value in _categories(config):
+            column = self._vocabulary.get(value)
+            if column is not None:
+                row[column] = 1.0
+        norm = np.linalg.norm(row)
+        return row / norm if norm else row
+
+    def _tf_row(self, config: Dict) -> np.ndarray:
+        row = np.zeros(HASH_DIM, dtype=np.float32)
+        for bucket, count in _hash_terms(f"{config.get('project_name', '')} {config.get('problem_statement', '')}").items():
+            row[bucket] = 1.0 + np.log(count)
+        return row
+
+    def _text_row(self, tf_row: np.ndarray) -> np.ndarray:
+        row = tf_row * self._idf
+        norm = np.linalg.norm(row)
+        return row / norm if norm else row
+
+    def _reweight(self):
+        n = len(self.entries)
+        self._idf = (np.log((1 + n) / (1 + self._df)) + 1).astype(np.float32)
+        text = self._tf[:n] * self._idf
+        norms = np.linalg.norm(text, axis=1, keepdims=True)
+        self._text[:n] = np.divide(text, norms, out=np.zeros_like(text), where=norms > 0)
+        self._weighted_rows = n
+
+    def add(self, config: Dict, path: Optional[str] = None):
+        """Index one config (rows are never re-read from disk)."""
+        if not isinstance(config, dict):
+            return
+        with self._lock:
+            if path is not None:
+                if path in self._paths:
+                    return
+                self._paths.add(path)
+            category_row = self._category_row(config, grow=True)
+            tf_row = self._tf_row(config)
+            row = len(self.entries)
+            self._categories[row] = category_row
+            self._tf[row] = tf_row
+            self._df += tf_row > 0
+            self.entries.append({"path": path, "project_name": config.get("project_name", "")})
+            if len(self.entries) > self._weighted_rows * (1 + REWEIGHT_GROWTH):
+                self._reweight()
+            else:
+                self._text[row] = self._text_row(tf_row)
+
+    def refresh(self) -> int:
+        """Add configs saved in the configs directory since the last refresh. Returns how many were added."""
+        if not os.path.isdir(self.configs_dir):
+            return 0
+        added = 0
+        for filename in sorted(os.listdir(self.configs_dir)):
+            path = os.path.join(self.configs_dir, filename)
+            if not filename.endswith(".json") or path in self._paths:
+                continue
+            try:
+                with open(path, "r") as f:
+                    config = json.load(f)
+            except (OSError, ValueError):
+                self._paths.add(path)
+                continue
+            self.add(config, path)
+            added += 1
+        return added
+
+    def query(self, config: Dict, k: int = 5, exclude_project: Optional[str] = None) -> List[Dict]:
+        """Top-k most similar configs, one per project name, with their cosine score (0..1)."""
+        with self._lock:
+            n = len(self.entries)
+            if n == 0:
+                return []
+            category_row = self._category_row(config, grow=False)
+            text_row = self._text_row(self._tf_row(config))
+            scores = (
+                CATEGORY_WEIGHT * (self._categories[:n] @ category_row)
+                + TEXT_WEIGHT * (self._text[:n] @ text_row)
+            )
+            # Projects are saved once per version, so over-fetch and keep each project's best match
+            candidates = min(n, (k + 1) * 4)
+            top = np.argpartition(-scores, candidates - 1)[:candidates]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            results, seen = [], set()
+            for i in top:
+                name = self.entries[i]["project_name"]
+                if scores[i] <= 0 or name in seen or (exclude_project and name == exclude_project):
+                    continue
+                seen.add(name)
+                results.append({**self.entries[i], "score": float(scores[i])})
+                if len(results) == k:
+                    break
+            return results
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_similarity_index(configs_dir: str = CONFIGS_DIR) -> SimilarityIndex:
+    """The index of a configs directory, filled from disk on first use."""
+    key = os.path.abspath(configs_dir)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = SimilarityIndex(configs_dir)
+    index.refresh()
+    return index
+
+
+def note_saved_config(config: Dict, path: str, configs_dir: str = CONFIGS_DIR):
+    """Add a just-saved config to the index of its directory, if that index is loaded."""
+    index = _indexes.get(os.path.abspath(configs_dir))
+    if index is not None:
+        index.add(config, path)
@@ -0,0 +1,94 @@
+"""
+Test admission control and cost accounting of the chat model
+"""
+
+import sys
+import os
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from chat import admission
+
+
+def test_performance_constraint_sets_the_slo():
+    assert admission.parse_performance_slo("< 2 sec") == 2.0
+    assert admission.parse_performance_slo("< 500 ms") == 0.5
+    assert admission.parse_performance_slo(None) == admission.DEFAULT_SLO_SECONDS
+
+
+def test_session_over_budget_is_throttled():
+    """A session that spent its bucket is answered by the rules agent until it refills"""
+    controller = admission.AdmissionController()
+    constraints = {"budget": 10, "performance": "< 5 sec"}
+    assert controller.admit("s1", "Demo", constraints) == (True, None)
+    controller.record("s1", prompt_tokens=3000, response_tokens=2000, compute_seconds=1.0)
+
+    admitted, reason = controller.admit("s1", "Demo", constraints)
+    assert not admitted and "budget" in reason
+    # Sessions of other projects keep their own buckets
+    assert controller.admit("s2", "Other", constraints) == (True, None)
+    assert controller.usage()["s1"]["throttled"] == 1
+
+
+def test_sessions_of_a_project_share_its_budget():
+    """Opening more sessions does not multiply a project's budget"""
+    controller = admission.AdmissionController()
+    constraints = {"budget": 10}
+    assert controller.admit("s1", "Demo", constraints) == (True, None)
+    controller.record("s1", prompt_tokens=3000, response_tokens=2000, compute_seconds=1.0)
+
+    admitted, reason = controller.admit("s2", "Demo", constraints)
+    assert not admitted and "project token budget" in reason
+
+
+def test_zero_budget_is_not_the_default():
+    assert admission.monthly_budget({"budget": 0}) == 0
+    assert admission.monthly_budget({}) == admission.DEFAULT_MONTHLY_BUDGET_EUR
+    admitted, reason = admission.AdmissionController().admit("s1", "Demo", {"budget": 0})
+    assert not admitted and "no budget" in reason
+
+
+def test_queue_over_slo_is_shed():
+    controller = admission.AdmissionController()
+    controller.record("s1", 10, 10, compute_seconds=3.0)
+    constraints = {"performance": "< 5 sec"}
+    with controller.queued():
+        assert controller.admit("s2", constraints=constraints) == (True, None)
+        with controller.queued():
+            admitted, reason = controller.admit("s3", constraints=constraints)
+    assert not admitted and "SLO" in reason
+    assert controller.admit("s3", constraints=constraints) == (True, None)
+
+
+def test_cost_report_sums_projects(tmp_path):
+    controller = admission.AdmissionController()
+    controller.admit("s1", "Demo")
+    controller.admit("s2", "Demo")
+    controller.record("s1", 400, 100, 2.0)
+    controller.record("s2", 400, 100, 1.0)
+    project = controller.project_usage()["Demo"]
+    assert project["sessions"] == 2
+    assert project["turns"] == 2
+    assert abs(project["cost_eur"] - 1000 / 1000 * admission.EUR_PER_1K_TOKENS) < 1e-9
+
+    report_path = admission.write_cost_report(controller, tmp_path / "cost_control.md")
+    report = report_path.read_text()
+    assert "| Demo | 2 | 2 | 800 | 200 |" in report
+
+
+def test_idle_sessions_are_evicted_into_project_totals():
+    """Buckets and usage of idle sessions are dropped; the project keeps their totals"""
+    controller = admission.AdmissionController(idle_ttl=60)
+    controller.admit("gone", "Demo")
+    controller.record("gone", 400, 100, 2.0)
+    controller.admit("active", "Demo")
+    controller.record("active", 40, 10, 1.0)
+    controller._last_seen["gone"] -= 120
+
+    assert controller.evict_idle() == 1
+    assert set(controller.usage()) == {"active"}
+    assert "gone" not in controller._buckets
+    project = controller.project_usage()["Demo"]
+    assert (project["sessions"], project["turns"], project["prompt_tokens"], project["response_tokens"]) == (2, 2, 440, 110)
+    assert abs(project["cost_eur"] - 550 / 1000 * admission.EUR_PER_1K_TOKENS) < 1e-9
@@ -0,0 +1,278 @@
+"""
+Test the chat agent of the Charter Tool
+"""
+
+import sys
+import os
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from chat import agent
+from chat.personas import Persona, PersonaRegistry
+
+
+def test_draft_models_cover_sidebar_models():
+    """Every sidebar model should have a draft model for assisted decoding"""
+    assert agent.HF_MODEL_NAME in agent.DRAFT_MODEL_OPTIONS
+    assert "meta-llama/Llama-3-8B-Instruct" in agent.DRAFT_MODEL_OPTIONS
+
+
+def test_generation_stats_plain():
+    """Plain decoding reports tokens/sec without acceptance rate"""
+    stats = agent.compute_generation_stats(100, 2.0, main_calls=100)
+    assert stats["tokens_per_sec"] == 50.0
+    assert stats["assisted"] is False
+    assert "acceptance_rate" not in stats
+
+
+def test_generation_stats_assisted():
+    """Assisted decoding derives accepted draft tokens from main-model passes"""
+    stats = agent.compute_generation_stats(100, 1.0, main_calls=25, draft_calls=100)
+    assert stats["assisted"] is True
+    assert stats["accepted_tokens"] == 75
+    assert stats["acceptance_rate"] == 0.75
+
+
+def test_intent_from_category_and_keywords():
+    """Guided Questions categories take precedence over prompt keywords"""
+    assert agent.classify_prompt_intent("what is the budget?") == "constraints"
+    assert agent.classify_prompt_intent("what is the budget?", "Architecture") == "architecture"
+    assert agent.classify_prompt_intent("hello") == "general"
+
+
+def test_rules_fallback_uses_intent():
+    """The rules fallback answers per intent"""
+    assert agent.rules_chat_agent("Who are the users?") == agent.RULES_RESPONSES["users"]
+    assert agent.llm_chat_agent("Tell me the timeline") == agent.RULES_RESPONSES["timeline"]
+
+
+def test_profiles_stay_within_former_budget():
+    """No generation profile exceeds the old fixed 256-token budget"""
+    for intent in agent.GENERATION_PROFILES:
+        profile = agent.get_generation_profile(intent)
+        assert profile["max_new_tokens"] <= agent.BASELINE_MAX_NEW_TOKENS
+        assert "👤 You:" in profile["stop_sequences"]
+
+
+def test_stop_sequence_and_repetition():
+    """Generated text is cut at the next turn marker and repeats are detected"""
+    text = "Who are your users?\n👤 You: analysts"
+    assert agent.truncate_at_stop_sequence(text, agent.STOP_SEQUENCES) == "Who are your users?\n"
+    assert agent.is_repeating([1, 2, 3, 9, 1, 2, 3], 3)
+    assert not agent.is_repeating([1, 2, 3, 4, 5, 6], 3)
+
+
+def test_single_flight_load_runs_loader_once(monkeypatch):
+    """Concurrent callers share one load"""
+    import threading
+    import time
+
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return "model"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(agent._single_flight_load(("test", "shared"), slow_loader)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["model"] * 5
+    assert len(calls) == 1
+
+
+def test_failed_load_is_negatively_cached(monkeypatch):
+    """A failed load is not retried until its backoff has passed"""
+    calls = []
+
+    def failing_loader():
+        calls.append(1)
+        raise OSError("no weights")
+
+    key = ("test", "broken")
+    assert agent._single_flight_load(key, failing_loader) is None
+    assert agent._single_flight_load(key, failing_loader) is None
+    assert len(calls) == 1
+    assert agent._load_failures[key]["failures"] == 1
+
+    # Once the backoff expires the load is retried and the backoff doubles
+    agent._load_failures[key]["retry_at"] = 0
+    assert agent._single_flight_load(key, failing_loader) is None
+    assert len(calls) == 2
+    assert agent._load_failures.pop(key)["failures"] == 2
+
+
+def test_interrupted_load_releases_waiters():
+    """A load interrupted by a BaseException does not leave the waiting sessions blocked"""
+    import threading
+    import time
+
+    calls = []
+    started, release = threading.Event(), threading.Event()
+
+    def interrupted_loader():
+        calls.append(1)
+        started.set()
+        release.wait()
+        raise KeyboardInterrupt
+
+    key = ("test", "interrupted")
+    errors = []
+
+    def load():
+        try:
+            agent._single_flight_load(key, interrupted_loader)
+        except KeyboardInterrupt:
+            errors.append("owner")
+
+    owner = threading.Thread(target=load)
+    owner.start()
+    started.wait()
+    waiter_errors = []
+
+    def wait_for_load():
+        try:
+            agent._single_flight_load(key, interrupted_loader)
+        except KeyboardInterrupt:
+            waiter_errors.append("waiter")
+
+    waiter = threading.Thread(target=wait_for_load)
+    waiter.start()
+    # Let the waiter block on the owner's load before interrupting it
+    time.sleep(0.1)
+    release.set()
+    owner.join()
+    waiter.join(timeout=5)
+
+    assert not waiter.is_alive()
+    assert errors == ["owner"] and waiter_errors == ["waiter"]
+    assert len(calls) == 1
+    # An interrupt is not a failed load: nothing is cached and the next call loads again
+    assert key not in agent._load_failures
+    assert agent._single_flight_load(key, lambda: "model") == "model"
+
+
+def test_degraded_mode_without_transformers():
+    if not agent.HF_AVAILABLE:
+        assert agent.is_degraded()
+        assert agent.get_model_status()["reason"]
+
+
+def test_identical_concurrent_requests_share_one_generation(monkeypatch):
+    """Concurrent identical chat requests are coalesced"""
+    import threading
+    import time
+
+    calls = []
+
+    def slow_generate(prompt, *args):
+        calls.append(prompt)
+        time.sleep(0.2)
+        return f"answer to {prompt}", {}
+
+    monkeypatch.setattr(agent, "_generate_chat_response", slow_generate)
+    before = agent.get_coalescing_stats()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(agent.llm_chat_agent("What problem are we solving?", category="Problem Definition")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    after = agent.get_coalescing_stats()
+
+    assert results == ["answer to What problem are we solving?"] * 4
+    assert len(calls) == 1
+    assert after["deduplicated"] - before["deduplicated"] == 3
+    assert after["generations"] - before["generations"] == 1
+
+
+def test_coalesced_requests_are_admitted_and_charged(monkeypatch):
+    """Sessions sharing another's generation still go through admission and pay its tokens"""
+    import threading
+    import time
+
+    from chat.admission import AdmissionController
+
+    controller = AdmissionController()
+    started = threading.Event()
+
+    def slow_generate(prompt, *args):
+        started.set()
+        time.sleep(0.2)
+        return "shared answer", {"prompt_tokens": 30, "new_tokens": 20, "elapsed_sec": 0.2}
+
+    monkeypatch.setattr(agent, "_generate_chat_response", slow_generate)
+    monkeypatch.setattr(agent, "get_llm_pipeline", lambda *args: object())
+    monkeypatch.setattr(agent, "get_admission_controller", lambda: controller)
+    prompt = "Which architecture components do we need?"
+    leader = threading.Thread(target=agent.llm_chat_agent, args=(prompt,), kwargs={"session_id": "leader"})
+    leader.start()
+    started.wait()
+    # An identical request from a session that has spent its budget is shed, not coalesced
+    controller.admit("broke", constraints={"budget": 1})
+    controller.record("broke", 5000, 0, 1.0)
+    shed = agent.llm_chat_agent(prompt, session_id="broke", constraints={"budget": 1})
+    follower = agent.llm_chat_agent(prompt, session_id="follower")
+    leader.join()
+
+    assert shed == agent.rules_chat_agent(prompt)
+    assert "budget" in agent.get_last_generation_stats("broke")["shed_reason"]
+    assert follower == "shared answer"
+    assert agent.get_last_generation_stats("follower")["coalesced"]
+    usage = controller.usage()["follower"]
+    assert (usage["turns"], usage["prompt_tokens"], usage["response_tokens"], usage["compute_seconds"]) == (1, 30, 20, 0.0)
+    assert controller.avg_service_sec == 1.0
+
+
+def test_generation_stats_are_kept_per_session(monkeypatch):
+    """A session reads the stats of its own last turn, not of whoever generated last"""
+    def generate(prompt, *args):
+        return f"answer to {prompt}", {"new_tokens": len(prompt)}
+
+    monkeypatch.setattr(agent, "_generate_chat_response", generate)
+    agent.llm_chat_agent("Who are the users?", session_id="alice")
+    agent.llm_chat_agent("What is the timeline for delivery?", session_id="bob")
+
+    assert agent.get_last_generation_stats("alice") == {"new_tokens": len("Who are the users?")}
+    assert agent.get_last_generation_stats("bob") == {"new_tokens": len("What is the timeline for delivery?")}
+    assert agent.get_last_generation_stats("carol") == {}
+
+
+def test_request_key_separates_context_and_decoding():
+    base = agent.request_key("Who are the users?", ["Hello"], system_context="ctx")
+    assert base == agent.request_key("Who are the users?", [{"role": "user", "content": "Hello", "timestamp": 1}], system_context="ctx")
+    assert base != agent.request_key("Who are the users?", ["Hi"], system_context="ctx")
+    assert base != agent.request_key("Who are the users?", ["Hello"], system_context="other")
+    assert base != agent.request_key("Who are the users?", ["Hello"], system_context="ctx", category="Architecture")
+    assert base != agent.request_key("Who are the users?", ["Hello"], system_context="ctx", draft_model_name="draft")
+
+
+def test_persona_without_its_adapter_falls_back_to_the_base_model(monkeypatch):
+    """A persona whose adapter cannot be activated still answers, on the base model"""
+    coach = Persona.from_dict({"persona": {"id": "coach", "system_prompt": "Coach", "adapter": "adapters/coach"}})
+    registry = PersonaRegistry({"coach": coach})
+
+    def prefix_state(persona_id, pipe):
+        raise RuntimeError("peft is required for persona adapters")
+
+    calls = []
+
+    def generate(prompt, history, model_name, system_context, draft_model_name, category, prefix_state, adapter, *args):
+        calls.append((system_context, prefix_state, adapter))
+        return "answer", {}
+
+    monkeypatch.setattr(registry, "prefix_state", prefix_state)
+    monkeypatch.setattr(agent, "get_persona_registry", lambda: registry)
+    monkeypatch.setattr(agent, "_generate_chat_response", generate)
+    assert agent.multi_agent_chat("Who are the users?", "coach") == "answer"
+    assert calls == [("Coach", None, None)]
@@ -0,0 +1,53 @@
+"""
+Test the streamed ZIP bundle of the export artifacts
+"""
+
+import sys
+import os
+import io
+import json
+import glob
+import zipfile
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from utils import bundle
+from utils.exports import EXPORT_FILES
+
+CONFIGS_DIR = os.path.join(os.path.dirname(__file__), '..', 'configs')
+
+
+def _config():
+    with open(sorted(glob.glob(os.path.join(CONFIGS_DIR, "project_config_*.json")))[-1]) as f:
+        return json.load(f)
+
+
+def test_bundle_contains_every_export():
+    config = _config()
+    data, stats = bundle.build_bundle(config)
+    archive = zipfile.ZipFile(io.BytesIO(data))
+    assert archive.testzip() is None
+    root = bundle.project_slug(config)
+    assert sorted(archive.namelist()) == sorted(f"{root}/{path}" for path in EXPORT_FILES)
+    charter = archive.read(f"{root}/docs/generated_charter.md").decode("utf-8")
+    assert charter.startswith(f"# {config['project_name']} Charter")
+    assert stats["files"] == len(EXPORT_FILES) and stats["size_bytes"] == len(data)
+
+
+def test_stream_keeps_buffer_bounded():
+    """A large artifact is emitted in chunks instead of being buffered whole"""
+    config = dict(_config(), problem_statement=os.urandom(300_000).hex())
+    stats = {}
+    chunks = list(bundle.stream_bundle(config, chunk_size=16 * 1024, stats=stats))
+    assert len(chunks) > 10
+    assert stats["peak_buffer_bytes"] < 128 * 1024
+    assert zipfile.ZipFile(io.BytesIO(b"".join(chunks))).testzip() is None
+
+
+def test_name_without_letters_keeps_entries_in_a_folder():
+    """A project name with no letters or digits must not give absolute entries ("/Dockerfile")"""
+    config = dict(_config(), project_name="!!!")
+    assert bundle.bundle_file_name(config) == "untitled_project_bundle.zip"
+    archive = zipfile.ZipFile(io.BytesIO(bundle.build_bundle(config)[0]))
+    assert all(name.startswith("untitled_project/") for name in archive.namelist())
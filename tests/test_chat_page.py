@@ -0,0 +1,108 @@
+"""
+Test the Interactive Chat page: conversation context and handoff between sessions
+"""
+
+import sys
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from chat import agent, retrieval
+
+APP_PATH = os.path.join(os.path.dirname(__file__), '..', 'charter_tool', 'streamlit_app.py')
+
+
+@pytest.fixture
+def chat_calls(tmp_path, monkeypatch):
+    """Run the app in a scratch directory; record the system context and retrieved sections of every chat turn"""
+    monkeypatch.chdir(tmp_path)
+    for name in ("docs", "configs", "src"):
+        (tmp_path / name).mkdir()
+    monkeypatch.setattr(agent, "LLM_BACKEND", "rules")
+    calls = []
+    original = agent.llm_chat_agent
+
+    def recording_agent(prompt, history=None, model_name=None, system_context=None, *args, **kwargs):
+        calls.append({"prompt": prompt, "system_context": system_context, "context": kwargs.get("context"), "history": history})
+        return original(prompt, history, model_name, system_context, *args, **kwargs)
+
+    monkeypatch.setattr(agent, "llm_chat_agent", recording_agent)
+    return calls
+
+
+def _chat_session():
+    app = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    app.switch_page("app_pages/interactive_chat.py").run()
+    return app
+
+
+def test_sections_are_retrieved_per_turn_into_the_user_turn(chat_calls, monkeypatch):
+    """Every prompt gets its own sections in its user turn; the system message does not change"""
+    def fake_retrieve(prompt, top_k, exclude=""):
+        sections = "" if "weather" in prompt else f"## Sections for: {prompt.split()[-1]}"
+        return "" if sections in exclude else sections
+
+    monkeypatch.setattr(retrieval, "retrieve_context", fake_retrieve)
+    app = _chat_session()
+    for prompt in ("How is the weather?", "Who are the users?", "What is the budget?", "Again, who are the users?"):
+        app.chat_input[0].set_value(prompt).run()
+    assert not app.exception
+    assert [c["system_context"] for c in chat_calls] == [None] * 4
+    # An off-topic prompt gets no sections, later ones still do, and sections already given are not repeated
+    assert [c["context"] for c in chat_calls] == [None, "## Sections for: users?", "## Sections for: budget?", None]
+    # Earlier turns keep their sections, so the conversation prefix is the same on the next turn
+    assert chat_calls[-1]["history"][2]["context"] == "## Sections for: users?"
+
+
+def _button(app, label):
+    return next(b for b in app.button if b.label == label)
+
+
+def test_resume_restores_persona_and_model_of_the_exporting_session(chat_calls, tmp_path, monkeypatch):
+    """A session on another persona resumes with the exporting session's persona, model and context"""
+    from chat import handoff
+    from chat.models import MODEL_OPTIONS
+    from chat.personas import get_persona_registry
+    monkeypatch.setattr(handoff, "HANDOFF_DIR", tmp_path / "handoffs")
+    seeded = []
+    monkeypatch.setattr(handoff, "seed_snapshot", lambda snapshot, system_context=None: seeded.append(system_context) or True)
+    teacher = get_persona_registry().get("teacher")
+    labels = list(MODEL_OPTIONS)
+
+    exporting = _chat_session()
+    exporting.sidebar.radio(key="llm_model_radio").set_value(labels[1]).run()
+    exporting.selectbox(key="persona").set_value("teacher").run()
+    exporting.chat_input[0].set_value("Explain the problem statement").run()
+    _button(exporting, "Create Handoff Token").click().run()
+    token = exporting.session_state["handoff_token"]
+
+    resuming = _chat_session()
+    resuming.selectbox(key="persona").set_value("companion").run()
+    resuming.text_input(key="resume_token").set_value(token).run()
+    _button(resuming, "Resume Conversation").click().run()
+    assert not resuming.exception
+    assert resuming.session_state["active_persona"] == "teacher"
+    assert resuming.selectbox(key="persona").value == "teacher"
+    assert resuming.session_state["llm_model"] == MODEL_OPTIONS[labels[1]]
+    assert len(resuming.session_state["chat_messages"]) == 2
+    # Token IDs are seeded for the restored persona's context, not the resuming session's
+    assert seeded == [teacher.system_prompt]
+
+    resuming.chat_input[0].set_value("And the users?").run()
+    assert chat_calls[-1]["system_context"] == teacher.system_prompt
+
+
+def test_other_sessions_see_no_prompt_text(chat_calls):
+    """Chat events on the shared bus carry metadata, never the user's prompt"""
+    watching = _chat_session()
+    chatting = _chat_session()
+    chatting.chat_input[0].set_value("Our secret project is codenamed Falcon").run()
+    watching.switch_page("app_pages/telemetry.py").run()
+    assert not watching.exception
+    chat_events = [e for e in watching.session_state["recent_events"] if e["topic"].endswith("/chat")]
+    assert chat_events
+    assert not any("Falcon" in e["payload"] for e in chat_events)
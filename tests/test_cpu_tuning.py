@@ -0,0 +1,77 @@
+"""
+Test the CPU thread and affinity tuner
+"""
+
+import sys
+import os
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from chat import cpu_tuning
+
+
+def _fake_topology(tmp_path, siblings):
+    for cpu, text in siblings.items():
+        topology = tmp_path / f"cpu{cpu}" / "topology"
+        topology.mkdir(parents=True)
+        (topology / "thread_siblings_list").write_text(text + "\n")
+    return tmp_path
+
+
+def test_physical_cores_group_smt_siblings(tmp_path):
+    assert cpu_tuning.parse_cpu_list("0-2,8,10-11") == [0, 1, 2, 8, 10, 11]
+    sys_dir = _fake_topology(tmp_path, {0: "0,4", 1: "1,5", 2: "2,6", 3: "3,7", 4: "0,4", 5: "1,5", 6: "2,6", 7: "3,7"})
+    assert cpu_tuning.physical_cores(list(range(8)), sys_dir) == [[0, 4], [1, 5], [2, 6], [3, 7]]
+
+
+def test_candidate_layouts_cover_threads_pinning_and_replicas():
+    cores = [[0, 4], [1, 5], [2, 6], [3, 7]]
+    layouts = cpu_tuning.candidate_layouts(cores, max_replicas=4)
+    described = [cpu_tuning.describe(layout) for layout in layouts]
+    assert "8 threads, none pinning" in described
+    assert "4 threads, physical pinning" in described
+    physical = next(l for l in layouts if l["pinning"] == "physical" and l["groups"][0]["threads"] == 4)
+    assert physical["groups"][0]["cpus"] == [0, 1, 2, 3]
+    replicas = [l for l in layouts if l["pinning"] == "replicas"]
+    assert [len(l["groups"]) for l in replicas] == [2, 4]
+    assert replicas[0]["groups"] == [{"threads": 4, "cpus": [0, 1, 4, 5]}, {"threads": 4, "cpus": [2, 3, 6, 7]}]
+
+
+def test_tune_keeps_best_layout_and_profile_round_trips(tmp_path):
+    layouts = cpu_tuning.candidate_layouts([[0, 4], [1, 5]], max_replicas=2)
+
+    def fake_run(model_name, layout):
+        if layout["pinning"] == "compact":
+            raise RuntimeError("worker crashed")
+        # Replicas win on total throughput, physical pinning within one process
+        return {"none": 5.0, "physical": 8.0, "replicas": 12.0}[layout["pinning"]] + layout["groups"][0]["threads"] * 0.1
+
+    profile = cpu_tuning.tune("org/model", layouts, run=fake_run, log=lambda line: None)
+    assert profile["pinning"] == "replicas"
+    assert profile["single"]["pinning"] == "physical"
+    assert all(r["pinning"] != "compact" for r in profile["results"])
+
+    cpu_tuning.save_profile("org/model", profile, host="test-host", profiles_dir=tmp_path)
+    assert cpu_tuning.load_profile("org/model", host="test-host", profiles_dir=tmp_path)["tokens_per_sec"] == profile["tokens_per_sec"]
+    assert cpu_tuning.load_profile("org/other", host="test-host", profiles_dir=tmp_path) is None
+
+    # A profile tuned on different CPUs is ignored
+    cpu_tuning.save_profile("org/model", {**profile, "cpus": [0, 1, 2, 3, 4, 5, 6, 7, 99]}, host="test-host", profiles_dir=tmp_path)
+    assert cpu_tuning.load_profile("org/model", host="test-host", profiles_dir=tmp_path) is None
+
+
+def test_apply_profile_pins_the_process():
+    cpus = cpu_tuning.available_cpus()
+    profile = {
+        "pinning": "replicas",
+        "groups": [{"threads": 1, "cpus": cpus[:1]}, {"threads": 1, "cpus": cpus[-1:]}],
+        "single": {"pinning": "compact", "groups": [{"threads": len(cpus), "cpus": cpus}]},
+    }
+    try:
+        assert cpu_tuning.apply_profile(profile, replica=1)["cpus"] == cpus[-1:]
+        assert cpu_tuning.available_cpus() == cpus[-1:]
+        assert cpu_tuning.apply_profile(profile)["threads"] == len(cpus)
+    finally:
+        cpu_tuning._pin_process(cpus)
+    assert cpu_tuning.apply_profile(None) == {}
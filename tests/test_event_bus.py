@@ -0,0 +1,84 @@
+"""
+Test the event bus for multi-session coordination
+"""
+
+import asyncio
+import sys
+import os
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from utils.event_bus import (
+    BackgroundEventBus, EventBus, LocalBroker, LocalSocketTransport, topic_matches
+)
+
+
+def test_topic_matching():
+    assert topic_matches("session/+/chat", "session/abc/chat")
+    assert topic_matches("session/#", "session/abc/persona")
+    assert not topic_matches("session/+/chat", "session/abc/persona")
+    assert not topic_matches("session/+", "session/abc/chat")
+
+
+def test_fan_out_and_drop_policies():
+    async def run():
+        bus = await EventBus().start()
+        everyone = bus.subscribe("session/#")
+        chat_only = bus.subscribe("session/+/chat")
+        latest = bus.subscribe("session/#", maxsize=2, overflow="drop_oldest")
+        for i in range(3):
+            await bus.publish("session/a/chat", i)
+        await bus.publish("session/a/persona", "nurse")
+        assert [e.payload for e in everyone.drain()] == [0, 1, 2, "nurse"]
+        assert [e.payload for e in chat_only.drain()] == [0, 1, 2]
+        assert [e.payload for e in latest.drain()] == [2, "nurse"]
+        assert latest.dropped == 2
+
+    asyncio.run(run())
+
+
+def test_local_broker_connects_buses(tmp_path):
+    """Two buses on the local socket broker see each other's events"""
+    async def run():
+        broker = await LocalBroker(path=str(tmp_path / "bus.sock")).start()
+        first = await EventBus(LocalSocketTransport(path=broker.path)).start()
+        second = await EventBus(LocalSocketTransport(path=broker.path)).start()
+        subscription = second.subscribe("device/#")
+        await first.publish("device/kitchen/handoff", {"token": "abc"}, source="bedroom")
+        event = await asyncio.wait_for(subscription.get(), timeout=5)
+        assert event.payload == {"token": "abc"} and event.source == "bedroom"
+        await first.close()
+        await second.close()
+        await broker.close()
+
+    asyncio.run(run())
+
+
+def test_background_bus_for_sync_callers():
+    bus = BackgroundEventBus()
+    subscription = bus.subscribe("session/#")
+    bus.publish("session/a/chat", "hello").result(timeout=5)
+    assert [e.payload for e in bus.drain(subscription)] == ["hello"]
+
+
+def test_idle_subscriptions_expire():
+    """Subscriptions of sessions that stopped reading are dropped and get no more events"""
+    async def run():
+        bus = await EventBus(idle_ttl=60).start()
+        active = bus.subscribe("session/#")
+        gone = bus.subscribe("session/#")
+        gone.last_active -= 120
+        active.last_active -= 120
+        active.touch()
+        await bus.publish("session/a/chat", "hello")
+        assert gone.closed and not active.closed
+        assert gone.queue.empty() and active.queue.qsize() == 1
+        assert bus.stats["expired"] == 1
+        # Without a TTL nothing expires
+        forever = EventBus()
+        old = forever.subscribe("session/#")
+        old.last_active -= 10 ** 6
+        assert forever.expire_idle() == 0 and not old.closed
+
+    asyncio.run(run())
@@ -0,0 +1,74 @@
+"""
+Test the structured extraction from chat into project_config
+"""
+
+import sys
+import os
+import json
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from chat import extraction
+from chat.extraction import apply_extraction, check_json_prefix, extract_from_transcript, rules_extract
+
+VALID = json.dumps({
+    "users": ["Analysts"],
+    "system_components": ["Database"],
+    "constraints": {"budget": 800, "performance": "< 2 sec", "compliance": ["GDPR"]},
+    "timeline": {"start_date": "2025-09-01", "end_date": None, "phases": []},
+})
+
+
+def test_schema_accepts_every_prefix_of_valid_json():
+    assert check_json_prefix(VALID) == "complete"
+    for end in range(len(VALID)):
+        assert check_json_prefix(VALID[:end]) == "partial"
+
+
+def test_schema_rejects_values_outside_the_options():
+    assert check_json_prefix('{"users": ["Analy') == "partial"
+    assert check_json_prefix('{"users": ["Robots"') == "invalid"
+    assert check_json_prefix('{"system_components"') == "invalid"  # properties come in schema order
+    assert check_json_prefix(VALID.replace("2025-09-01", "next week")) == "invalid"
+    assert check_json_prefix(VALID + " trailing") == "invalid"
+
+
+def test_rules_extraction_fills_all_fields_at_once():
+    result = rules_extract(
+        "What are your constraints?",
+        "Analysts use it. Budget is €1,200 per month, responses within 3 seconds, GDPR applies. "
+        "Data comes from Kafka into Postgres. We go live by 2025-12-01.",
+    )
+    assert result == {
+        "users": ["Analysts"],
+        "system_components": ["Database", "Message Queue"],
+        "constraints": {"budget": 1200, "performance": "< 2 sec", "compliance": ["GDPR"]},
+        "timeline": {"end_date": "2025-12-01"},
+    }
+
+
+def test_only_new_messages_are_processed(monkeypatch):
+    calls = []
+    original = extraction.rules_extract
+    monkeypatch.setattr(extraction, "rules_extract", lambda q, a: calls.append(a) or original(q, a))
+    messages = [
+        {"role": "assistant", "content": "Who are the users?"},
+        {"role": "user", "content": "Analysts and end customers (cache test)"},
+    ]
+    first, stats = extract_from_transcript(messages)
+    assert stats["processed"] == 1 and sorted(first["users"]) == ["Analysts", "End Customers"]
+
+    messages.append({"role": "user", "content": "Budget 2k EUR, HIPAA compliant (cache test)"})
+    merged, stats = extract_from_transcript(messages)
+    assert (stats["processed"], stats["cached"]) == (1, 1)
+    assert len(calls) == 2
+    assert merged["constraints"] == {"budget": 2000, "compliance": ["HIPAA"]}
+
+
+def test_apply_extraction_merges_into_config():
+    config = {"users": ["Analysts"], "constraints": {"budget": 500, "performance": "< 1 sec", "compliance": []}}
+    changed = apply_extraction(config, {"users": ["Analysts", "End Customers"], "constraints": {"budget": 2000, "compliance": ["GDPR"]}})
+    assert changed == ["users", "constraints.budget", "constraints.compliance"]
+    assert config == {"users": ["Analysts", "End Customers"], "constraints": {"budget": 2000, "performance": "< 1 sec", "compliance": ["GDPR"]}}
+    assert apply_extraction(config, {"users": ["Analysts"]}) == []
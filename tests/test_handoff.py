@@ -0,0 +1,85 @@
+"""
+Test conversation handoff snapshots
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from chat import handoff, prompt_builder
+
+from tests.test_prompt_builder import CharTokenizer
+
+MESSAGES = [
+    {"role": "assistant", "content": "What problem are you solving?", "timestamp": 1.0},
+    {"role": "user", "content": "Invoice matching", "timestamp": 2.0},
+]
+
+
+def test_snapshot_round_trip():
+    snapshot = handoff.create_snapshot(MESSAGES, persona="teacher", model_name="none")
+    restored = handoff.deserialize_snapshot(handoff.serialize_snapshot(snapshot))
+    assert restored["messages"] == MESSAGES
+    assert restored["persona"] == "teacher"
+    with pytest.raises(ValueError):
+        handoff.deserialize_snapshot(b"garbage")
+
+
+def test_corrupt_snapshot_is_an_unknown_token(tmp_path):
+    token = handoff.export_handoff(MESSAGES, model_name="none", handoff_dir=tmp_path)
+    path = tmp_path / f"{token}.snap"
+    blob = path.read_bytes()
+    for corrupt in (b"", b"garbage", blob[:4] + b"not zlib", blob[:-5]):
+        path.write_bytes(corrupt)
+        assert handoff.load_handoff(token, handoff_dir=tmp_path) is None
+    snapshot = handoff.create_snapshot(MESSAGES, model_name="none")
+    snapshot["token_ids"] = "not base64!"
+    path.write_bytes(handoff.serialize_snapshot(snapshot))
+    assert handoff.import_handoff(token, handoff_dir=tmp_path) is None
+
+
+def test_handoff_resumes_with_cached_token_ids(tmp_path):
+    """Token IDs encoded in one session seed the prompt builder of the next"""
+    tokenizer = CharTokenizer()
+    builder = prompt_builder.get_prompt_builder("handoff-model", tokenizer)
+    conversation = [{"role": "system", "content": "Charter"}] + [
+        {"role": m["role"], "content": m["content"]} for m in MESSAGES
+    ]
+    builder.encode(conversation)
+
+    token = handoff.export_handoff(MESSAGES, model_name="handoff-model", system_context="Charter", handoff_dir=tmp_path)
+    assert handoff.import_handoff("missing", handoff_dir=tmp_path) is None
+
+    # A fresh session: no builder for the model yet
+    prompt_builder._prompt_builders.pop("handoff-model")
+    snapshot = handoff.import_handoff(token, system_context="Charter", handoff_dir=tmp_path)
+    assert snapshot["messages"] == MESSAGES
+
+    resumed = prompt_builder.get_prompt_builder("handoff-model", tokenizer)
+    resumed.encode(conversation)
+    assert resumed.stats["encoded_chars"] == len("<|im_start|>assistant\n")
+
+
+def test_seeding_follows_the_snapshot_persona_context(tmp_path):
+    """Token IDs encoded under one persona only seed a session using that persona's context"""
+    tokenizer = CharTokenizer()
+    builder = prompt_builder.get_prompt_builder("persona-model", tokenizer)
+    builder.encode([{"role": "system", "content": "You are a teacher"}] + [{"role": m["role"], "content": m["content"]} for m in MESSAGES])
+    token = handoff.export_handoff(MESSAGES, persona="teacher", model_name="persona-model", system_context="You are a teacher", handoff_dir=tmp_path)
+
+    snapshot = handoff.load_handoff(token, handoff_dir=tmp_path)
+    assert snapshot["persona"] == "teacher" and snapshot["model"] == "persona-model"
+    # The resuming session's own persona would not match the encoded token IDs
+    assert handoff.seed_snapshot(snapshot, "You are a companion") is False
+    assert handoff.seed_snapshot(snapshot, "You are a teacher") is True
+
+
+def test_retrieved_context_travels_with_the_snapshot(tmp_path):
+    token = handoff.export_handoff(MESSAGES, model_name="none", system_context="## Users", include_system_context=True, handoff_dir=tmp_path)
+    snapshot = handoff.load_handoff(token, handoff_dir=tmp_path)
+    assert snapshot["system_context"] == "## Users"
+    assert "system_context" not in handoff.create_snapshot(MESSAGES, model_name="none", system_context="Charter")
@@ -0,0 +1,40 @@
+"""
+Test the headless load-test harness and the rules backend it runs on
+"""
+
+import sys
+import os
+
+# Add charter_tool and benchmarks directories to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+import loadgen
+from chat import agent
+
+
+def test_rules_backend_loads_no_model():
+    """The rules backend answers without a pipeline and is not reported as degraded"""
+    assert agent.get_llm_pipeline(backend="rules") is None
+    assert agent.get_model_status(backend="rules")["degraded"] is False
+
+
+def test_concurrent_sessions_complete_script():
+    """Two concurrent sessions run the whole script without errors"""
+    cwd = os.getcwd()
+    results = loadgen.run_load_test([2], chat_turns=1)
+    assert os.getcwd() == cwd
+    result = results[0]
+    assert result["errors"] == 0, result["first_errors"]
+    assert set(result["pages"]) == {"dashboard", "interactive_chat", "export_deploy"}
+    # open + 3 edits, open + 1 turn, open + 3 exports per session
+    assert result["overall"]["reruns"] == 2 * 10
+    assert result["reruns_per_sec"] > 0
+
+
+def test_summarize_percentiles():
+    records = [{"session": 0, "page": "dashboard", "action": "open", "seconds": s / 1000, "error": None} for s in range(1, 101)]
+    summary = loadgen.summarize(records, 2.0, 1)
+    assert summary["reruns_per_sec"] == 50.0
+    assert summary["pages"]["dashboard"]["p50_ms"] == 50.5
+    assert summary["overall"]["max_ms"] == 100.0
@@ -0,0 +1,51 @@
+"""
+Test the ahead-of-time ONNX artifacts and the backend selection of the agent
+"""
+
+import sys
+import os
+import json
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from chat import agent, onnx_backend
+from chat.adapters import get_adapter_cache
+
+
+def test_configured_models_include_drafts():
+    models = onnx_backend.configured_models()
+    assert agent.HF_MODEL_NAME in models
+    assert agent.DRAFT_MODEL_OPTIONS[agent.HF_MODEL_NAME] in models
+    assert len(models) == len(set(models))
+
+
+def test_artifact_is_prepared_once_its_manifest_exists(tmp_path):
+    model_name = "org/tiny-model"
+    path = onnx_backend.artifact_dir(model_name, tmp_path)
+    assert path == tmp_path / "org--tiny-model"
+    assert not onnx_backend.is_prepared(model_name, tmp_path)
+
+    # An export without its manifest (interrupted) does not count
+    path.mkdir()
+    (path / "model.onnx").write_bytes(b"")
+    assert onnx_backend.read_manifest(model_name, tmp_path) is None
+
+    (path / onnx_backend.MANIFEST_FILE).write_text(json.dumps({"model_name": model_name, "optimization": "O2"}))
+    assert onnx_backend.read_manifest(model_name, tmp_path)["optimization"] == "O2"
+
+
+def test_unprepared_onnx_backend_degrades_to_rules(monkeypatch):
+    model_name = "org/not-exported"
+    if onnx_backend.ORT_AVAILABLE:
+        monkeypatch.setattr(onnx_backend, "ARTIFACTS_DIR", onnx_backend.ARTIFACTS_DIR / "missing")
+    assert agent.get_llm_pipeline(model_name, backend="onnx") is None
+    assert agent.is_degraded(model_name, backend="onnx")
+    agent._load_failures.pop(("pipeline", model_name, "onnx"), None)
+
+
+def test_onnx_pipeline_skips_torch_only_features():
+    pipe = onnx_backend.OnnxPipeline(model=object(), tokenizer=None, model_name="org/tiny-model")
+    assert get_adapter_cache(pipe) is None
+    counter, handle = agent._count_forward_calls(pipe.model)
+    assert handle is None and counter["calls"] == 0
@@ -0,0 +1,57 @@
+"""
+Test the persona registry and hot-swap engine
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from chat.personas import Persona, PersonaRegistry, load_personas, parse_retention
+
+
+def test_persona_library_loads():
+    """The five pre-built personas from the platform doc are available"""
+    personas = load_personas()
+    assert {"companion", "medication-nurse", "teacher", "entertainer", "emergency"} <= set(personas)
+    assert personas["medication-nurse"].context_retention == 24 * 3600
+
+
+def test_parse_retention():
+    assert parse_retention("2h") == 7200
+    assert parse_retention("forever") is None
+    with pytest.raises(ValueError):
+        parse_retention("soon")
+
+
+def test_retained_history_drops_old_messages():
+    persona = load_personas()["emergency"]
+    history = [
+        {"role": "user", "content": "old", "timestamp": 0},
+        {"role": "user", "content": "recent", "timestamp": 9_000},
+        {"role": "user", "content": "untimed"},
+    ]
+    kept = persona.retained_history(history, now=10_000)
+    assert [m["content"] for m in kept] == ["recent", "untimed"]
+
+
+def test_switch_is_measured_against_target():
+    registry = PersonaRegistry(load_personas())
+    for persona_id in registry.ids():
+        registry.switch(persona_id, session_key="s1")
+    assert registry.active_persona("s1").id == registry.ids()[-1]
+    report = registry.switch_report()
+    assert report["switches"] == len(registry.ids())
+    assert report["meets_target"]
+    with pytest.raises(KeyError):
+        registry.switch("unknown")
+
+
+def test_adapter_spec():
+    """Personas with a LoRA adapter hand (name, source) to the agent"""
+    persona = Persona.from_dict({"persona": {"id": "coach", "system_prompt": "Coach", "adapter": "adapters/coach"}})
+    assert persona.adapter_spec == ("coach", "adapters/coach")
+    assert load_personas()["companion"].adapter_spec is None
@@ -0,0 +1,62 @@
+"""
+Test the portfolio analytics over saved configurations
+"""
+
+import sys
+import os
+import json
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from utils import portfolio
+
+
+def _save(configs_dir, filename, **config):
+    path = configs_dir / filename
+    with open(path, "w") as f:
+        json.dump(config, f)
+    return path
+
+
+def test_aggregates_use_latest_version_per_project(tmp_path):
+    configs_dir = tmp_path / "configs"
+    configs_dir.mkdir()
+    old = _save(configs_dir, "alpha_1.json", project_name="Alpha", constraints={"budget": 50}, system_components=["Database"])
+    os.utime(old, (1, 1))
+    _save(configs_dir, "alpha_2.json", project_name="Alpha", constraints={"budget": 800}, system_components=["Database", "ML Models"],
+          completion_status={section: True for section in portfolio.SECTIONS})
+    _save(configs_dir, "beta_1.json", project_name="Beta", constraints={"budget": 2000}, system_components=["ML Models"],
+          completion_status={"Architecture": True})
+
+    table = portfolio.latest_versions(portfolio.load_portfolio(str(configs_dir)))
+    assert sorted(table["project_name"]) == ["Alpha", "Beta"]
+    assert portfolio.budget_distribution(table).to_dict() == {"< €100": 0, "€100–500": 0, "€500–1k": 1, "€1k–5k": 1, "≥ €5k": 0}
+    assert portfolio.value_frequency(table, "system_components")["ML Models"] == 2
+    rates = portfolio.completion_rates(table)
+    assert rates["Architecture"] == 1.0 and rates["Timeline"] == 0.5
+    summary = portfolio.portfolio_summary(table)
+    assert summary["projects"] == 2 and summary["fully_specified"] == 1
+
+
+def test_parquet_cache_is_refreshed_incrementally(tmp_path, monkeypatch):
+    configs_dir = tmp_path / "configs"
+    configs_dir.mkdir()
+    _save(configs_dir, "alpha.json", project_name="Alpha", users=["Analysts"])
+    _save(configs_dir, "beta.json", project_name="Beta")
+    assert len(portfolio.load_portfolio(str(configs_dir))) == 2
+    if portfolio.PARQUET_AVAILABLE:
+        assert (configs_dir / portfolio.CACHE_FILE).exists()
+
+    parsed = []
+    original_flatten = portfolio.flatten_config
+    monkeypatch.setattr(portfolio, "flatten_config", lambda config, path, mtime: parsed.append(path) or original_flatten(config, path, mtime))
+    beta = _save(configs_dir, "beta.json", project_name="Beta v2")
+    os.utime(beta, (10**9, 10**9))
+    (configs_dir / "alpha.json").unlink()
+    _save(configs_dir, "gamma.json", project_name="Gamma")
+
+    table = portfolio.load_portfolio(str(configs_dir))
+    assert sorted(table["project_name"]) == ["Beta v2", "Gamma"]
+    if portfolio.PARQUET_AVAILABLE:
+        assert sorted(os.path.basename(p) for p in parsed) == ["beta.json", "gamma.json"]
@@ -0,0 +1,69 @@
+"""
+Test chat-template prompt construction with cached encoded segments
+"""
+
+import sys
+import os
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from chat.prompt_builder import PromptBuilder, normalize_messages
+
+
+class CharTokenizer:
+    """Minimal tokenizer with a ChatML-style template; one token per character."""
+
+    chat_template = "chatml"
+
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=False):
+        text = "".join(f"<|im_start|>{m['role']}\n{m['content']}<|im_end|>\n" for m in messages)
+        return text + ("<|im_start|>assistant\n" if add_generation_prompt else "")
+
+    def encode(self, text, add_special_tokens=True):
+        return [ord(c) for c in text]
+
+
+def test_prompt_matches_chat_template():
+    """Encoded prompt equals the tokenized chat template output"""
+    tokenizer = CharTokenizer()
+    builder = PromptBuilder(tokenizer)
+    messages = normalize_messages("Who are the users?", system_context="Charter")
+    expected = tokenizer.encode(tokenizer.apply_chat_template(messages, add_generation_prompt=True))
+    assert builder.encode(messages) == expected
+
+
+def test_new_turn_only_encodes_new_text():
+    """A follow-up turn reuses the system segment and previous turns"""
+    tokenizer = CharTokenizer()
+    builder = PromptBuilder(tokenizer)
+    history = [{"role": "assistant", "content": "What problem are you solving?"}]
+    first = normalize_messages("Invoice matching", history, "Charter")
+    builder.encode(first)
+    encoded_before = builder.stats["encoded_chars"]
+
+    second = normalize_messages(
+        "Finance analysts",
+        history + [{"role": "user", "content": "Invoice matching"}, {"role": "assistant", "content": "Who uses it?"}],
+        "Charter",
+    )
+    ids = builder.encode(second)
+    expected = tokenizer.encode(tokenizer.apply_chat_template(second, add_generation_prompt=True))
+    assert ids == expected
+
+    new_turns = tokenizer.apply_chat_template(second[-2:])
+    assert builder.stats["encoded_chars"] - encoded_before == len(new_turns)
+
+
+def test_plain_history_strings_are_user_turns():
+    """Legacy string history still works"""
+    messages = normalize_messages("next", ["earlier"])
+    assert messages == [{"role": "user", "content": "earlier"}, {"role": "user", "content": "next"}]
+
+
+def test_retrieved_context_goes_in_front_of_its_user_turn():
+    messages = normalize_messages("And the budget?", [{"role": "user", "content": "Who are the users?", "context": "[charter.md › Users]\nAnalysts"}], "Planner", context="[charter.md › Budget]\n€500")
+    assert messages[0] == {"role": "system", "content": "Planner"}
+    assert messages[1]["content"].startswith("Relevant charter sections:\n[charter.md › Users]\nAnalysts\n\n")
+    assert messages[1]["content"].endswith("Who are the users?")
+    assert messages[2]["content"].endswith("[charter.md › Budget]\n€500\n\nAnd the budget?")
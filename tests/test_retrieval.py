@@ -0,0 +1,66 @@
+"""
+Test retrieval over the charter template and docs
+"""
+
+import sys
+import os
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from chat.retrieval import RetrievalIndex, chunk_markdown
+
+CHARTER = """# Charter
+
+## Constraints
+
+What is the monthly budget? Which compliance standards (GDPR, HIPAA) apply to the project data?
+
+## Timeline
+
+When is the go-live date? Which milestones come before deployment and user testing?
+
+```python
+# not a heading
+```
+"""
+
+
+def test_chunks_follow_headings():
+    chunks = chunk_markdown(CHARTER, "charter.md")
+    headings = [c["heading"] for c in chunks]
+    assert headings == ["Charter › Constraints", "Charter › Timeline"]
+    assert "# not a heading" in chunks[1]["text"]
+
+
+def test_search_returns_relevant_section(tmp_path):
+    (tmp_path / "charter.md").write_text(CHARTER)
+    index = RetrievalIndex([tmp_path / "charter.md"], index_path=tmp_path / "index.json")
+    results = index.search("What budget do we have?", k=1)
+    assert results[0]["heading"] == "Charter › Constraints"
+    assert index.search("milestones before go-live", k=1)[0]["heading"] == "Charter › Timeline"
+    context = index.build_context("GDPR compliance", k=1)
+    assert "GDPR" in context and "go-live" not in context
+    # Sections the conversation already holds are not given again
+    assert index.build_context("GDPR compliance", k=1, exclude="earlier turn\n\n" + context) == ""
+
+
+def test_index_is_persisted_and_rebuilt_per_changed_file(tmp_path):
+    charter = tmp_path / "charter.md"
+    notes = tmp_path / "notes.md"
+    charter.write_text(CHARTER)
+    notes.write_text("# Notes\n\nThe architecture uses a vector database for the retrieval components.\n")
+    index = RetrievalIndex([charter, notes], index_path=tmp_path / "index.json")
+    assert index.refresh() is True
+    assert (tmp_path / "index.json").exists()
+
+    # A new index loads the persisted sections and re-chunks nothing
+    reloaded = RetrievalIndex([charter, notes], index_path=tmp_path / "index.json")
+    assert reloaded.refresh() is False
+    assert reloaded.stats["files_indexed"] == 0
+    assert reloaded.search("budget", k=1)[0]["heading"] == "Charter › Constraints"
+
+    notes.write_text("# Notes\n\nThe architecture now uses a knowledge graph database for retrieval components.\n")
+    assert reloaded.refresh() is True
+    assert reloaded.stats["files_indexed"] == 1
+    assert reloaded.search("knowledge graph", k=1)[0]["source"] == "notes.md"
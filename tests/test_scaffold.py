@@ -0,0 +1,77 @@
+"""
+Test the project scaffolder: diff-only, atomic file writes
+"""
+
+import sys
+import os
+import json
+import glob
+import subprocess
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from utils import scaffold
+
+CONFIGS_DIR = os.path.join(os.path.dirname(__file__), '..', 'configs')
+
+
+def _config():
+    with open(sorted(glob.glob(os.path.join(CONFIGS_DIR, "project_config_*.json")))[-1]) as f:
+        return json.load(f)
+
+
+def test_rescaffold_writes_only_changed_files(tmp_path):
+    config = _config()
+    first = scaffold.scaffold(config, tmp_path)
+    assert first["created"] == len(first["files"]) and first["unchanged"] == 0
+    assert (tmp_path / "docs" / "generated_charter.md").exists()
+    assert (tmp_path / "src" / "config.py").exists()
+    for component in config["system_components"]:
+        package = scaffold.COMPONENT_PACKAGES.get(component)
+        if package:
+            assert (tmp_path / "src" / package / "__init__.py").exists()
+    mtimes = {p: p.stat().st_mtime_ns for p in tmp_path.rglob("*") if p.is_file()}
+
+    again = scaffold.scaffold(config, tmp_path)
+    assert again["unchanged"] == len(again["files"])
+    assert {p: p.stat().st_mtime_ns for p in tmp_path.rglob("*") if p.is_file()} == mtimes
+
+    changed = dict(config, problem_statement="A different problem statement for the project")
+    report = scaffold.scaffold(changed, tmp_path)
+    assert report["files"]["README.md"] == "updated"
+    assert report["files"]["docs/generated_charter.md"] == "updated"
+    assert report["files"]["Dockerfile"] == "unchanged"
+    # No temporary files are left behind
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_generation_stamp_does_not_count_as_change(tmp_path):
+    path = tmp_path / "docs" / "charter.md"
+    assert scaffold.write_if_changed(path, "# Charter\n\nGenerated on: 2025-07-07 17:52:09\n") == "created"
+    assert scaffold.write_if_changed(path, "# Charter\n\nGenerated on: 2026-01-01 09:00:00\n") == "unchanged"
+    assert scaffold.write_if_changed(path, "# Charter v2\n\nGenerated on: 2026-01-01 09:00:00\n") == "updated"
+    assert path.read_text().startswith("# Charter v2")
+
+
+def test_render_is_cached_per_config():
+    config = _config()
+    assert scaffold.render_project(config) is scaffold.render_project(json.loads(json.dumps(config)))
+
+
+def test_written_files_keep_the_usual_mode(tmp_path):
+    """Atomic writes do not leave files owner-only (mkstemp's 0600)"""
+    scaffold.write_if_changed(tmp_path / "new.txt", "first")
+    assert (tmp_path / "new.txt").stat().st_mode & 0o777 == scaffold.NEW_FILE_MODE
+    (tmp_path / "new.txt").chmod(0o640)
+    scaffold.write_if_changed(tmp_path / "new.txt", "second")
+    assert (tmp_path / "new.txt").stat().st_mode & 0o777 == 0o640
+
+
+def test_scaffolded_project_runs(tmp_path):
+    """main.py imports src/config.py, whose values may hold quotes and newlines"""
+    config = dict(_config(), project_name='Ops "Copilot"', problem_statement='Agents can\'t find answers.\nSearch takes "forever".')
+    scaffold.scaffold(config, tmp_path)
+    result = subprocess.run([sys.executable, "main.py"], cwd=tmp_path, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == 'Starting Ops "Copilot"'
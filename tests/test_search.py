@@ -0,0 +1,72 @@
+"""
+Test the full-text search index
+"""
+
+import sys
+import os
+import json
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from utils.search import SearchIndex, build_match_query
+
+
+def test_match_query_is_quoted_and_prefixed():
+    assert build_match_query('GDPR "compliance" OR') == '"GDPR" "compliance" "OR"*'
+    assert build_match_query("  ?! ") is None
+
+
+def test_configs_docs_and_chats_are_searchable(tmp_path):
+    configs_dir = tmp_path / "configs"
+    docs_dir = tmp_path / "docs"
+    configs_dir.mkdir()
+    docs_dir.mkdir()
+    with open(configs_dir / "health.json", "w") as f:
+        json.dump({"project_name": "Health portal", "constraints": {"compliance": ["GDPR", "HIPAA"]}}, f)
+    (docs_dir / "ethics.md").write_text("# Ethics\n\nPersonal data is processed under GDPR.\n")
+
+    index = SearchIndex(str(tmp_path / "search.sqlite"))
+    assert index.sync_files(str(configs_dir), str(docs_dir)) == 2
+    index.add_chat_message("session-1", "user", "Do we need a GDPR data processing agreement?")
+
+    results = index.search("gdpr")
+    assert {r["kind"] for r in results} == {"config", "doc", "chat"}
+    assert any("**GDPR**" in r["snippet"] for r in results)
+    assert [r["title"] for r in index.search("health")] == ["Health portal"]
+    assert [r["kind"] for r in index.search("gdpr", kinds=["chat"])] == ["chat"]
+    # Prefix match while typing
+    assert index.search("hip")[0]["title"] == "Health portal"
+
+
+def test_updates_replace_documents_incrementally(tmp_path):
+    configs_dir = tmp_path / "configs"
+    configs_dir.mkdir()
+    config_path = configs_dir / "shop.json"
+    with open(config_path, "w") as f:
+        json.dump({"project_name": "Shop", "problem_statement": "slow checkout"}, f)
+    index = SearchIndex(str(tmp_path / "search.sqlite"))
+    index.sync_files(str(configs_dir), str(tmp_path / "docs"))
+    assert index.sync_files(str(configs_dir), str(tmp_path / "docs")) == 0
+
+    config = {"project_name": "Shop", "problem_statement": "fraud detection"}
+    with open(config_path, "w") as f:
+        json.dump(config, f)
+    index.index_config(str(config_path), config)
+    assert index.search("checkout") == []
+    assert index.search("fraud")[0]["title"] == "Shop"
+    assert index.count() == 1
+
+    config_path.unlink()
+    index.sync_files(str(configs_dir), str(tmp_path / "docs"))
+    assert index.search("fraud") == []
+
+
+def test_old_documents_are_ranked_among_many_matches():
+    """The best match wins even when thousands of newer documents also match"""
+    index = SearchIndex(":memory:")
+    index.upsert("doc", "docs/gdpr.md", "GDPR", "GDPR GDPR GDPR data processing agreement")
+    with index._db:
+        for i in range(3000):
+            index._upsert("chat", f"chat:s:{i}", "user", f"message {i} mentions gdpr once among many other words", float(i))
+    assert index.search("gdpr", 1)[0]["ref"] == "docs/gdpr.md"
@@ -0,0 +1,49 @@
+"""
+Test the preload-then-fork launcher and its memory report
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+import serve
+
+WEIGHTS_BYTES = 64 * 1024 ** 2
+
+
+def test_forked_workers_share_preloaded_weights():
+    """Workers reading the parent's weights keep them shared (copy-on-write)"""
+    before = serve.memory_usage(os.getpid())["rss"]
+    weights = np.ones(WEIGHTS_BYTES // 8)
+    model_bytes = serve.memory_usage(os.getpid())["rss"] - before
+    ready_read, ready_write = os.pipe()
+    release_read, release_write = os.pipe()
+
+    def worker(index):
+        # Inference only reads the weights
+        assert weights.sum() == len(weights)
+        os.write(ready_write, b"1")
+        os.read(release_read, 1)
+
+    pids = serve.fork_workers(2, worker)
+    try:
+        for _ in pids:
+            os.read(ready_read, 1)
+        report = serve.memory_report(os.getpid(), pids, model_bytes)
+    finally:
+        os.write(release_write, b"11")
+        for pid in pids:
+            os.waitpid(pid, 0)
+
+    assert model_bytes >= WEIGHTS_BYTES * 0.9
+    for index in range(2):
+        worker_usage = report["processes"][f"worker {index}"]
+        assert worker_usage["shared"] >= WEIGHTS_BYTES * 0.9
+        assert worker_usage["private"] < WEIGHTS_BYTES / 2
+    # Three processes map the weights but they are paid for once
+    assert report["total_pss"] < report["total_rss"] - WEIGHTS_BYTES
+    assert "Sum of PSS" in serve.render_memory_report(report)
@@ -0,0 +1,65 @@
+"""
+Test the similar-project index over saved configurations
+"""
+
+import sys
+import os
+import json
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from utils.similarity import SimilarityIndex, get_similarity_index, note_saved_config
+
+SUPPLY_CHAIN = {
+    "project_name": "Supply chain risk",
+    "problem_statement": "Detect delayed deliveries and inventory risk across suppliers",
+    "users": ["Analysts", "Business Users"],
+    "interaction_patterns": ["Web Dashboard"],
+    "system_components": ["Data Ingestion", "ML Models", "Database"],
+}
+
+HELPDESK = {
+    "project_name": "Helpdesk bot",
+    "problem_statement": "Answer employee IT questions in a chat",
+    "users": ["End Customers"],
+    "interaction_patterns": ["Chat Interface"],
+    "system_components": ["API Gateway", "Vector Store"],
+}
+
+
+def test_most_similar_project_ranks_first():
+    index = SimilarityIndex()
+    index.add(HELPDESK, "configs/helpdesk.json")
+    index.add(SUPPLY_CHAIN, "configs/supply.json")
+    query = dict(SUPPLY_CHAIN, project_name="Logistics", problem_statement="Predict delayed deliveries")
+    results = index.query(query, k=2)
+    assert results[0]["project_name"] == "Supply chain risk"
+
+
+def test_versions_and_current_project_are_collapsed():
+    index = SimilarityIndex()
+    index.add(SUPPLY_CHAIN, "configs/supply_1.json")
+    index.add(SUPPLY_CHAIN, "configs/supply_2.json")
+    index.add(HELPDESK, "configs/helpdesk.json")
+    names = [r["project_name"] for r in index.query(SUPPLY_CHAIN, k=5)]
+    assert names.count("Supply chain risk") == 1
+    assert "Supply chain risk" not in [r["project_name"] for r in index.query(SUPPLY_CHAIN, k=5, exclude_project="Supply chain risk")]
+
+
+def test_refresh_and_save_add_incrementally(tmp_path):
+    configs_dir = tmp_path / "configs"
+    configs_dir.mkdir()
+    with open(configs_dir / "helpdesk.json", "w") as f:
+        json.dump(HELPDESK, f)
+    index = get_similarity_index(str(configs_dir))
+    assert len(index) == 1
+
+    # A saved config is added without rescanning, and not indexed twice on refresh
+    saved_path = os.path.join(str(configs_dir), "supply.json")
+    with open(saved_path, "w") as f:
+        json.dump(SUPPLY_CHAIN, f)
+    note_saved_config(SUPPLY_CHAIN, saved_path, str(configs_dir))
+    assert len(index) == 2
+    assert index.refresh() == 0
+    assert index.query(SUPPLY_CHAIN, k=1)[0]["path"] == saved_path
@@ -0,0 +1,45 @@
+"""
+Test the cold-start import budget of the Streamlit app
+"""
+
+import sys
+import os
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from utils import import_profile
+
+
+def test_parse_importtime():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |     _io",
+        "import time:      2000 |       2500 |   yaml",
+        "import time:      1000 |       4000 | utils.functions",
+        "import time:       500 |        500 | json",
+    ])
+    profile = import_profile.parse_importtime(output)
+    assert profile["total_ms"] == 4.5
+    assert [m["depth"] for m in profile["modules"]] == [2, 1, 0, 0]
+
+
+def test_page_imports_are_read_from_the_scripts():
+    statements = import_profile.import_statements(import_profile.PAGES_DIR / "portfolio.py")
+    assert "from utils import portfolio" in statements
+    assert not any("chat.agent" in s for s in import_profile.import_statements(import_profile.ENTRYPOINT))
+
+
+def test_entrypoint_loads_no_heavy_dependency():
+    """The entrypoint leaves heavy dependencies and the chat stack to the pages"""
+    profile = import_profile.profile_imports(import_profile.import_statements(import_profile.ENTRYPOINT), runs=1)
+    assert profile["deferred_loaded"] == []
+    assert not {"chat.agent", "chat.retrieval"} & {m["name"] for m in profile["modules"]}
+
+
+def test_pages_defer_heavy_dependencies_to_their_first_visit():
+    entry = import_profile.import_statements(import_profile.ENTRYPOINT)
+    chat = import_profile.profile_imports(import_profile.import_statements(import_profile.PAGES_DIR / "interactive_chat.py"), preload=entry)
+    assert any(m["name"] == "chat.agent" for m in chat["modules"])
+    portfolio = import_profile.profile_imports(import_profile.import_statements(import_profile.PAGES_DIR / "portfolio.py"), preload=entry)
+    assert "pandas" in portfolio["deferred_loaded"]
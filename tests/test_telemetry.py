@@ -0,0 +1,45 @@
+"""
+Test the inference telemetry of the chat agent
+"""
+
+import sys
+import os
+
+# Add charter_tool directory to path for imports (the app runs from there)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'charter_tool'))
+
+from chat import telemetry
+
+
+def test_turn_is_recorded_and_exported():
+    """A timed turn shows up in the rolling window and the Prometheus text"""
+    telemetry.reset()
+    telemetry.set_enabled(True)
+    telemetry.record_model_load("tiny-model", 1.5)
+    turn = telemetry.start_turn("tiny-model")
+    turn.queue_acquired()
+    turn.generation_started()
+    turn.first_token()
+    turn.finish(prompt_tokens=12, response_tokens=5)
+
+    turns = telemetry.get_recent_turns()
+    assert len(turns) == 1
+    assert turns[0]["prompt_tokens"] == 12
+    assert "ttft_sec" in turns[0] and "prefill_sec" in turns[0]
+
+    metrics = telemetry.render_prometheus()
+    assert "charter_llm_turns_total 1" in metrics
+    assert 'charter_llm_tokens_total{kind="response"} 5' in metrics
+    assert 'charter_llm_model_load_seconds{model="tiny-model"} 1.5' in metrics
+
+
+def test_disabled_telemetry_records_nothing():
+    """With telemetry off, turns are not recorded"""
+    telemetry.reset()
+    telemetry.set_enabled(False)
+    try:
+        turn = telemetry.start_turn("tiny-model")
+        turn.finish(prompt_tokens=3, response_tokens=3)
+        assert telemetry.get_recent_turns() == []
+    finally:
+        telemetry.set_enabled(True)